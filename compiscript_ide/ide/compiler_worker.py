@@ -0,0 +1,196 @@
+import sys
+import time
+import queue
+import threading
+import traceback
+import multiprocessing
+
+COMPILE_TIMEOUT = 10.0
+POLL_SECONDS = 0.5
+WARMUP_SOURCE = "let warmup: integer = 1;\n"
+
+
+def process_context():
+    # Sin fork: el proceso de Tk ya tiene corriendo los hilos lector y escritor de los demás
+    # CompilerWorker, y una copia del proceso heredaría los locks que tengan tomados.
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class Superseded:
+    # Señal de cancelación compartida entre procesos: una solicitud queda obsoleta en cuanto
+    # el IDE envía otra más reciente por el mismo canal.
+    def __init__(self, latest, request_id):
+        self.latest = latest
+        self.request_id = request_id
+
+    def is_set(self):
+        return self.latest.value != self.request_id
+
+
+def serialize_tree(tree):
+    # Árbol en preorden como dos listas planas: la etiqueta de cada nodo y el índice donde
+    # termina su subárbol. Se recorre sin recursión y viaja por el pipe sin anidamiento.
+    labels = []
+    ends = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, int):
+            ends[node] = len(labels)
+            continue
+        count = node.getChildCount()
+        name = node.__class__.__name__
+        labels.append(f"{name}: {node.getText()}" if count == 0 else name)
+        ends.append(0)
+        stack.append(len(labels) - 1)
+        stack.extend(node.getChild(i) for i in range(count - 1, -1, -1))
+    return {"labels": labels, "ends": ends}
+
+
+def worker_main(analyzer_dir, connection, latest):
+    sys.path.insert(0, analyzer_dir)
+    from compilador import Compiler, CompileOptions, result_to_json
+    from analizador_semantico import CompilationCancelled
+
+    compiler = Compiler()
+    compiler.compile(WARMUP_SOURCE)
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        request_id, source, include_views = message
+        cancelled = Superseded(latest, request_id) if latest is not None else None
+        if cancelled is not None and cancelled.is_set():
+            connection.send((request_id, None))
+            continue
+        start = time.perf_counter()
+        try:
+            result = compiler.compile(source, CompileOptions(keep_tree=include_views), cancelled)
+            payload = {"result": result_to_json(result, include_tac=False, include_symbols=include_views)}
+            if include_views and not result.syntax_errors:
+                payload["ast"] = serialize_tree(result.tree)
+                # El listado ya formateado, el mismo que main.py escribe en codigo_tac.txt.
+                payload["tac"] = result.tac_listing() if result.tac_count else None
+        except CompilationCancelled:
+            connection.send((request_id, None))
+            continue
+        except Exception:
+            payload = {"error": traceback.format_exc()}
+        payload["seconds"] = time.perf_counter() - start
+        connection.send((request_id, payload))
+
+
+class CompilerWorker:
+    # Proceso de compilación persistente del IDE. Las solicitudes se escriben desde un hilo
+    # propio y las respuestas se leen desde otro, así que el hilo de Tk nunca espera al pipe;
+    # cada callback se ejecuta en el hilo de Tk mediante after().
+    def __init__(self, root, analyzer_dir, supersede=False, timeout=COMPILE_TIMEOUT):
+        self.root = root
+        self.analyzer_dir = str(analyzer_dir)
+        self.timeout = timeout
+        self.context = process_context()
+        self.latest = self.context.Value("q", 0) if supersede else None
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.next_id = 0
+        self.process = None
+        self.connection = None
+        self.outbox = None
+
+    def start(self):
+        parent, child = self.context.Pipe()
+        self.process = self.context.Process(target=worker_main, args=(self.analyzer_dir, child, self.latest),
+                                               daemon=True)
+        self.process.start()
+        child.close()
+        self.connection = parent
+        self.outbox = queue.Queue()
+        threading.Thread(target=self._writer, args=(parent, self.outbox), daemon=True).start()
+        threading.Thread(target=self._reader, args=(parent, self.process), daemon=True).start()
+
+    def submit(self, source, callback, include_views=True):
+        with self.lock:
+            if self.process is None or not self.process.is_alive():
+                self.start()
+            self.next_id += 1
+            request_id = self.next_id
+            if self.latest is not None:
+                self.latest.value = request_id
+                self.pending.clear()
+            self.pending[request_id] = (callback, time.monotonic() + self.timeout)
+            self.outbox.put((request_id, source, include_views))
+        return request_id
+
+    def _writer(self, connection, outbox):
+        while True:
+            message = outbox.get()
+            if message is None:
+                return
+            if self.latest is not None and message[0] != self.latest.value:
+                continue
+            try:
+                connection.send(message)
+            except (OSError, ValueError):
+                return
+
+    def _reader(self, connection, process):
+        while True:
+            with self.lock:
+                deadlines = [deadline for _, deadline in self.pending.values()]
+            wait = max(0, min(deadlines) - time.monotonic()) if deadlines else POLL_SECONDS
+            try:
+                ready = connection.poll(min(wait, POLL_SECONDS))
+                message = connection.recv() if ready else None
+            except (EOFError, OSError):
+                self._fail_pending(process, "El proceso de compilación terminó inesperadamente")
+                return
+            if message is not None:
+                request_id, payload = message
+                with self.lock:
+                    entry = self.pending.pop(request_id, None)
+                if entry is not None and payload is not None:
+                    self.root.after(0, entry[0], payload)
+                continue
+            if process is not self.process:
+                return
+            now = time.monotonic()
+            with self.lock:
+                expired = any(deadline <= now for _, deadline in self.pending.values())
+            if expired:
+                self._fail_pending(process, "Tiempo de compilación agotado")
+                return
+
+    def _fail_pending(self, process, message):
+        # Un proceso colgado o caído se descarta; la siguiente solicitud arranca uno nuevo.
+        with self.lock:
+            if process is not self.process:
+                return
+            failed = list(self.pending.values())
+            self.pending.clear()
+            self.process = None
+            self.outbox.put(None)
+        if process.is_alive():
+            process.kill()
+        process.join()
+        for callback, _ in failed:
+            self.root.after(0, callback, {"error": message})
+
+    def stop(self):
+        with self.lock:
+            process, connection, self.process = self.process, self.connection, None
+            self.pending.clear()
+            if self.outbox is not None:
+                self.outbox.put(None)
+        if process is None:
+            return
+        try:
+            connection.send(None)
+        except (OSError, ValueError):
+            pass
+        process.join(POLL_SECONDS)
+        if process.is_alive():
+            process.kill()
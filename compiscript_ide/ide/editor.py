@@ -1,6 +1,10 @@
 import tkinter as tk
 from tkinter.scrolledtext import ScrolledText
 
+from ide.highlighter import SyntaxHighlighter
+
+DIAGNOSTIC_DELAY_MS = 400
+
 class CodeEditor:
     def __init__(self, parent):
         self.frame = tk.Frame(parent)
@@ -38,8 +42,7 @@ class CodeEditor:
         self.scrollbar = tk.Scrollbar(self.text_frame, orient=tk.VERTICAL)
         self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
-        self.text_area.config(yscrollcommand=self.scrollbar.set)
-        self.line_numbers.config(yscrollcommand=self.scrollbar.set)
+        self.text_area.config(yscrollcommand=self.on_text_scroll)
         self.scrollbar.config(command=self.on_scrollbar)
         
         self.h_scrollbar = tk.Scrollbar(self.frame, orient=tk.HORIZONTAL)
@@ -54,15 +57,30 @@ class CodeEditor:
         self.text_area.bind('<Control-v>', self.on_paste)
         self.text_area.bind('<Control-z>', self.on_undo_redo)
         self.text_area.bind('<Control-y>', self.on_undo_redo)
+        self.text_area.bind('<<Modified>>', self.on_modified)
+        
+        self.text_area.tag_configure("diagnostic_error", underline=True, background="#ffdede")
+        self.text_area.tag_configure("diagnostic_warning", underline=True, background="#fff4cc")
+        self.diagnostics_worker = None
+        self.diagnostics_timer = None
+        self.edit_generation = 0
+        self.highlighter = SyntaxHighlighter(self.text_area)
         
         self.current_file = None
+        self.gutter_lines = 1
         
-        self.update_line_numbers()
+        self.line_numbers.config(state='normal')
+        self.line_numbers.insert('1.0', '1')
+        self.line_numbers.config(state='disabled', width=3)
     
     def on_scrollbar(self, *args):
         self.text_area.yview(*args)
         self.line_numbers.yview(*args)
     
+    def on_text_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.line_numbers.yview_moveto(first)
+    
     def on_mousewheel(self, event):
         self.text_area.yview_scroll(int(-1 * (event.delta / 120)), "units")
         self.line_numbers.yview_scroll(int(-1 * (event.delta / 120)), "units")
@@ -85,23 +103,78 @@ class CodeEditor:
     def on_undo_redo(self, event):
         self.after_idle(self.update_line_numbers)
     
+    def on_modified(self, event):
+        # <<Modified>> solo se dispara cuando la bandera pasa a verdadera; se reinicia para
+        # enterarse del siguiente cambio, venga de una tecla, un pegado o un deshacer.
+        if not self.text_area.edit_modified():
+            return
+        self.text_area.edit_modified(False)
+        self.edit_generation += 1
+        self.update_line_numbers()
+        self.schedule_diagnostics()
+    
+    def attach_lexer(self, lexer_class):
+        self.highlighter.set_lexer(lexer_class)
+    
+    def attach_diagnostics(self, worker):
+        self.diagnostics_worker = worker
+        self.schedule_diagnostics()
+    
+    def schedule_diagnostics(self):
+        if self.diagnostics_timer is not None:
+            self.text_area.after_cancel(self.diagnostics_timer)
+        self.diagnostics_timer = self.text_area.after(DIAGNOSTIC_DELAY_MS, self.request_diagnostics)
+    
+    def request_diagnostics(self):
+        # El análisis corre en el proceso de fondo; un pedido nuevo deja obsoleto al anterior,
+        # que el proceso abandona en la siguiente sentencia.
+        self.diagnostics_timer = None
+        if self.diagnostics_worker is None:
+            return
+        if self.current_file and not self.current_file.endswith('.cps'):
+            return
+        generation = self.edit_generation
+        self.diagnostics_worker.submit(self.get_content(),
+                                       lambda payload: self.show_diagnostics(payload, generation),
+                                       include_views=False)
+    
+    def show_diagnostics(self, payload, generation):
+        if generation != self.edit_generation or "result" not in payload:
+            return
+        self.clear_diagnostics()
+        result = payload["result"]
+        for item in result["syntax_errors"] + result["diagnostics"]:
+            if not item["line"]:
+                continue
+            tag = "diagnostic_error" if item["severity"] == "error" else "diagnostic_warning"
+            start = f"{item['line']}.{item['column']}"
+            end = self.text_area.index(f"{start} wordend")
+            if self.text_area.compare(end, "<=", start) or self.text_area.compare(end, ">", f"{start} lineend"):
+                end = f"{start} lineend"
+            self.text_area.tag_add(tag, start, end)
+    
+    def clear_diagnostics(self):
+        self.text_area.tag_remove("diagnostic_error", "1.0", tk.END)
+        self.text_area.tag_remove("diagnostic_warning", "1.0", tk.END)
+    
     def after_idle(self, func):
         self.text_area.after_idle(func)
     
     def update_line_numbers(self):
-        self.line_numbers.config(state='normal')
-        self.line_numbers.delete('1.0', tk.END)
-        
+        # Solo se agregan o quitan los números del final según cuánto cambió la cantidad de
+        # líneas; el costo depende del cambio, no del tamaño del archivo.
         line_count = int(self.text_area.index('end-1c').split('.')[0])
-        
-        line_numbers_text = '\n'.join(str(i) for i in range(1, line_count + 1))
-        self.line_numbers.insert('1.0', line_numbers_text)
-        
-        self.line_numbers.config(state='disabled')
-        
-        max_digits = len(str(line_count))
-        new_width = max(3, max_digits + 1)
-        self.line_numbers.config(width=new_width)
+        if line_count != self.gutter_lines:
+            self.line_numbers.config(state='normal')
+            if line_count > self.gutter_lines:
+                self.line_numbers.insert('end-1c', ''.join(f'\n{i}' for i in range(self.gutter_lines + 1, line_count + 1)))
+            else:
+                self.line_numbers.delete(f'{line_count}.end', 'end-1c')
+            self.line_numbers.config(state='disabled')
+            
+            if len(str(line_count)) != len(str(self.gutter_lines)):
+                self.line_numbers.config(width=max(3, len(str(line_count)) + 1))
+            self.gutter_lines = line_count
         
         try:
             top, bottom = self.text_area.yview()
@@ -0,0 +1,213 @@
+import sys
+import time
+import bisect
+
+FRAME_BUDGET = 0.008
+CONTINUE_DELAY_MS = 1
+
+TAG_STYLES = {
+    "syntax_keyword": "#0000cc",
+    "syntax_type": "#267f99",
+    "syntax_constant": "#af00db",
+    "syntax_number": "#098658",
+    "syntax_string": "#a31515",
+    "syntax_comment": "#008000",
+}
+TYPE_WORDS = {"boolean", "integer", "string"}
+CONSTANT_WORDS = {"true", "false", "null"}
+
+
+def load_lexer(analyzer_dir):
+    # Solo el lexer generado se carga en el proceso del IDE; sin antlr4 no hay resaltado.
+    path = str(analyzer_dir)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+    try:
+        from CompiscriptLexer import CompiscriptLexer
+    except ImportError:
+        return None
+    return CompiscriptLexer
+
+
+class SyntaxHighlighter:
+    # Resaltado incremental con los tokens de CompiscriptLexer. Cada línea se analiza por
+    # separado partiendo del estado con que empieza (dentro o fuera de un comentario /* */),
+    # único token que cruza líneas. Una edición vuelve a analizar desde el inicio de su primera
+    # línea y avanza hasta que el estado de entrada de la siguiente coincide con el guardado:
+    # a partir de ahí el resto del texto produce los mismos tokens y no se toca.
+    def __init__(self, text_area):
+        self.text_area = text_area
+        self.lexer = None
+        self.input_stream = None
+        self.keywords = set()
+        self.states = [False]
+        self.pending = []
+        self.job = None
+        for tag, color in TAG_STYLES.items():
+            text_area.tag_configure(tag, foreground=color)
+        self._install_proxy()
+
+    def _install_proxy(self):
+        # Las inserciones y borrados, vengan de una tecla, un pegado o un deshacer, pasan por el
+        # comando Tcl del widget; se intercepta para conocer las líneas afectadas por cada cambio.
+        widget = self.text_area
+        self.original = widget._w + "_original"
+        widget.tk.call("rename", widget._w, self.original)
+        widget.tk.createcommand(widget._w, self._dispatch)
+
+    def _call(self, *args):
+        return self.text_area.tk.call((self.original,) + args)
+
+    def _line_of(self, index):
+        return int(str(self._call("index", index)).split(".")[0])
+
+    def _dispatch(self, operation, *args):
+        if operation not in ("insert", "delete", "replace") or not args:
+            return self._call(operation, *args)
+        last_line = self._line_of("end-1c")
+        first = min(self._line_of(args[0]), last_line)
+        if operation == "insert":
+            removed_to, inserted = first, args[1::2]
+        else:
+            end = args[1] if len(args) > 1 else f"{args[0]}+1c"
+            removed_to = max(first, min(self._line_of(end), last_line))
+            inserted = args[2::2] if operation == "replace" else ()
+        result = self._call(operation, *args)
+        added = sum(str(chars).count("\n") for chars in inserted)
+        self.edited(first, removed_to - first, added)
+        return result
+
+    def edited(self, first, removed, added):
+        # Las líneas first+1..first+removed desaparecen y aparecen added líneas nuevas sin
+        # estado conocido; los pendientes posteriores se desplazan con el texto.
+        self.states[first:first + removed] = [None] * added
+        delta = added - removed
+        shifted = set()
+        for line in self.pending:
+            if line > first + removed:
+                shifted.add(line + delta)
+            else:
+                shifted.add(min(line, first))
+        shifted.add(first)
+        self.pending = sorted(shifted)
+        self._schedule()
+
+    def set_lexer(self, lexer_class):
+        if lexer_class is None:
+            self.lexer = None
+            return
+        from antlr4 import InputStream
+        self.input_stream = InputStream
+        self.lexer = lexer_class(InputStream(""))
+        self.lexer.removeErrorListeners()
+        self.keywords = {name.strip("'") for name in lexer_class.literalNames
+                         if name.strip("'").isalpha()}
+        self.rehighlight()
+
+    def rehighlight(self):
+        self.states = [False] + [None] * (self._line_of("end-1c") - 1)
+        self.pending = [1]
+        self._schedule()
+
+    def _schedule(self):
+        if self.job is None and self.lexer is not None:
+            self.job = self.text_area.after_idle(self._run)
+
+    def _run(self):
+        # Se analiza por tramos de a lo sumo un cuadro; si queda trabajo (al abrir un archivo
+        # grande o al abrir un comentario que lo cubre todo) se continúa en la siguiente vuelta.
+        self.job = None
+        if self.lexer is None:
+            return
+        deadline = time.perf_counter() + FRAME_BUDGET
+        last_line = len(self.states)
+        spans = {tag: [] for tag in TAG_STYLES}
+        while self.pending and time.perf_counter() < deadline:
+            line = self.pending.pop(0)
+            if line > last_line:
+                continue
+            while self.states[line - 1] is None:
+                line -= 1
+            first = line
+            state = self.states[line - 1]
+            while True:
+                text = str(self._call("get", f"{line}.0", f"{line}.0 lineend"))
+                state = self._lex_line(text, state, line, spans)
+                line += 1
+                if line > last_line:
+                    break
+                index = bisect.bisect_left(self.pending, line)
+                queued = index < len(self.pending) and self.pending[index] == line
+                if self.states[line - 1] == state and not queued:
+                    break
+                if queued:
+                    self.pending.pop(index)
+                self.states[line - 1] = state
+                if time.perf_counter() >= deadline:
+                    bisect.insort(self.pending, line)
+                    break
+            for tag in TAG_STYLES:
+                self._call("tag", "remove", tag, f"{first}.0", f"{line - 1}.0 lineend")
+        for tag, ranges in spans.items():
+            if ranges:
+                self._call("tag", "add", tag, *ranges)
+        if self.pending:
+            self.job = self.text_area.after(CONTINUE_DELAY_MS, self._run)
+
+    def _lex_line(self, text, in_comment, line, spans):
+        # Devuelve si la línea termina dentro de un comentario de bloque. Los comentarios y
+        # espacios los descarta el lexer, así que se ubican en los huecos entre tokens.
+        offset = 0
+        if in_comment:
+            close = text.find("*/")
+            if close < 0:
+                self._span(spans, "syntax_comment", line, 0, len(text))
+                return True
+            offset = close + 2
+            self._span(spans, "syntax_comment", line, 0, offset)
+        lexer = self.lexer
+        lexer.inputStream = self.input_stream(text[offset:])
+        previous_end = offset
+        previous = None
+        while True:
+            token = lexer.nextToken()
+            if token.type == token.EOF:
+                break
+            start = offset + token.column
+            self._gap(spans, text, line, previous_end, start)
+            value = token.text
+            if value == "*" and previous is not None and previous.text == "/" and \
+                    offset + previous.column + 1 == start:
+                # Un /* sin cierre en esta línea: el lexer lo entrega como '/' y '*'.
+                self._span(spans, "syntax_comment", line, start - 1, len(text))
+                return True
+            kind = self._kind(token)
+            if kind:
+                self._span(spans, "syntax_" + kind, line, start, start + len(value))
+            previous = token
+            previous_end = start + len(value)
+        self._gap(spans, text, line, previous_end, len(text))
+        return False
+
+    def _kind(self, token):
+        value = token.text
+        if value in self.keywords:
+            if value in TYPE_WORDS:
+                return "type"
+            return "constant" if value in CONSTANT_WORDS else "keyword"
+        if token.type == self.lexer.Literal:
+            return "string" if value.startswith('"') else "number"
+        if token.type == self.lexer.IntegerLiteral:
+            return "number"
+        if token.type == self.lexer.StringLiteral:
+            return "string"
+        return None
+
+    def _gap(self, spans, text, line, start, end):
+        gap = text[start:end]
+        positions = [position for position in (gap.find("//"), gap.find("/*")) if position >= 0]
+        if positions:
+            self._span(spans, "syntax_comment", line, start + min(positions), start + len(gap.rstrip()))
+
+    def _span(self, spans, tag, line, start, end):
+        spans[tag].extend((f"{line}.{start}", f"{line}.{end}"))
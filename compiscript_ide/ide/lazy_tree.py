@@ -0,0 +1,118 @@
+import re
+import bisect
+
+PAGE_SIZE = 200
+PLACEHOLDER = "__pendiente__"
+WORD = re.compile(r"[A-Za-z0-9_]+")
+
+
+class LazyTree:
+    # Treeview que materializa las filas solo cuando se necesitan: los hijos de un nodo se
+    # insertan al abrirlo y de a PAGE_SIZE; la fila "más" del final carga la página siguiente
+    # cuando queda a la vista. children(iid) devuelve los iids hijos ("" es la raíz) y
+    # describe(iid) devuelve las opciones de insert() y si el nodo tiene hijos.
+    def __init__(self, tree, scroll_set, children, describe):
+        self.tree = tree
+        self.scroll_set = scroll_set
+        self.children = children
+        self.describe = describe
+        self.loaded = {}
+        self.more = {}
+        self.check_job = None
+        tree.configure(yscrollcommand=self.on_scroll)
+        tree.bind("<<TreeviewOpen>>", self.on_open)
+        tree.bind("<<TreeviewSelect>>", self.on_select, add="+")
+
+    def reset(self):
+        self.tree.delete(*self.tree.get_children())
+        self.loaded.clear()
+        self.more.clear()
+        self.load_page("")
+
+    def load_page(self, parent):
+        children = self.children(parent)
+        start = self.loaded.get(parent, 0)
+        more_iid = f"{parent}/más"
+        if self.more.pop(more_iid, None) is not None:
+            self.tree.delete(more_iid)
+        end = min(start + PAGE_SIZE, len(children))
+        for iid in children[start:end]:
+            options, has_children = self.describe(iid)
+            self.tree.insert(parent, "end", iid=iid, **options)
+            if has_children:
+                self.tree.insert(iid, "end", iid=f"{iid}/{PLACEHOLDER}")
+        self.loaded[parent] = end
+        if end < len(children):
+            self.tree.insert(parent, "end", iid=more_iid, text=f"… {len(children) - end} más")
+            self.more[more_iid] = parent
+
+    def ensure_loaded(self, parent):
+        if parent not in self.loaded:
+            if parent and self.tree.exists(f"{parent}/{PLACEHOLDER}"):
+                self.tree.delete(f"{parent}/{PLACEHOLDER}")
+            self.load_page(parent)
+
+    def on_open(self, event):
+        self.ensure_loaded(self.tree.focus())
+
+    def on_select(self, event):
+        for iid in self.tree.selection():
+            if iid in self.more:
+                self.load_page(self.more[iid])
+
+    def on_scroll(self, first, last):
+        self.scroll_set(first, last)
+        if self.more and self.check_job is None:
+            self.check_job = self.tree.after_idle(self.load_visible)
+
+    def load_visible(self):
+        self.check_job = None
+        for more_iid, parent in list(self.more.items()):
+            if self.tree.bbox(more_iid):
+                self.load_page(parent)
+
+    def reveal(self, path):
+        # Abre y carga los ancestros hasta que el último iid de path existe, y lo selecciona.
+        for parent, iid in zip([""] + path[:-1], path):
+            self.ensure_loaded(parent)
+            while not self.tree.exists(iid) and f"{parent}/más" in self.more:
+                self.load_page(parent)
+            if parent:
+                self.tree.item(parent, open=True)
+        self.tree.selection_set(path[-1])
+        self.tree.focus(path[-1])
+        self.tree.see(path[-1])
+
+
+class SearchIndex:
+    # Índice ordenado de palabras en minúsculas: una búsqueda por prefijo es una bisección y
+    # no recorre todas las filas. Se construye con la primera búsqueda, no al cargar la vista.
+    def __init__(self, entries):
+        self.entries = entries
+        self.words = None
+
+    def build(self):
+        words = []
+        for key, text in self.entries():
+            for word in WORD.findall(text.lower()):
+                words.append((word, key))
+        words.sort()
+        self.words = words
+
+    def search(self, query):
+        query = query.strip().lower()
+        if not query:
+            return []
+        if self.words is None:
+            self.build()
+        keys = None
+        for term in WORD.findall(query):
+            matches = set()
+            index = bisect.bisect_left(self.words, (term,))
+            while index < len(self.words) and self.words[index][0].startswith(term):
+                matches.add(self.words[index][1])
+                index += 1
+            keys = matches if keys is None else keys & matches
+            if not keys:
+                break
+        return sorted(keys or ())
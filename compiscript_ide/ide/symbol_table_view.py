@@ -1,17 +1,28 @@
 import tkinter as tk
 from tkinter import ttk
 
+from ide.lazy_tree import LazyTree, SearchIndex
+
+FILTER_DELAY_MS = 200
+
 class SymbolTableView:
     COLS = ("name", "kind", "type", "scope", "line", "used", "offset", "size", "addr", "extra")
 
     def __init__(self, parent):
         self.frame = ttk.Frame(parent)
-        ttk.Label(self.frame, text="Tabla de símbolos", anchor="w").pack(fill=tk.X, pady=(0, 4))
-        self.tree = ttk.Treeview(self.frame, columns=self.COLS, show="headings", height=12)
+        header = ttk.Frame(self.frame)
+        header.pack(fill=tk.X, pady=(0, 4))
+        ttk.Label(header, text="Tabla de símbolos", anchor="w").pack(side=tk.LEFT)
+        self.filter_var = tk.StringVar()
+        filter_entry = ttk.Entry(header, textvariable=self.filter_var, width=24)
+        filter_entry.pack(side=tk.RIGHT)
+        filter_entry.bind("<KeyRelease>", self.schedule_filter)
+        ttk.Label(header, text="Filtrar:").pack(side=tk.RIGHT, padx=4)
+        self.tree = ttk.Treeview(self.frame, columns=self.COLS, show="tree headings", height=12)
         self.tree.pack(fill=tk.BOTH, expand=True, side=tk.LEFT)
         yscroll = ttk.Scrollbar(self.frame, orient="vertical", command=self.tree.yview)
         xscroll = ttk.Scrollbar(self.frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=yscroll.set, xscrollcommand=xscroll.set)
+        self.tree.configure(xscrollcommand=xscroll.set)
         yscroll.pack(side=tk.RIGHT, fill=tk.Y)
         xscroll.pack(side=tk.BOTTOM, fill=tk.X)
         headings = {
@@ -29,55 +40,103 @@ class SymbolTableView:
         for key, title in headings.items():
             self.tree.heading(key, text=title)
             self.tree.column(key, width=110 if key != "extra" else 220, anchor="w")
+        self.tree.heading("#0", text="Ámbito")
+        self.tree.column("#0", width=220, anchor="w")
+        self.lazy = LazyTree(self.tree, yscroll.set, self._children, self._describe)
+        self.filter_job = None
+        self._set_scopes([])
+
+    def _set_scopes(self, scopes):
+        self.scopes = scopes
+        self.child_scopes = {scope["id"]: [] for scope in scopes}
+        self.top_scopes = []
+        for scope in scopes:
+            siblings = self.top_scopes if scope["parent"] is None else self.child_scopes[scope["parent"]]
+            siblings.append(f"s{scope['id']}")
+        self.child_cache = {}
+        self.index = SearchIndex(self._index_entries)
+        self.filtered = None
 
     def clear(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self._set_scopes([])
+        self.lazy.reset()
+
+    def _index_entries(self):
+        for scope in self.scopes:
+            for position, sym in enumerate(scope["symbols"]):
+                yield (scope["id"], position), f"{sym['name']} {sym['kind']} {sym['type']}"
 
-    def _enum_to_str(self, e):
-        try:
-            return e.value
-        except Exception:
-            return str(e)
+    def _children(self, iid):
+        # Cada ámbito muestra sus símbolos y después sus ámbitos anidados; con un filtro activo
+        # la raíz es la lista plana de símbolos que coinciden.
+        if not iid:
+            return self.top_scopes if self.filtered is None else self.filtered
+        children = self.child_cache.get(iid)
+        if children is None:
+            scope_id = int(iid[1:])
+            children = [f"{iid}.{position}" for position in range(len(self.scopes[scope_id]["symbols"]))]
+            children += self.child_scopes[scope_id]
+            self.child_cache[iid] = children
+        return children
+
+    def _describe(self, iid):
+        scope_id, _, position = iid[1:].partition(".")
+        scope = self.scopes[int(scope_id)]
+        if position:
+            return {"text": "", "values": self._sym_to_row(scope["symbols"][int(position)], self._scope_name(scope))}, False
+        return {"text": self._scope_name(scope)}, bool(scope["symbols"] or self.child_scopes[scope["id"]])
 
     def _sym_to_row(self, sym, scope_name):
-        name = getattr(sym, "name", "")
-        kind = self._enum_to_str(getattr(sym, "symbol_type", ""))
-        dtype = self._enum_to_str(getattr(sym, "data_type", ""))
-        line = getattr(sym, "line_number", "")
-        used = "Sí" if getattr(sym, "is_used", False) else "No"
-        offset = getattr(sym, "offset", 0)
-        size = getattr(sym, "size_bytes", 0)
-        addr_val = getattr(sym, "address", None)
-        addr = f"0x{addr_val:X}" if isinstance(addr_val, int) else (addr_val or "")
+        addr_val = sym.get("address")
+        addr = f"0x{addr_val:X}" if isinstance(addr_val, int) else ""
         extra_parts = []
-        params = getattr(sym, "parameters", None)
+        params = sym.get("parameters")
         if params:
-            ptxt = ", ".join(f"{p.name}:{self._enum_to_str(p.data_type)}" for p in params)
+            ptxt = ", ".join(f"{p['name']}:{p['type']}" for p in params)
             extra_parts.append(f"params({ptxt})")
-        ret = getattr(sym, "return_type", None)
-        if ret:
-            extra_parts.append(f"ret:{self._enum_to_str(ret)}")
-        class_type = getattr(sym, "class_type", None) or getattr(sym, "value", None)
-        if class_type and dtype == "class":
-            extra_parts.append(f"instancia:{class_type}")
-        if getattr(sym, "is_constructor", False):
+        if "parameters" in sym:
+            extra_parts.append(f"ret:{sym['type']}")
+        if sym.get("class") and "parameters" not in sym:
+            extra_parts.append(f"instancia:{sym['class']}")
+        if sym.get("parent"):
+            extra_parts.append(f"hereda:{sym['parent']}")
+        if sym.get("constructor"):
             extra_parts.append("constructor")
         extra = " | ".join(extra_parts)
-        return (name, kind, dtype, scope_name, line, used, offset, size, addr, extra)
+        used = "Sí" if sym["used"] else "No"
+        return (sym["name"], sym["kind"], sym["type"], scope_name, sym["line"], used,
+                sym["offset"], sym["size"], addr, extra)
+
+    def _scope_name(self, scope):
+        if scope["parent"] is None:
+            return "global"
+        if scope["span"] is None:
+            return f"{scope['name']} (nivel {scope['level']})"
+        return f"{scope['name']} (nivel {scope['level']}, líneas {scope['span'][0]}-{scope['span'][2]})"
+
+    def load_from_scopes(self, scopes):
+        self._set_scopes(scopes)
+        self.apply_filter()
+
+    def schedule_filter(self, event=None):
+        if self.filter_job is not None:
+            self.tree.after_cancel(self.filter_job)
+        self.filter_job = self.tree.after(FILTER_DELAY_MS, self.apply_filter)
 
-    def load_from_symbol_table(self, symbol_table):
-        self.clear()
-        global_syms = getattr(symbol_table.global_scope, "symbols", {})
-        for sym in global_syms.values():
-            self.tree.insert("", "end", values=self._sym_to_row(sym, "global"))
-        history = getattr(symbol_table, "all_scopes_history", [])
-        for sc in history:
-            scope_name = f"{sc['name']} (nivel {sc['level']})"
-            for sym in sc['symbols'].values():
-                self.tree.insert("", "end", values=self._sym_to_row(sym, scope_name))
-        active_scopes = getattr(symbol_table, "scope_stack", [])[1:]
-        for sc in active_scopes:
-            scope_name = f"{sc.scope_name} (nivel {sc.scope_level})"
-            for sym in sc.symbols.values():
-                self.tree.insert("", "end", values=self._sym_to_row(sym, scope_name))
+    def apply_filter(self):
+        self.filter_job = None
+        query = self.filter_var.get()
+        if query.strip():
+            self.filtered = [f"s{scope_id}.{position}" for scope_id, position in self.index.search(query)]
+        else:
+            self.filtered = None
+        self.lazy.reset()
+        if self.filtered is None:
+            # Se abren los ámbitos superiores y sus hijos directos; el resto espera a que se abra.
+            for iid in self.top_scopes:
+                self.lazy.ensure_loaded(iid)
+                self.tree.item(iid, open=True)
+                for child in self.child_scopes[int(iid[1:])]:
+                    if self.tree.exists(child):
+                        self.lazy.ensure_loaded(child)
+                        self.tree.item(child, open=True)
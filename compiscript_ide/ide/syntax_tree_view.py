@@ -1,38 +1,99 @@
 import tkinter as tk
 from tkinter import ttk
 
+from ide.lazy_tree import LazyTree, SearchIndex
+
 class SyntaxTreeView:
     def __init__(self, parent):
         self.frame = ttk.Frame(parent)
-        ttk.Label(self.frame, text="Árbol sintáctico", anchor="w").pack(fill=tk.X, pady=(0,4))
-        self.text = tk.Text(self.frame, wrap="none", height=12, font=("Consolas", 10))
-        self.text.pack(fill=tk.BOTH, expand=True)
-        yscroll = ttk.Scrollbar(self.frame, orient="vertical", command=self.text.yview)
-        xscroll = ttk.Scrollbar(self.frame, orient="horizontal", command=self.text.xview)
-        self.text.configure(yscrollcommand=yscroll.set, xscrollcommand=xscroll.set)
+        header = ttk.Frame(self.frame)
+        header.pack(fill=tk.X, pady=(0,4))
+        ttk.Label(header, text="Árbol sintáctico", anchor="w").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(header, textvariable=self.search_var, width=24)
+        search_entry.pack(side=tk.RIGHT)
+        search_entry.bind("<Return>", self.find_next)
+        self.match_label = ttk.Label(header, text="")
+        self.match_label.pack(side=tk.RIGHT, padx=4)
+        self.tree = ttk.Treeview(self.frame, show="tree", height=12)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+        yscroll = ttk.Scrollbar(self.frame, orient="vertical", command=self.tree.yview)
+        xscroll = ttk.Scrollbar(self.frame, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=xscroll.set)
         yscroll.pack(side=tk.RIGHT, fill=tk.Y)
         xscroll.pack(side=tk.BOTTOM, fill=tk.X)
+        self.lazy = LazyTree(self.tree, yscroll.set, self._children, self._describe)
+        self._set_ast({"labels": [], "ends": []})
+
+    def _set_ast(self, ast):
+        self.ast = ast
+        self.child_cache = {}
+        self.parents = None
+        self.index = SearchIndex(lambda: enumerate(self.ast["labels"]))
+        self.matches = []
+        self.match_query = None
+        self.match_position = -1
+        self.match_label.config(text="")
 
     def clear(self):
-        self.text.delete("1.0", tk.END)
-
-    def _lines_from_ast(self, node, depth=0, out=None):
-        if out is None:
-            out = []
-        if node is None:
-            return out
-        indent = "  " * depth
-        cls = node.__class__.__name__
-        if hasattr(node, "getText") and node.getChildCount() == 0:
-            out.append(f"{indent}{cls}: {node.getText()}")
-        else:
-            out.append(f"{indent}{cls}")
-        if hasattr(node, "getChildCount"):
-            for i in range(node.getChildCount()):
-                self._lines_from_ast(node.getChild(i), depth+1, out)
-        return out
+        self._set_ast({"labels": [], "ends": []})
+        self.lazy.reset()
+
+    def _children(self, iid):
+        # El árbol llega en preorden con el índice final de cada subárbol: el primer hijo de
+        # un nodo es el siguiente índice y cada hermano empieza donde termina el anterior.
+        if not iid:
+            return ["0"] if self.ast["labels"] else []
+        children = self.child_cache.get(iid)
+        if children is None:
+            node = int(iid)
+            ends = self.ast["ends"]
+            children = []
+            child = node + 1
+            while child < ends[node]:
+                children.append(str(child))
+                child = ends[child]
+            self.child_cache[iid] = children
+        return children
+
+    def _describe(self, iid):
+        node = int(iid)
+        return {"text": self.ast["labels"][node]}, self.ast["ends"][node] > node + 1
 
     def load_from_ast(self, ast):
-        self.clear()
-        lines = self._lines_from_ast(ast, 0, [])
-        self.text.insert("1.0", "\n".join(lines))
+        self._set_ast(ast)
+        self.lazy.reset()
+        if ast["labels"]:
+            self.lazy.ensure_loaded("0")
+            self.tree.item("0", open=True)
+
+    def _path(self, node):
+        if self.parents is None:
+            # La profundidad de un nodo es la cantidad de subárboles abiertos que lo contienen.
+            ends = self.ast["ends"]
+            parents = []
+            open_nodes = []
+            for index in range(len(ends)):
+                while open_nodes and ends[open_nodes[-1]] <= index:
+                    open_nodes.pop()
+                parents.append(open_nodes[-1] if open_nodes else -1)
+                open_nodes.append(index)
+            self.parents = parents
+        path = []
+        while node >= 0:
+            path.append(str(node))
+            node = self.parents[node]
+        return path[::-1]
+
+    def find_next(self, event=None):
+        query = self.search_var.get()
+        if query != self.match_query:
+            self.match_query = query
+            self.matches = self.index.search(query)
+            self.match_position = -1
+        if not self.matches:
+            self.match_label.config(text="Sin resultados" if query.strip() else "")
+            return
+        self.match_position = (self.match_position + 1) % len(self.matches)
+        self.lazy.reveal(self._path(self.matches[self.match_position]))
+        self.match_label.config(text=f"{self.match_position + 1}/{len(self.matches)}")
@@ -1,17 +1,19 @@
 import tkinter as tk
 from tkinter import messagebox, filedialog
-import subprocess
 import os
-import sys
-import threading
 from pathlib import Path
 
+from ide.compiler_worker import CompilerWorker
+from ide.highlighter import load_lexer
+
 class Toolbar(tk.Frame):
     def __init__(self, parent, app):
         super().__init__(parent)
         self.app = app
         self.analyzer_path = None  
         self.is_compiling = False
+        self.worker = None
+        self.diagnostics_worker = None
 
         self.save_btn = tk.Button(self, text="Guardar", command=self.guardar)
         self.save_btn.pack(side=tk.LEFT, padx=5)
@@ -33,6 +35,7 @@ class Toolbar(tk.Frame):
             if main_py.exists() and analizador_py.exists():
                 self.analyzer_path = Path(folder)
                 self.app.console.log(f"Analizador configurado: {folder}")
+                self.start_worker()
                 messagebox.showinfo("Configuración exitosa", 
                                   f"Analizador semántico configurado correctamente:\n{folder}")
             else:
@@ -40,6 +43,32 @@ class Toolbar(tk.Frame):
                                    f"No se encontró main.py y analizador_semantico.py en:\n{folder}\n"
                                    f"Asegúrate de seleccionar la carpeta 'program'")
 
+    def start_worker(self):
+        # Un solo proceso de compilación para toda la sesión: ANTLR y el analizador se cargan
+        # una vez al abrir el IDE y cada compilación es un único viaje de ida y vuelta.
+        self.stop_worker()
+        analyzer_dir = self._get_analyzer_dir()
+        if not (analyzer_dir / "compilador.py").exists():
+            self.app.console.log(f"No se encontró el analizador completo en: {analyzer_dir}")
+            return
+        self.app.editor.attach_lexer(load_lexer(analyzer_dir))
+        self.worker = CompilerWorker(self.app.root, analyzer_dir)
+        self.worker.start()
+        # Los diagnósticos mientras se escribe usan un proceso aparte para no hacer esperar
+        # a una compilación explícita.
+        self.diagnostics_worker = CompilerWorker(self.app.root, analyzer_dir, supersede=True)
+        self.diagnostics_worker.start()
+        self.app.editor.attach_diagnostics(self.diagnostics_worker)
+
+    def stop_worker(self):
+        if self.worker is not None:
+            self.worker.stop()
+            self.worker = None
+        if self.diagnostics_worker is not None:
+            self.app.editor.attach_diagnostics(None)
+            self.diagnostics_worker.stop()
+            self.diagnostics_worker = None
+
     def _find_analyzer_automatically(self) -> Path:
         
         possible_locations = [
@@ -113,184 +142,69 @@ class Toolbar(tk.Frame):
         )
         self.save_btn.config(state="disabled" if compiling else "normal")
 
-    def _compile_thread(self, analyzer_dir: Path, cps_file: Path):
+    def _handle_compile_result(self, payload: dict):
         try:
-            
-            main_py = analyzer_dir / "main.py"
-            if not main_py.exists():
-                self.app.root.after(0, self._handle_compile_error, 
-                    f"No se encontró main.py en {analyzer_dir}")
+            if "error" in payload:
+                self._handle_compile_error(payload["error"])
                 return
-                
-            command = [sys.executable, str(main_py), str(cps_file.resolve())]
-            
-            self.app.console.log(f"Iniciando análisis...")
-            self.app.console.log(f"Archivo: {cps_file.name}")
-            self.app.console.log(f"Analizador: {analyzer_dir}")
-            self.app.console.log(f"Comando: {' '.join(command)}")
 
-            
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
-                cwd=str(analyzer_dir),  
-                timeout=10
-            )
-
-            
-            self.app.root.after(0, self._handle_compile_result, result, analyzer_dir, cps_file)
-
-        except subprocess.TimeoutExpired:
-            self.app.root.after(0, self._handle_timeout)
-        except Exception as e:
-            self.app.root.after(0, self._handle_compile_error, str(e))
-
-    def _handle_compile_result(self, result, analyzer_dir: Path, cps_file: Path):
-        try:
-            
-            if result.stdout.strip():
-                for line in result.stdout.strip().split('\n'):
-                    self.app.console.log(line)
-            
-            if result.stderr.strip():
-                for line in result.stderr.strip().split('\n'):
-                    self.app.console.log(f"Error: {line}")
+            result = payload["result"]
+            console = self.app.console
 
-            if result.returncode != 0:
-                self.app.console.log(f"El analizador terminó con código de error: {result.returncode}")
+            if result["syntax_errors"]:
+                for item in result["syntax_errors"]:
+                    console.log(f"Error sintáctico [Línea {item['line']}, Columna {item['column']}]: {item['message']}")
+                console.log(f"{len(result['syntax_errors'])} errores sintácticos encontrados")
+            elif result.get("internal_error"):
+                console.log(f"Error durante el análisis semántico: {result['internal_error']}")
             else:
-                self.app.console.log("Fin")
+                errors = [item for item in result["diagnostics"] if item["severity"] == "error"]
+                warnings = [item for item in result["diagnostics"] if item["severity"] != "error"]
+                for title, items in (("Errores semánticos", errors), ("Advertencias", warnings)):
+                    if items:
+                        console.log(f"{title} ({len(items)}):")
+                        for i, item in enumerate(items, 1):
+                            console.log(f"  {i}. [Línea {item['line']}] {item['message']}")
+                console.log(f"Errores: {len(errors)}, Warnings: {len(warnings)}")
+                console.log(f"Instrucciones TAC generadas: {result['tac_count']}")
+                console.log("COMPILACIÓN EXITOSA" if result["success"] else "COMPILACIÓN FALLIDA")
+            console.log(f"Fin ({payload['seconds'] * 1000:.0f} ms)")
+
+            if payload.get("tac"):
+                self._save_tac(payload["tac"])
+            if "ast" in payload:
+                self.app.syntax_tree_view.load_from_ast(payload["ast"])
+            if "scopes" in result:
+                self.app.symbol_table_view.load_from_scopes(result["scopes"])
 
-            
-            self._load_analysis_views(analyzer_dir, cps_file)
-            
         finally:
             self._set_compiling_state(False)
 
-    def _handle_timeout(self):
-        self._set_compiling_state(False)
+    def _save_tac(self, listing: str):
+        # Igual que al ejecutar main.py desde la carpeta del analizador.
+        tac_file = self._get_analyzer_dir() / "codigo_tac.txt"
+        try:
+            with open(tac_file, "w", encoding="utf-8") as f:
+                f.write(listing)
+            self.app.console.log(f"Código TAC guardado en: {tac_file}")
+        except OSError as e:
+            self.app.console.log(f"No se pudo guardar el código TAC: {e}")
 
     def _handle_compile_error(self, error_msg: str):
         self.app.console.log(f"Error al ejecutar el analizador: {error_msg}")
         messagebox.showerror("Error de ejecución", f"Error al ejecutar el analizador:\n{error_msg}")
         self._set_compiling_state(False)
 
-    def _load_analysis_views(self, analyzer_dir: Path, cps_file: Path):
-        try:
-            
-            
-            modules_to_clear = [
-                'analizador_semantico', 'CompiscriptLexer', 
-                'CompiscriptParser', 'CompiscriptVisitor'
-            ]
-            for module in modules_to_clear:
-                if module in sys.modules:
-                    del sys.modules[module]
-            
-            analyzer_str = str(analyzer_dir)
-            if analyzer_str not in sys.path:
-                sys.path.insert(0, analyzer_str)
-
-            required_files = [
-                analyzer_dir / "analizador_semantico.py",
-                analyzer_dir / "CompiscriptLexer.py", 
-                analyzer_dir / "CompiscriptParser.py"
-            ]
-            
-            missing_files = [f for f in required_files if not f.exists()]
-            if missing_files:
-                self.app.console.log("Archivos faltantes para las vistas:")
-                for f in missing_files:
-                    self.app.console.log(f" {f.name}")
-                self.app.console.log("Genera los archivos ANTLR con: antlr4 -Dlanguage=Python3 Compiscript.g4")
-                return
-
-            
-            try:
-                
-                import analizador_semantico
-                from analizador_semantico import CompiscriptSemanticVisitor
-                
-                
-                from antlr4 import FileStream, CommonTokenStream
-                
-                
-                
-                import CompiscriptLexer
-                import CompiscriptParser
-                from CompiscriptLexer import CompiscriptLexer as LexerClass
-                from CompiscriptParser import CompiscriptParser as ParserClass
-                
-                
-            except ImportError as e:
-                self.app.console.log(f"Error importando módulos: {e}")
-                self.app.console.log("Posibles soluciones:")
-                self.app.console.log("1. Genera archivos ANTLR: antlr4 -Dlanguage=Python3 Compiscript.g4")
-                self.app.console.log("2. Instala antlr4: pip install antlr4-python3-runtime")
-                self.app.console.log("3. Verifica que estés en el directorio correcto")
-                return
-
-            
-            self.app.console.log(f"Procesando archivo: {cps_file}")
-            
-            input_stream = FileStream(str(cps_file.resolve()), encoding="utf-8")
-            lexer = LexerClass(input_stream)
-            tokens = CommonTokenStream(lexer)
-            parser = ParserClass(tokens)
-            
-            
-            parser.removeErrorListeners()
-            
-            ast = parser.program()
-
-            
-            if parser.getNumberOfSyntaxErrors() > 0:
-                self.app.console.log(f"{parser.getNumberOfSyntaxErrors()} errores sintácticos encontrados")
-                return
-
-
-            
-            visitor = CompiscriptSemanticVisitor()
-            visitor.visit(ast)
-            result_analysis = visitor.get_analysis_result()
-            symbol_table = result_analysis["symbol_table"]
-
-
-            
-            self.app.syntax_tree_view.load_from_ast(ast)
-            self.app.symbol_table_view.load_from_symbol_table(symbol_table)
-            
-
-        except Exception as e:
-            import traceback
-            self.app.console.log(f"Error cargando vistas: {str(e)}")
-            self.app.console.log("Detalles del error:")
-            
-            
-            error_lines = traceback.format_exc().split('\n')
-            for line in error_lines[-10:]:  
-                if line.strip():
-                    self.app.console.log(f"  {line}")
-            
-            self.app.console.log("La compilación principal funcionó, pero las vistas no se pudieron cargar")
-
     def compilar(self):
         
         if self.is_compiling:
             self.app.console.log("Ya hay una compilación en proceso...")
             return
 
-        analyzer_dir = self._get_analyzer_dir()
-        main_py = analyzer_dir / "main.py"
-        analizador_py = analyzer_dir / "analizador_semantico.py"
-
-        
-        if not main_py.exists() or not analizador_py.exists():
-            self.app.console.log(f"No se encontró el analizador completo en: {analyzer_dir}")
-            self.app.console.log(f"main.py existe: {main_py.exists()}")
-            self.app.console.log(f"analizador_semantico.py existe: {analizador_py.exists()}")
-            
+        if self.worker is None:
+            self.start_worker()
+            if self.worker is None:
+                return
 
         current_path = self.app.get_current_path()
         if not current_path:
@@ -315,10 +229,7 @@ class Toolbar(tk.Frame):
 
         
         self._set_compiling_state(True)
+        self.app.console.log(f"Iniciando análisis...")
+        self.app.console.log(f"Archivo: {cps_file.name}")
         
-        compile_thread = threading.Thread(
-            target=self._compile_thread, 
-            args=(analyzer_dir, cps_file),
-            daemon=True
-        )
-        compile_thread.start()
\ No newline at end of file
+        self.worker.submit(self.app.get_code(), self._handle_compile_result)
@@ -49,6 +49,13 @@ class IDEApp:
         self.symbol_table_view = SymbolTableView(self.right_split)
         self.right_split.add(self.symbol_table_view.frame, minsize=240)
 
+        self.toolbar.start_worker()
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+    def close(self):
+        self.toolbar.stop_worker()
+        self.root.destroy()
+
     def open_file(self, filepath):
         try:
             with open(filepath, "r", encoding="utf-8") as f:
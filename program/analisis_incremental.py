@@ -0,0 +1,383 @@
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Set
+
+from CompiscriptLexer import CompiscriptLexer
+from CompiscriptParser import CompiscriptParser
+from analizador_semantico import CompiscriptSemanticVisitor, declared_functions
+from tabla_simbolos import SymbolType
+
+DECLARATION_RULES = ("variableDeclaration", "constantDeclaration", "functionDeclaration", "classDeclaration")
+
+
+def unit_key(stmt) -> tuple:
+    # La posición forma parte de la clave: los diagnósticos, los rangos de los ámbitos y el
+    # índice de posiciones guardan líneas absolutas, así que un fragmento movido no se reutiliza.
+    start, stop = stmt.start, stmt.stop or stmt.start
+    text = start.getInputStream().getText(start.start, stop.stop)
+    return (start.line, start.column, text)
+
+
+def identifier_names(ctx) -> Set[str]:
+    names = set()
+    pending = [ctx]
+    while pending:
+        node = pending.pop()
+        if node.getChildCount() == 0:
+            symbol = getattr(node, "symbol", None)
+            if symbol is not None and symbol.type == CompiscriptLexer.Identifier:
+                names.add(symbol.text)
+            continue
+        pending.extend(node.getChildren())
+    return names
+
+
+def declared_name(stmt) -> Optional[str]:
+    for rule in DECLARATION_RULES:
+        declaration = getattr(stmt, rule)()
+        if declaration is not None:
+            identifier = declaration.Identifier()
+            if isinstance(identifier, list):
+                identifier = identifier[0] if identifier else None
+            return identifier.getText() if identifier is not None else None
+    return None
+
+
+@dataclass
+class DeclarationUnit:
+    key: tuple
+    names_used: Set[str]
+    names_defined: List[str] = field(default_factory=list)
+    symbols: list = field(default_factory=list)
+    states: List[tuple] = field(default_factory=list)
+    scopes: list = field(default_factory=list)
+    classes: List[tuple] = field(default_factory=list)
+    effects: List[tuple] = field(default_factory=list)
+    tac: list = field(default_factory=list)
+    errors: list = field(default_factory=list)
+    warnings: list = field(default_factory=list)
+    table_errors: list = field(default_factory=list)
+    table_warnings: list = field(default_factory=list)
+    diagnostics: list = field(default_factory=list)
+    records: list = field(default_factory=list)
+    state_before: tuple = ()
+    state_after: tuple = ()
+    hoisted: bool = False
+    ordinals: List[int] = field(default_factory=list)
+    signatures: list = field(default_factory=list)
+    collected: List[tuple] = field(default_factory=list)
+    collected_class: Optional[tuple] = None
+
+
+def is_hoisted(stmt) -> bool:
+    return stmt.functionDeclaration() is not None or stmt.classDeclaration() is not None
+
+
+def declaration_ctx(stmt):
+    return stmt.functionDeclaration() or stmt.classDeclaration()
+
+
+def unit_contexts(stmt) -> list:
+    # Contextos con firma de la primera pasada: la clase seguida de sus métodos, o la función.
+    if stmt.classDeclaration():
+        return [stmt.classDeclaration()] + declared_functions(stmt)
+    return declared_functions(stmt)
+
+
+def class_state(table, symbol) -> tuple:
+    return (symbol, symbol.parent_class, table.class_layouts.get(symbol.name), table.class_vtables.get(symbol.name),
+            table.class_members.get(symbol.name), dict(symbol.attributes), dict(symbol.methods))
+
+
+class IncrementalVisitor(CompiscriptSemanticVisitor):
+    # Analiza el programa declaración por declaración. Una declaración de nivel superior cuyo
+    # texto no cambió y que no usa ningún nombre redefinido se reconstruye a partir del
+    # resultado anterior (símbolos, ámbitos, diagnósticos, índice y fragmento de TAC).
+    # Las funciones y clases reutilizables recuperan además sus símbolos de la primera pasada.
+    def __init__(self, previous: Dict[tuple, DeclarationUnit], reusable: Set[tuple], dirty_names: Set[str],
+                 counters: tuple):
+        super().__init__()
+        self.previous = previous
+        self.reusable = reusable
+        self.dirty_names = dirty_names
+        (self.temp_manager.global_counter, self.label_manager.counter,
+         self.analyzer.variable_counter, self.next_ordinal) = counters
+        self.units: Dict[tuple, DeclarationUnit] = {}
+        self.keys: Dict[object, tuple] = {}
+        self.collected: Dict[tuple, tuple] = {}
+        self.reinstated: Set[tuple] = set()
+        self.reused = 0
+        self.analyzed = 0
+        self.marked: Optional[list] = None
+
+    def mark_used(self, symbol):
+        super().mark_used(symbol)
+        if self.marked is not None:
+            self.marked.append(symbol)
+
+    def program_scope(self):
+        return self.analyzer.symbol_table.scope_stack[-1]
+
+    def unit_state(self) -> tuple:
+        return (self.program_scope().local_next_offset, self.analyzer.unreachable_code)
+
+    def key_of(self, stmt) -> tuple:
+        key = self.keys.get(stmt)
+        if key is None:
+            key = self.keys[stmt] = unit_key(stmt)
+        return key
+
+    def reusable_unit(self, stmt) -> Optional[DeclarationUnit]:
+        key = self.key_of(stmt)
+        return self.previous[key] if key in self.reusable else None
+
+    def number_bodies(self, statements):
+        # Los cuerpos reutilizados conservan su número (y con él sus nombres únicos); los
+        # nuevos toman números que nunca se usaron en este documento.
+        for stmt in statements:
+            functions = declared_functions(stmt)
+            if not functions:
+                continue
+            unit = self.reusable_unit(stmt)
+            if unit is not None:
+                ordinals = unit.ordinals
+            else:
+                ordinals = range(self.next_ordinal, self.next_ordinal + len(functions))
+                self.next_ordinal += len(functions)
+            for function_ctx, ordinal in zip(functions, ordinals):
+                self.body_ordinals[function_ctx] = ordinal
+
+    def collect_class(self, ctx):
+        stmt = ctx.parentCtx
+        unit = self.reusable_unit(stmt)
+        if unit is not None:
+            self.reinstate(stmt, unit)
+            return unit.signatures[0].symbol
+        symbol = super().collect_class(ctx)
+        self.remember_collected(stmt)
+        return symbol
+
+    def collect_function(self, ctx, class_symbol=None, member_names=None):
+        if class_symbol is not None:
+            return super().collect_function(ctx, class_symbol, member_names)
+        stmt = ctx.parentCtx
+        unit = self.reusable_unit(stmt)
+        if unit is not None:
+            self.reinstate(stmt, unit)
+            return unit.signatures[0].symbol
+        symbol = super().collect_function(ctx)
+        self.remember_collected(stmt)
+        return symbol
+
+    def remember_collected(self, stmt):
+        table = self.analyzer.symbol_table
+        signatures = [self.signatures.get(ctx) for ctx in unit_contexts(stmt)]
+        symbols = [signature.symbol for signature in signatures if signature is not None and signature.symbol]
+        class_info = None
+        if stmt.classDeclaration() and signatures[0].symbol is not None:
+            class_symbol = signatures[0].symbol
+            symbols.extend(class_symbol.attributes.values())
+            class_info = class_state(table, class_symbol)
+        collected = [(symbol, symbol.is_used, symbol.is_initialized) for symbol in symbols]
+        self.collected[self.key_of(stmt)] = (signatures, collected, class_info)
+
+    def reinstate(self, stmt, unit: DeclarationUnit):
+        table = self.analyzer.symbol_table
+        for symbol, used, initialized in unit.collected:
+            symbol.is_used, symbol.is_initialized = used, initialized
+        if unit.signatures[0].symbol is not None:
+            table.insert(unit.signatures[0].symbol)
+        if unit.collected_class is not None:
+            self.restore_class(unit.collected_class)
+        for ctx, signature in zip(unit_contexts(stmt), unit.signatures):
+            if signature is not None:
+                self.signatures[ctx] = replace(signature, ordinal=self.body_ordinals.get(ctx))
+        key = self.key_of(stmt)
+        self.collected[key] = (unit.signatures, unit.collected, unit.collected_class)
+        self.reinstated.add(key)
+
+    def restore_class(self, state: tuple):
+        table = self.analyzer.symbol_table
+        symbol, parent, layout, vtable, members, attributes, methods = state
+        self.analyzer.type_checker.register_class(symbol.name, parent)
+        for registry, value in ((table.class_layouts, layout), (table.class_vtables, vtable),
+                                (table.class_members, members)):
+            if value is not None:
+                registry[symbol.name] = value
+        if layout is not None:
+            symbol.size_bytes = layout.size_bytes
+        symbol.attributes.clear()
+        symbol.attributes.update(attributes)
+        symbol.methods.clear()
+        symbol.methods.update(methods)
+
+    def visit_top_level(self, stmt):
+        key = self.key_of(stmt)
+        unit = self.previous.get(key)
+        hoisted = is_hoisted(stmt)
+        # Las funciones y clases no dependen del estado del ámbito del programa: solo se
+        # reutilizan si su primera pasada también se reutilizó.
+        if hoisted:
+            reusable = key in self.reinstated
+        else:
+            reusable = unit is not None and unit.state_before == self.unit_state()
+        if reusable and not unit.names_used & self.dirty_names:
+            self.replay(unit)
+            self.reused += 1
+        else:
+            unit = self.analyze_unit(stmt, key)
+            self.dirty_names.update(unit.names_defined)
+            self.analyzed += 1
+        self.units[key] = unit
+
+    def analyze_unit(self, stmt, key: tuple) -> DeclarationUnit:
+        analyzer = self.analyzer
+        table = analyzer.symbol_table
+        scope = self.program_scope()
+        unit = DeclarationUnit(key, identifier_names(stmt), state_before=self.unit_state(), hoisted=is_hoisted(stmt))
+        if unit.hoisted:
+            unit.signatures, unit.collected, unit.collected_class = self.collected[key]
+            unit.ordinals = [self.body_ordinals[ctx] for ctx in declared_functions(stmt)]
+
+        present = {name for name in unit.names_used if name in scope.symbols}
+        outside = [table.peek(name) for name in unit.names_used if name not in scope.symbols]
+        watched = {}
+        for symbol in [symbol for symbol in outside if symbol is not None] + [scope.symbols[name] for name in present] \
+                + [symbol for symbol, _, _ in unit.collected]:
+            watched.setdefault(id(symbol), (symbol, symbol.is_used, symbol.is_initialized))
+        # Durante la unidad los símbolos vigilados se ven como no usados: así quedan registrados
+        # todos sus usos, no solo el primero, y se pueden volver a aplicar en cualquier orden.
+        for symbol, _, _ in watched.values():
+            symbol.is_used = False
+        marks = (len(self.tac_code), len(analyzer.errors), len(analyzer.warnings), len(table.errors),
+                 len(table.warnings), len(table.diagnostics), len(scope.children), self.position_index.mark())
+
+        self.marked = []
+        self.safe_visit(stmt)
+
+        tac, errors, warnings, table_errors, table_warnings, diagnostics, children, records = marks
+        unit.tac = [replace(instruction) for instruction in self.tac_code[tac:]]
+        unit.errors = analyzer.errors[errors:]
+        unit.warnings = analyzer.warnings[warnings:]
+        unit.table_errors = table.errors[table_errors:]
+        unit.table_warnings = table.warnings[table_warnings:]
+        unit.diagnostics = table.diagnostics[diagnostics:]
+        unit.scopes = scope.children[children:]
+        unit.records = self.position_index.records_since(records)
+        unit.effects = [(symbol, symbol.is_used, symbol.is_initialized and not initialized)
+                        for symbol, used, initialized in watched.values()
+                        if symbol.is_used or (symbol.is_initialized and not initialized)]
+        unit.effects.extend((symbol, True, False) for symbol in self.marked)
+        self.marked = None
+        for symbol, used, _ in watched.values():
+            symbol.is_used = symbol.is_used or used
+
+        if unit.hoisted:
+            name = declared_name(stmt)
+            unit.names_defined = [name] if name else []
+            unit.symbols = [unit.signatures[0].symbol] if unit.signatures[0].symbol is not None else []
+        else:
+            for name in sorted(unit.names_used - present):
+                symbol = scope.symbols.get(name)
+                if symbol is not None:
+                    unit.names_defined.append(name)
+                    unit.symbols.append(symbol)
+        for symbol in unit.symbols:
+            if symbol.symbol_type == SymbolType.CLASS:
+                unit.classes.append(class_state(table, symbol))
+        # Estado de uso de todo lo que declara la unidad, incluidos métodos y atributos, tal
+        # como quedó al terminarla; los símbolos de la primera pasada se reconstruyen con sus efectos.
+        pending = list(unit.scopes)
+        owned = [symbol for symbol in unit.symbols if id(symbol) not in watched]
+        while pending:
+            child = pending.pop()
+            owned.extend(symbol for symbol in child.symbols.values() if id(symbol) not in watched)
+            pending.extend(child.children)
+        unit.states = [(symbol, symbol.is_used, symbol.is_initialized) for symbol in owned]
+        unit.state_after = self.unit_state()
+        return unit
+
+    def replay(self, unit: DeclarationUnit):
+        analyzer = self.analyzer
+        table = analyzer.symbol_table
+        scope = self.program_scope()
+
+        for symbol, used, initialized in unit.states:
+            symbol.is_used, symbol.is_initialized = used, initialized
+        if not unit.hoisted:
+            for symbol in unit.symbols:
+                table.insert(symbol)
+        for child in unit.scopes:
+            child.parent_scope = scope
+            scope.children.append(child)
+        for state in unit.classes:
+            self.restore_class(state)
+
+        for symbol, used, initialized in unit.effects:
+            symbol = self.current_symbol(symbol)
+            if used:
+                symbol.is_used = True
+            if initialized:
+                symbol.is_initialized = True
+        for line, column, end_column, symbol, is_definition in unit.records:
+            self.position_index.add_record(line, column, end_column, self.current_symbol(symbol), is_definition)
+
+        self.tac_code.extend(replace(instruction) for instruction in unit.tac)
+        analyzer.errors.extend(unit.errors)
+        analyzer.warnings.extend(unit.warnings)
+        table.errors.extend(unit.table_errors)
+        table.warnings.extend(unit.table_warnings)
+        table.diagnostics.extend(unit.diagnostics)
+        if not unit.hoisted:
+            scope.local_next_offset, analyzer.unreachable_code = unit.state_after
+
+    def current_symbol(self, symbol):
+        # Las funciones integradas (nivel 0) se crean de nuevo en cada análisis.
+        if symbol.scope_level == 0:
+            return self.analyzer.symbol_table.global_scope.symbols.get(symbol.name, symbol)
+        return symbol
+
+
+class IncrementalAnalyzer:
+    # Conserva los resultados por declaración entre análisis sucesivos del mismo documento.
+    # Los contadores de temporales, etiquetas, nombres únicos y cuerpos solo avanzan, de modo
+    # que los fragmentos reutilizados nunca chocan con el código generado de nuevo.
+    def __init__(self):
+        self.units: Dict[tuple, DeclarationUnit] = {}
+        self.counters = (0, 0, 0, 0)
+        self.reused = 0
+        self.analyzed = 0
+
+    def analyze(self, tree: CompiscriptParser.ProgramContext) -> IncrementalVisitor:
+        statements = tree.statement() or []
+        keys = [unit_key(stmt) for stmt in statements]
+        current = set(keys)
+        dirty_names = set()
+        for key, unit in self.units.items():
+            if key not in current:
+                dirty_names.update(unit.names_defined)
+        for key, stmt in zip(keys, statements):
+            if key not in self.units:
+                name = declared_name(stmt)
+                if name:
+                    dirty_names.add(name)
+
+        # Con la primera pasada un cuerpo puede usar nombres declarados más abajo, así que la
+        # invalidación se propaga sobre todo el programa antes de empezar.
+        reusable = {key for key in keys if key in self.units}
+        changed = True
+        while changed:
+            changed = False
+            for key in list(reusable):
+                unit = self.units[key]
+                if unit.names_used & dirty_names:
+                    reusable.discard(key)
+                    dirty_names.update(unit.names_defined)
+                    changed = True
+
+        visitor = IncrementalVisitor(self.units, reusable, dirty_names, self.counters)
+        visitor.visit(tree)
+        self.units = visitor.units
+        self.counters = (visitor.temp_manager.global_counter, visitor.label_manager.counter,
+                         visitor.analyzer.variable_counter, visitor.next_ordinal)
+        self.reused, self.analyzed = visitor.reused, visitor.analyzed
+        return visitor
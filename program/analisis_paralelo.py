@@ -0,0 +1,292 @@
+import os
+import re
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional
+
+from antlr4 import InputStream, CommonTokenStream
+from CompiscriptLexer import CompiscriptLexer
+from CompiscriptParser import CompiscriptParser
+from analizador_semantico import CompiscriptSemanticVisitor, CompilationCancelled, function_bodies
+from analisis_incremental import identifier_names
+from tabla_simbolos import Scope
+
+BLANK = re.compile(r"[^\n]")
+
+# Costos medidos con benchmarks/benchmark_parallel.py, en segundos. Revisar un token de cuerpo en
+# serie cuesta BODY_COST; en un proceso cuesta WORKER_COST porque antes hay que volver a analizarlo
+# sintácticamente, y cada proceso tarda STARTUP_COST en arrancar e importar el analizador.
+BODY_COST = 27e-6
+WORKER_COST = 97e-6
+STARTUP_COST = 0.25
+POLL_SECONDS = 0.1
+
+
+@dataclass
+class BodyResult:
+    # Resultado de revisar un cuerpo en otro proceso. Los símbolos propios del cuerpo viajan
+    # junto con su ámbito; los externos se describen para encontrarlos en el proceso principal.
+    scope: Optional[Scope]
+    tac: list
+    messages: tuple
+    effects: list
+    records: list
+
+
+def parse_program(source: str) -> CompiscriptParser.ProgramContext:
+    parser = CompiscriptParser(CommonTokenStream(CompiscriptLexer(InputStream(source))))
+    parser.removeErrorListeners()
+    return parser.program()
+
+
+def declares_class(ctx) -> bool:
+    pending = [ctx]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, CompiscriptParser.ClassDeclarationContext):
+            return True
+        if node.getChildCount():
+            pending.extend(node.getChildren())
+    return False
+
+
+def weigh_bodies(statements) -> List[tuple]:
+    # Cuerpos repartibles con su número de tokens. Un cuerpo que declara una clase registra tipos
+    # globales, así que se revisa siempre en el proceso principal.
+    return [(ordinal, function_ctx.stop.tokenIndex - function_ctx.start.tokenIndex + 1)
+            for ordinal, function_ctx in enumerate(function_bodies(statements))
+            if not declares_class(function_ctx)]
+
+
+def parallel_jobs(weighted: List[tuple], jobs: int) -> int:
+    # Procesos que conviene usar: 1 (serial) si lo que se ahorra al repartir los cuerpos no paga
+    # el arranque de los procesos ni el análisis sintáctico que cada uno repite.
+    jobs = min(jobs, os.cpu_count() or 1)
+    if jobs < 2:
+        return 1
+    tokens = sum(weight for _, weight in weighted)
+    return jobs if tokens * (BODY_COST - WORKER_COST / jobs) > STARTUP_COST else 1
+
+
+def shard_bodies(weighted: List[tuple], jobs: int) -> List[List[int]]:
+    # Tramos contiguos de cuerpos con un número parecido de tokens.
+    total = sum(weight for _, weight in weighted)
+    shards: List[List[int]] = []
+    accumulated = 0
+    for ordinal, weight in weighted:
+        if not shards or (accumulated >= total * len(shards) / jobs and len(shards) < jobs):
+            shards.append([])
+        shards[-1].append(ordinal)
+        accumulated += weight
+    return shards
+
+
+def masked_source(source: str, statements, skipped: set) -> str:
+    # Cada proceso solo necesita los cuerpos de su tramo: los demás se vacían conservando los
+    # saltos de línea, así que las líneas y columnas del resto del programa no cambian.
+    pieces = []
+    position = 0
+    for ordinal, function_ctx in enumerate(function_bodies(statements)):
+        block = function_ctx.block()
+        if ordinal not in skipped or block is None:
+            continue
+        start, end = block.start.start + 1, block.stop.start
+        pieces.append(source[position:start])
+        pieces.append(BLANK.sub(" ", source[start:end]))
+        position = end
+    pieces.append(source[position:])
+    return "".join(pieces)
+
+
+class SymbolLocator:
+    # Describe un símbolo externo por su posición en la pila de ámbitos o como miembro de clase.
+    def __init__(self, symbol_table):
+        self.symbol_table = symbol_table
+        self.members: Optional[Dict[int, tuple]] = None
+
+    def describe(self, symbol) -> Optional[tuple]:
+        for depth, scope in enumerate(self.symbol_table.scope_stack):
+            if scope.symbols.get(symbol.name) is symbol:
+                return ("scope", depth, symbol.name)
+        if self.members is None:
+            self.members = {id(member): (class_name, member_name)
+                            for class_name, members in self.symbol_table.class_members.items()
+                            for member_name, (owner, member) in members.items() if owner == class_name}
+        member = self.members.get(id(symbol))
+        return ("member",) + member if member else None
+
+    def resolve(self, descriptor: tuple):
+        if descriptor[0] == "scope":
+            _, depth, name = descriptor
+            return self.symbol_table.scope_stack[depth].symbols.get(name)
+        _, class_name, member_name = descriptor
+        member = self.symbol_table.find_class_member(class_name, member_name)
+        return member[1] if member else None
+
+
+class BodyWorkerVisitor(CompiscriptSemanticVisitor):
+    # Recorre todo el programa, pero de los cuerpos repartidos solo revisa los de su tramo.
+    # Las declaraciones de nivel superior se analizan igual que en el proceso principal, de modo
+    # que cada cuerpo se revisa con el mismo estado de la tabla que tendría en la pasada serial.
+    def __init__(self, parallel: frozenset, shard: frozenset):
+        super().__init__()
+        self.parallel = parallel
+        self.shard = shard
+        self.results: Dict[int, BodyResult] = {}
+        self.marked: Optional[list] = None
+
+    def mark_used(self, symbol):
+        super().mark_used(symbol)
+        if self.marked is not None:
+            self.marked.append(symbol)
+
+    def check_function_body(self, ctx, ordinal, symbol, parameters, param_array_info,
+                            func_start_label, func_end_label):
+        if ordinal not in self.parallel:
+            return super().check_function_body(ctx, ordinal, symbol, parameters, param_array_info,
+                                               func_start_label, func_end_label)
+        if ordinal not in self.shard:
+            self.current_scope_name = "global"
+            return None
+
+        table = self.analyzer.symbol_table
+        outer = table.scope_stack[-1]
+        watched = {}
+        for name in identifier_names(ctx):
+            visible = table.peek(name)
+            if visible is not None:
+                watched.setdefault(id(visible), (visible, visible.is_used))
+        for visible, _ in watched.values():
+            visible.is_used = False
+        tac, messages, children, records = (len(self.tac_code), self.message_marks(),
+                                            len(outer.children), self.position_index.mark())
+
+        self.marked = []
+        super().check_function_body(ctx, ordinal, symbol, parameters, param_array_info,
+                                    func_start_label, func_end_label)
+
+        scope = outer.children[children] if len(outer.children) > children else None
+        local = set()
+        pending = [scope] if scope is not None else []
+        while pending:
+            child = pending.pop()
+            local.update(id(owned) for owned in child.symbols.values())
+            pending.extend(child.children)
+        used = [visible for visible, _ in watched.values() if visible.is_used]
+        used.extend(member for member in self.marked if id(member) not in local)
+        for visible, was_used in watched.values():
+            visible.is_used = visible.is_used or was_used
+        self.marked = None
+
+        locator = SymbolLocator(table)
+        effects = [descriptor for descriptor in map(locator.describe, used) if descriptor is not None]
+        body_records = []
+        for line, column, end_column, target, is_definition in self.position_index.records_since(records):
+            target = target if id(target) in local else locator.describe(target)
+            if target is not None:
+                body_records.append((line, column, end_column, target, is_definition))
+        if scope is not None:
+            scope.parent_scope = None
+        # Copias: al terminar el programa el desvirtualizador reescribe las instrucciones en sitio.
+        self.results[ordinal] = BodyResult(scope, [replace(instruction) for instruction in self.tac_code[tac:]],
+                                           self.take_messages(messages), effects, body_records)
+        return None
+
+
+def check_bodies(source: str, parallel: frozenset, shard: frozenset) -> Dict[int, BodyResult]:
+    visitor = BodyWorkerVisitor(parallel, shard)
+    visitor.visit(parse_program(source))
+    return visitor.results
+
+
+class ParallelVisitor(CompiscriptSemanticVisitor):
+    # Pasada principal: en lugar de revisar los cuerpos repartidos espera el resultado de su
+    # proceso y lo inserta en el mismo punto, con lo que el TAC, los mensajes, el árbol de
+    # ámbitos y el índice de posiciones quedan idénticos a los del análisis serial.
+    def __init__(self, futures: Dict[int, Future]):
+        super().__init__()
+        self.futures = futures
+
+    def check_function_body(self, ctx, ordinal, symbol, parameters, param_array_info,
+                            func_start_label, func_end_label):
+        future = self.futures.get(ordinal)
+        if future is None:
+            return super().check_function_body(ctx, ordinal, symbol, parameters, param_array_info,
+                                               func_start_label, func_end_label)
+        self.splice(symbol, self.wait(future)[ordinal])
+        return None
+
+    def wait(self, future: Future) -> Dict[int, BodyResult]:
+        # Espera por tramos para atender la cancelación aunque el proceso siga revisando cuerpos.
+        while True:
+            if self.cancelled is not None and self.cancelled.is_set():
+                for pending in self.futures.values():
+                    pending.cancel()
+                raise CompilationCancelled()
+            try:
+                return future.result(timeout=POLL_SECONDS)
+            except TimeoutError:
+                pass
+
+    def splice(self, symbol, result: BodyResult):
+        table = self.analyzer.symbol_table
+        locator = SymbolLocator(table)
+        if result.scope is not None:
+            table.adopt_scope(result.scope)
+            # Los desplazamientos de los parámetros de la firma se calculan al entrar al ámbito.
+            table.assign_parameter_offsets(
+                Scope(result.scope.scope_name, result.scope.scope_level, result.scope.context_type), symbol)
+        self.tac_code.extend(result.tac)
+        self.report_messages(result.messages)
+        for descriptor in result.effects:
+            target = locator.resolve(descriptor)
+            if target is not None:
+                target.is_used = True
+        for line, column, end_column, target, is_definition in result.records:
+            if isinstance(target, tuple):
+                target = locator.resolve(target)
+            if target is not None:
+                self.position_index.add_record(line, column, end_column, target, is_definition)
+        self.current_scope_name = "global"
+
+
+def analyze_parallel(source: str, tree: CompiscriptParser.ProgramContext, jobs: int,
+                     cancelled=None) -> CompiscriptSemanticVisitor:
+    weighted = weigh_bodies(tree.statement() or [])
+    jobs = parallel_jobs(weighted, jobs)
+    shards = shard_bodies(weighted, jobs) if jobs > 1 else []
+    if not shards:
+        visitor = CompiscriptSemanticVisitor()
+        visitor.cancelled = cancelled
+        visitor.visit(tree)
+        return visitor
+    return check_shards(source, tree, shards, cancelled)
+
+
+def check_shards(source: str, tree: CompiscriptParser.ProgramContext, shards: List[List[int]],
+                 cancelled=None) -> ParallelVisitor:
+    # Sin fork: el analizador también corre dentro de servidores con varios hilos, y un proceso
+    # copiado a mitad de otro análisis hereda sus locks. Cada proceso reanaliza su propia copia.
+    statements = tree.statement()
+    parallel = frozenset(ordinal for shard in shards for ordinal in shard)
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    pool = ProcessPoolExecutor(max_workers=len(shards), mp_context=context)
+    finished = False
+    try:
+        futures = {}
+        for shard in shards:
+            shard = frozenset(shard)
+            shard_source = masked_source(source, statements, parallel - shard)
+            future = pool.submit(check_bodies, shard_source, parallel, shard)
+            for ordinal in shard:
+                futures[ordinal] = future
+        visitor = ParallelVisitor(futures)
+        visitor.cancelled = cancelled
+        visitor.visit(tree)
+        finished = True
+    finally:
+        # Si el análisis se cancela o falla no se espera a los procesos que siguen ocupados.
+        pool.shutdown(wait=finished, cancel_futures=not finished)
+    return visitor
@@ -1,13 +1,21 @@
-from typing import List, Optional
-from dataclasses import dataclass
+import re
+from typing import Dict, List, Optional
+from dataclasses import dataclass, field
 
 from sistema_tipos import TypeChecker
-from tabla_simbolos import CompiscriptSymbolTable, DataType, ContextType, SymbolType, Symbol
+from tabla_simbolos import CompiscriptSymbolTable, DataType, ContextType, SymbolType, Symbol, AttributeSymbol
 from managers import TempManager, LabelManager
 
 from CompiscriptParser import CompiscriptParser
 from CompiscriptVisitor import CompiscriptVisitor
 from managers import ActivationManager
+from programa_tac import devirtualize
+from indice_posiciones import PositionIndex
+
+class CompilationCancelled(BaseException):
+    # Como asyncio.CancelledError, no hereda de Exception: los safe_visit anidados no la
+    # registran como error y la cancelación sale del análisis completo.
+    pass
 
 @dataclass
 class SemanticError:
@@ -19,6 +27,36 @@ class SemanticError:
     def __str__(self) -> str:
         return f"Error Semántico [Línea {self.line}, Columna {self.column}]: {self.message}"
 
+@dataclass
+class Signature:
+    # Resultado de la primera pasada para una función, método o clase de nivel superior.
+    symbol: Optional[Symbol]
+    ordinal: Optional[int] = None
+    parameters: list = field(default_factory=list)
+    param_array_info: dict = field(default_factory=dict)
+    deferred: tuple = ()
+
+LITERAL_TYPES = (
+    (re.compile(r"^-?\d+$"), "integer"),
+    (re.compile(r'^".*"$', re.S), "string"),
+    (re.compile(r"^(true|false)$"), "boolean"),
+)
+NEW_EXPR_PATTERN = re.compile(r"^new([A-Za-z_][A-Za-z0-9_]*)\(")
+
+
+def declared_functions(stmt) -> list:
+    # Funciones cuyo cuerpo se revisa de forma independiente: las de nivel superior y los métodos.
+    if stmt.functionDeclaration():
+        return [stmt.functionDeclaration()]
+    if stmt.classDeclaration():
+        return [member.functionDeclaration() for member in stmt.classDeclaration().classMember()
+                if member.functionDeclaration()]
+    return []
+
+def function_bodies(statements) -> list:
+    # Cuerpos en orden de código; la posición en la lista es el número del cuerpo.
+    return [function_ctx for stmt in statements for function_ctx in declared_functions(stmt)]
+
 @dataclass
 class TACInstruction:
     op: str
@@ -44,6 +82,8 @@ class TACInstruction:
             return f"PushParam {self.arg1}"
         elif self.op == "LCall":
             return f"{self.result} = LCall {self.arg1}"
+        elif self.op == "VCall":
+            return f"{self.result} = VCall {self.arg1}, {self.arg2}"
         elif self.op == "PopParams":
             return f"PopParams {self.arg1}"
         elif self.op == "BeginFunc":
@@ -65,6 +105,10 @@ class TACInstruction:
             return f"{self.result} = {self.arg1}[{self.arg2}]"
         elif self.op == "[]=":
             return f"{self.result}[{self.arg1}] = {self.arg2}"
+        elif self.op == "getfield":
+            return f"{self.result} = getfield {self.arg1}, {self.arg2}"
+        elif self.op == "setfield":
+            return f"setfield {self.result}, {self.arg1}, {self.arg2}"
         elif self.op == "new_array":
             return f"{self.result} = new_array[{self.arg1}]"
         elif self.op == "length":
@@ -77,6 +121,28 @@ class TACInstruction:
         else:
             return f"{self.result} = {self.arg1} {self.op} {self.arg2 or ''}"
 
+def format_tac(instructions) -> str:
+    lines = ["", "="*60, " CÓDIGO TAC GENERADO", "="*60]
+    if not instructions:
+        lines.append("No se generó código TAC.")
+        return "\n".join(lines) + "\n"
+    
+    current_function = "global"
+    for i, instruction in enumerate(instructions):
+        if instruction.op == "BeginFunc":
+            if current_function != "global":
+                lines.append("")
+            current_function = instruction.result
+        
+        lines.append(f"{i:3}: {instruction}")
+        
+        if instruction.op == "EndFunc":
+            current_function = "global"
+    
+    lines.extend(["="*60, f"Total de instrucciones: {len(instructions)}", "="*60])
+    return "\n".join(lines) + "\n"
+
+
 class SemanticAnalyzer:
     def __init__(self):
         self.type_checker = TypeChecker()
@@ -92,6 +158,7 @@ class SemanticAnalyzer:
 
         self.function_ctx_stack: List[tuple] = []
         self.variable_counter = 0
+        self.name_suffix = ""
         self.loop_depth = 0
         self.switch_depth = 0 
         
@@ -105,7 +172,7 @@ class SemanticAnalyzer:
         "print", DataType.VOID, [("message", DataType.STRING)], 0, 0, None)
     
     def get_unique_name(self, var_name: str) -> str:
-        unique_name = f"{var_name}_{self.variable_counter}"
+        unique_name = f"{var_name}_{self.variable_counter}{self.name_suffix}"
         self.variable_counter += 1
         return unique_name
         
@@ -132,8 +199,13 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
         self.temp_manager = TempManager()
         self.label_manager = LabelManager()
         self.tac_code: List[TACInstruction] = []
+        self.devirtualized_calls = 0
         self.current_scope_name = "global"
         self.activation_manager = ActivationManager()
+        self.position_index = PositionIndex(self.analyzer.symbol_table)
+        self.signatures: Dict[object, Signature] = {}
+        self.body_ordinals: Dict[object, int] = {}
+        self.cancelled = None
         
     def emit_tac(self, op: str, arg1: Optional[str], arg2: Optional[str], result: str, line: Optional[int] = None) -> TACInstruction:
         instruction = TACInstruction(op, arg1, arg2, result, line)
@@ -167,29 +239,7 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
     
     def print_tac(self, filename="codigo_tac.txt"):
         with open(filename, 'w', encoding='utf-8') as f:
-            f.write("\n" + "="*60 + "\n")
-            f.write(" CÓDIGO TAC GENERADO\n")
-            f.write("="*60 + "\n")
-            
-            if not self.tac_code:
-                f.write("No se generó código TAC.\n")
-                return
-            
-            current_function = "global"
-            for i, instruction in enumerate(self.tac_code):
-                if instruction.op == "BeginFunc":
-                    if current_function != "global":
-                        f.write("\n")
-                    current_function = instruction.result
-                
-                f.write(f"{i:3}: {instruction}\n")
-                
-                if instruction.op == "EndFunc":
-                    current_function = "global"
-            
-            f.write("="*60 + "\n")
-            f.write(f"Total de instrucciones: {len(self.tac_code)}\n")
-            f.write("="*60 + "\n")
+            f.write(format_tac(self.tac_code))
     
     def check_dead_code(self, ctx, statement_type="declaración"):
         if self.analyzer.unreachable_code:
@@ -215,40 +265,212 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
     
     def reset_reachability_in_scope(self):
         self.analyzer.unreachable_code = False
+
+    def record_definition(self, node, symbol):
+        if node is not None and symbol is not None:
+            self.position_index.add_definition(node.getSymbol(), symbol)
+
+    def record_reference(self, node, symbol):
+        if node is not None and symbol is not None:
+            self.position_index.add_reference(node.getSymbol(), symbol)
+
+    def mark_used(self, symbol):
+        symbol.is_used = True
+
+    def scope_span(self, ctx) -> tuple:
+        stop = ctx.stop or ctx.start
+        end_column = stop.column + len(stop.text or "")
+        return (ctx.start.line, ctx.start.column, stop.line, end_column)
     
     def visitProgram(self, ctx: CompiscriptParser.ProgramContext):
-        self.analyzer.symbol_table.enter_scope("global", ContextType.GLOBAL)
+        self.analyzer.symbol_table.enter_scope("global", ContextType.GLOBAL, self.scope_span(ctx))
         self.current_scope_name = "global"
         
         
         self.emit_label("PROGRAM_START")
         
         if ctx.statement():
+            self.collect_declarations(ctx.statement())
             for stmt in ctx.statement():
-                self.safe_visit(stmt)
+                self.visit_top_level(stmt)
         
         
         self.emit_label("PROGRAM_END")
         
         self.analyzer.symbol_table.exit_scope()
+        self.analyzer.symbol_table.report_unused_attributes()
         
-        total_errors = self.analyzer.get_total_errors()
-        total_warnings = len(self.analyzer.symbol_table.get_warnings())
-        
-        errors = self.analyzer.symbol_table.get_errors()
-        if errors:
-            print("\nErrores semanticos")
-            for i, error in enumerate(errors, 1):
-                print(f"{i}. {error}")
-        
-        print(f"Errores: {total_errors}, Warnings: {total_warnings}")
+        self.devirtualized_calls = devirtualize(self.tac_code, self.analyzer.symbol_table)
         return None
     
+    def visit_top_level(self, stmt):
+        return self.safe_visit(stmt)
+
+    def collect_declarations(self, statements):
+        # Primera pasada: firmas de clases (con sus miembros) y de funciones antes de revisar
+        # cualquier cuerpo, de modo que una función puede llamar a otra declarada más abajo.
+        self.number_bodies(statements)
+        for class_ctx in self.class_order(statements):
+            self.collect_class(class_ctx)
+        for stmt in statements:
+            if stmt.functionDeclaration():
+                self.collect_function(stmt.functionDeclaration())
+
+    def class_order(self, statements) -> list:
+        # Cada clase se recolecta después de su padre aunque este se declare más abajo, así su
+        # layout y su vtable parten de los del padre. En un ciclo se conserva el orden del código.
+        classes = [stmt.classDeclaration() for stmt in statements if stmt.classDeclaration()]
+        by_name = {}
+        for class_ctx in classes:
+            by_name.setdefault(class_ctx.Identifier(0).getText(), class_ctx)
+        ordered = []
+        placed = set()
+        for class_ctx in classes:
+            chain = []
+            while class_ctx is not None and class_ctx not in placed:
+                placed.add(class_ctx)
+                chain.append(class_ctx)
+                parent = class_ctx.Identifier(1) if len(class_ctx.Identifier()) > 1 else None
+                class_ctx = by_name.get(parent.getText()) if parent else None
+            ordered.extend(reversed(chain))
+        return ordered
+
+    def number_bodies(self, statements):
+        for ordinal, function_ctx in enumerate(function_bodies(statements)):
+            self.body_ordinals[function_ctx] = ordinal
+
+    def message_marks(self) -> tuple:
+        analyzer = self.analyzer
+        return tuple(len(items) for items in (analyzer.errors, analyzer.warnings, analyzer.symbol_table.errors,
+                                               analyzer.symbol_table.warnings, analyzer.symbol_table.diagnostics))
+
+    def take_messages(self, marks: tuple) -> tuple:
+        # Los mensajes de la primera pasada se reportan al visitar la declaración, en orden de código.
+        analyzer = self.analyzer
+        taken = []
+        for items, mark in zip((analyzer.errors, analyzer.warnings, analyzer.symbol_table.errors,
+                                analyzer.symbol_table.warnings, analyzer.symbol_table.diagnostics), marks):
+            taken.append(items[mark:])
+            del items[mark:]
+        return tuple(taken)
+
+    def report_deferred(self, signature: Signature):
+        self.report_messages(signature.deferred)
+
+    def report_messages(self, messages: tuple):
+        analyzer = self.analyzer
+        for items, taken in zip((analyzer.errors, analyzer.warnings, analyzer.symbol_table.errors,
+                                 analyzer.symbol_table.warnings, analyzer.symbol_table.diagnostics), messages):
+            items.extend(taken)
+
+    def collect_function(self, ctx: CompiscriptParser.FunctionDeclarationContext, class_symbol=None,
+                         member_names: Optional[set] = None):
+        table = self.analyzer.symbol_table
+        func_name = ctx.Identifier().getText()
+        line = ctx.start.line
+        column = ctx.start.column
+        marks = self.message_marks()
+
+        return_type, array_element_type, parameters, param_array_info = self.function_signature(ctx)
+        symbol = None
+        if class_symbol is None:
+            if table.declare_function(func_name, return_type, parameters, line, column, array_element_type):
+                symbol = table.peek(func_name)
+        elif func_name in member_names:
+            table.add_error(f"Función '{func_name}' ya está declarada", line, column)
+        else:
+            member_names.add(func_name)
+            symbol = table.build_function_symbol(func_name, return_type, parameters, line, column, array_element_type)
+            if symbol is not None:
+                for param_symbol in symbol.parameters:
+                    param_symbol.scope_level += 1
+                class_symbol.methods[func_name] = symbol
+
+        self.signatures[ctx] = Signature(symbol, self.body_ordinals.get(ctx), parameters, param_array_info,
+                                         self.take_messages(marks))
+        return symbol
+
+    def collect_class(self, ctx: CompiscriptParser.ClassDeclarationContext):
+        table = self.analyzer.symbol_table
+        class_name = ctx.Identifier(0).getText()
+        parent_class = ctx.Identifier(1).getText() if len(ctx.Identifier()) > 1 else None
+        line = ctx.start.line
+        column = ctx.start.column
+        marks = self.message_marks()
+
+        class_symbol = None
+        parent_symbol = table.peek(parent_class) if parent_class else None
+        if parent_class and (not parent_symbol or parent_symbol.symbol_type != SymbolType.CLASS):
+            self.analyzer.add_error(line, column,
+                f"Clase padre '{parent_class}' no existe o no es una clase")
+        elif table.declare_class(class_name, parent_class, line, column):
+            class_symbol = table.peek(class_name)
+            self.analyzer.type_checker.register_class(class_name, parent_class)
+            member_names = {"this"}
+            for member in ctx.classMember():
+                if member.functionDeclaration():
+                    self.collect_function(member.functionDeclaration(), class_symbol, member_names)
+                else:
+                    self.collect_attribute(member.variableDeclaration() or member.constantDeclaration(),
+                                           class_symbol, member_names)
+            table.compute_class_layout(class_symbol)
+            table.compute_class_vtable(class_symbol)
+            table.build_member_index(class_symbol)
+
+        self.signatures[ctx] = Signature(class_symbol, deferred=self.take_messages(marks))
+        return class_symbol
+
+    def collect_attribute(self, ctx, class_symbol, member_names: set):
+        # Solo reserva el slot y el tipo del atributo; su inicializador se revisa con la clase.
+        attr_name = ctx.Identifier().getText()
+        if attr_name in member_names:
+            return None
+        member_names.add(attr_name)
+        type_name = self.static_type(ctx)
+        declared = self.analyzer.type_checker.intern(type_name) if type_name else None
+        array_element_type = None
+        class_type = None
+        if declared is None:
+            data_type = DataType.VOID
+        elif declared.is_array:
+            data_type, array_element_type = DataType.ARRAY, declared.element.data_type
+        elif declared.is_class:
+            data_type, class_type = DataType.CLASS_TYPE, type_name
+        else:
+            data_type = declared.data_type or DataType.VOID
+        symbol = AttributeSymbol(
+            name=attr_name,
+            symbol_type=SymbolType.CONSTANT if isinstance(ctx, CompiscriptParser.ConstantDeclarationContext) else SymbolType.VARIABLE,
+            data_type=data_type,
+            scope_level=self.analyzer.symbol_table.current_scope_level + 1,
+            line_number=ctx.start.line,
+            column_number=ctx.start.column,
+            array_element_type=array_element_type,
+            class_type=class_type,
+            value=class_type
+        )
+        class_symbol.attributes[attr_name] = symbol
+        return symbol
+
+    def static_type(self, ctx) -> Optional[str]:
+        if ctx.typeAnnotation():
+            return self.safe_visit(ctx.typeAnnotation())
+        expression = ctx.expression() if isinstance(ctx, CompiscriptParser.ConstantDeclarationContext) else (
+            ctx.initializer().expression() if ctx.initializer() else None)
+        if expression is None:
+            return None
+        text = expression.getText()
+        for pattern, type_name in LITERAL_TYPES:
+            if pattern.match(text):
+                return type_name
+        match = NEW_EXPR_PATTERN.match(text)
+        return match.group(1) if match else None
+
     def visitStatement(self, ctx: CompiscriptParser.StatementContext):
         return self.visitChildren(ctx)
     
     def visitBlock(self, ctx: CompiscriptParser.BlockContext):
-        self.analyzer.symbol_table.enter_scope("block", ContextType.GLOBAL)
+        self.analyzer.symbol_table.enter_scope("block", ContextType.GLOBAL, self.scope_span(ctx))
         self.push_reachability_state()
         
         if ctx.statement():
@@ -267,24 +489,51 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
         line = ctx.start.line
         column = ctx.start.column
 
+        signature = self.signatures.get(ctx)
+        if signature is None:
+            return_type, array_element_type, parameters, param_array_info = self.function_signature(ctx)
+            success = self.analyzer.symbol_table.declare_function(
+                func_name, return_type, parameters, line, column, array_element_type)
+            if not success:
+                return None
+            symbol = self.analyzer.symbol_table.peek(func_name)
+        else:
+            self.report_deferred(signature)
+            symbol = signature.symbol
+            if symbol is None:
+                return None
+            if self.analyzer.symbol_table.lookup_current_scope(func_name) is not symbol:
+                # Los métodos se recolectan sin ámbito de clase: se insertan al visitar la clase.
+                if not self.analyzer.symbol_table.insert(symbol):
+                    self.analyzer.symbol_table.add_error(f"Función '{func_name}' ya está declarada", line, column)
+                    return None
+            parameters, param_array_info = signature.parameters, signature.param_array_info
+        self.record_definition(ctx.Identifier(), symbol)
+
+        func_start_label, func_end_label = self.label_manager.new_function_labels(func_name)
+        ordinal = signature.ordinal if signature is not None else None
+        self.check_function_body(ctx, ordinal, symbol, parameters, param_array_info, func_start_label, func_end_label)
+        return None
+
+    def function_signature(self, ctx: CompiscriptParser.FunctionDeclarationContext) -> tuple:
+        line = ctx.start.line
+        column = ctx.start.column
         
         array_element_type = None
         if ctx.type_():
             return_type_str = self.safe_visit(ctx.type_())
             
-            if return_type_str and return_type_str.endswith("[]"):
-                base_type = return_type_str[:-2]  
-                try:
-                    array_element_type = DataType(base_type)
+            declared = self.analyzer.type_checker.intern(return_type_str) if return_type_str else None
+            if declared and declared.is_array:
+                array_element_type = declared.element.data_type
+                if array_element_type is not None:
                     return_type = DataType.ARRAY
-                except ValueError:
-                    self.analyzer.add_error(line, column, f"Tipo de retorno de array inválido: '{base_type}'")
+                else:
+                    self.analyzer.add_error(line, column, f"Tipo de retorno de array inválido: '{declared.element.name}'")
                     return_type = DataType.VOID
-                    array_element_type = None
             else:
-                try:
-                    return_type = DataType(return_type_str)
-                except ValueError:
+                return_type = declared.data_type if declared else None
+                if return_type is None:
                     self.analyzer.add_error(line, column, f"Tipo de retorno inválido: '{return_type_str}'")
                     return_type = DataType.VOID
         else:
@@ -301,20 +550,19 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
                 if param.type_():
                     param_type_str = self.safe_visit(param.type_())
                     
-                    if param_type_str and param_type_str.endswith("[]"):
-                        base_type = param_type_str[:-2]
-                        try:
-                            param_array_element_type = DataType(base_type)
+                    declared = self.analyzer.type_checker.intern(param_type_str) if param_type_str else None
+                    if declared and declared.is_array:
+                        param_array_element_type = declared.element.data_type
+                        if param_array_element_type is not None:
                             param_type = DataType.ARRAY
                             param_array_info[param_name] = param_array_element_type
-                        except ValueError:
+                        else:
                             self.analyzer.add_error(param.start.line, param.start.column,
-                                                    f"Tipo de elemento de array inválido en parámetro: '{base_type}'")
+                                                    f"Tipo de elemento de array inválido en parámetro: '{declared.element.name}'")
                             param_type = DataType.INTEGER
                     else:
-                        try:
-                            param_type = DataType(param_type_str)
-                        except ValueError:
+                        param_type = declared.data_type if declared else None
+                        if param_type is None:
                             self.analyzer.add_error(param.start.line, param.start.column,
                                                     f"Tipo de parámetro inválido: '{param_type_str}'")
                             param_type = DataType.INTEGER
@@ -323,16 +571,24 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
                 
                 parameters.append((param_name, param_type))
 
-        success = self.analyzer.symbol_table.declare_function(
-            func_name, return_type, parameters, line, column, array_element_type)
-                
-        if not success:
-            return None
+        return return_type, array_element_type, parameters, param_array_info
 
-        
-        func_start_label, func_end_label = self.label_manager.new_function_labels(func_name)
+    def check_function_body(self, ctx, ordinal: Optional[int], symbol: Symbol, parameters: list,
+                            param_array_info: dict, func_start_label: str, func_end_label: str):
+        # Los cuerpos recolectados en la primera pasada numeran temporales, etiquetas y nombres
+        # únicos por su cuenta, así el resultado no depende del orden en que se revisan.
+        saved = None
+        if ordinal is not None:
+            saved = (self.temp_manager, self.label_manager,
+                     self.analyzer.variable_counter, self.analyzer.name_suffix)
+            self.temp_manager, self.label_manager = TempManager(), LabelManager()
+            self.analyzer.variable_counter, self.analyzer.name_suffix = 0, f"f{ordinal}"
+
+        func_name = symbol.name
+        return_type = symbol.return_type
+        line = ctx.start.line
+        column = ctx.start.column
 
-        
         self.emit_label(func_start_label)
         self.emit_tac("BeginFunc", str(len(parameters)), None, func_name, line)
 
@@ -342,7 +598,7 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
         prev_context = (self.analyzer.current_function, self.analyzer.return_found)
         self.analyzer.function_ctx_stack.append(prev_context)
 
-        self.analyzer.symbol_table.enter_scope(func_name, ContextType.FUNCTION)
+        self.analyzer.symbol_table.enter_scope(func_name, ContextType.FUNCTION, self.scope_span(ctx))
         self.analyzer.current_function = func_name
         self.analyzer.return_found = False
         self.current_scope_name = func_name
@@ -355,12 +611,14 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
 
         
         param_offset = 0
-        for param_name, param_type in parameters:
+        param_nodes = [param.Identifier() for param in ctx.parameters().parameter()] if ctx.parameters() else []
+        for (param_name, param_type), param_node in zip(parameters, param_nodes):
             param_array_element_type = param_array_info.get(param_name, None)
             
             self.analyzer.symbol_table.declare_variable(
                 param_name, param_type, line, column, False, None, param_array_element_type
             )
+            self.record_definition(param_node, self.analyzer.symbol_table.lookup_current_scope(param_name))
             
             
             self.emit_tac("LoadParam", str(param_offset), None, param_name, line)
@@ -404,7 +662,9 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
             self.analyzer.return_found = False
 
         self.current_scope_name = "global"
-        return None
+        if saved is not None:
+            (self.temp_manager, self.label_manager,
+             self.analyzer.variable_counter, self.analyzer.name_suffix) = saved
 
     def visitParameters(self, ctx: CompiscriptParser.ParametersContext):
         return self.visitChildren(ctx)
@@ -425,13 +685,13 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
         declared_type = None
         if ctx.typeAnnotation():
             declared_type = self.safe_visit(ctx.typeAnnotation())
-            if declared_type and declared_type.endswith("[]"):
-                base_type = declared_type[:-2]  
-                try:
-                    array_element_type = DataType(base_type)
+            declared = self.analyzer.type_checker.intern(declared_type) if declared_type else None
+            if declared and declared.is_array:
+                array_element_type = declared.element.data_type
+                if array_element_type is not None:
                     declared_type = "array"  
-                except ValueError:
-                    self.analyzer.add_error(line, column, f"Tipo de elemento de array inválido: '{base_type}'")
+                else:
+                    self.analyzer.add_error(line, column, f"Tipo de elemento de array inválido: '{declared.element.name}'")
                     return None
         
         init_type = None
@@ -471,9 +731,8 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
             if not success:
                 return None
         else:
-            try:
-                data_type_enum = DataType(declared_type)
-            except ValueError:
+            data_type_enum = self.analyzer.type_checker.intern(declared_type).data_type
+            if data_type_enum is None:
                 self.analyzer.add_error(
                     line, column,
                     f"Tipo inválido: '{declared_type}'",
@@ -489,8 +748,9 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
 
         
         unique_name = self.analyzer.get_unique_name(var_name)
-        symbol = self.analyzer.symbol_table.lookup(var_name)
+        symbol = self.analyzer.symbol_table.peek(var_name)
         symbol.unique_name = unique_name
+        self.record_definition(ctx.Identifier(), symbol)
         
         if ctx.initializer() and init_place:
             self.emit_tac("=", init_place, None, unique_name, line)
@@ -528,7 +788,7 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
         if not type_name or type_name in ["error", "null"]:
             return False
         
-        symbol = self.analyzer.symbol_table.lookup(type_name)
+        symbol = self.analyzer.symbol_table.peek(type_name)
         return symbol is not None and symbol.symbol_type == SymbolType.CLASS
     
     def visitConstantDeclaration(self, ctx: CompiscriptParser.ConstantDeclarationContext):
@@ -552,13 +812,13 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
         if ctx.typeAnnotation():
             declared_type = self.safe_visit(ctx.typeAnnotation())
             
-            if declared_type and declared_type.endswith("[]"):
-                base_type = declared_type[:-2]  
-                try:
-                    array_element_type = DataType(base_type)
+            declared = self.analyzer.type_checker.intern(declared_type) if declared_type else None
+            if declared and declared.is_array:
+                array_element_type = declared.element.data_type
+                if array_element_type is not None:
                     declared_type = "array"  
-                except ValueError:
-                    self.analyzer.add_error(line, column, f"Tipo de elemento de array inválido: '{base_type}'")
+                else:
+                    self.analyzer.add_error(line, column, f"Tipo de elemento de array inválido: '{declared.element.name}'")
                     return None
         
         init_type = self.safe_visit(ctx.expression())
@@ -576,9 +836,8 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
                 )
                 return None
         
-        try:
-            data_type_enum = DataType(declared_type)
-        except ValueError:
+        data_type_enum = self.analyzer.type_checker.intern(declared_type).data_type if declared_type else None
+        if data_type_enum is None:
             self.analyzer.add_error(
                 line, column,
                 f"Tipo inválido: '{declared_type}'",
@@ -595,8 +854,9 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
         
         
         unique_name = self.analyzer.get_unique_name(const_name)
-        symbol = self.analyzer.symbol_table.lookup(const_name)
+        symbol = self.analyzer.symbol_table.peek(const_name)
         symbol.unique_name = unique_name
+        self.record_definition(ctx.Identifier(), symbol)
         
         if init_place:
             self.emit_tac("=", init_place, None, unique_name, line)
@@ -664,7 +924,7 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
     def visitWhileStatement(self, ctx: CompiscriptParser.WhileStatementContext):
         line = ctx.start.line        
         
-        self.analyzer.symbol_table.enter_scope("while", ContextType.LOOP)
+        self.analyzer.symbol_table.enter_scope("while", ContextType.LOOP, self.scope_span(ctx))
         self.analyzer.loop_depth += 1
         
         
@@ -711,7 +971,7 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
     def visitDoWhileStatement(self, ctx: CompiscriptParser.DoWhileStatementContext):
         line = ctx.start.line
         
-        self.analyzer.symbol_table.enter_scope("do-while", ContextType.LOOP)
+        self.analyzer.symbol_table.enter_scope("do-while", ContextType.LOOP, self.scope_span(ctx))
         self.analyzer.loop_depth += 1
         
         start_label, end_label, continue_label = self.label_manager.new_loop_labels()
@@ -755,7 +1015,7 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
     def visitForStatement(self, ctx: CompiscriptParser.ForStatementContext):
         line = ctx.start.line
         
-        self.analyzer.symbol_table.enter_scope("for", ContextType.LOOP)
+        self.analyzer.symbol_table.enter_scope("for", ContextType.LOOP, self.scope_span(ctx))
         self.analyzer.loop_depth += 1
         
         start_label, end_label, continue_label = self.label_manager.new_loop_labels()
@@ -814,7 +1074,7 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
         line = ctx.start.line
         column = ctx.start.column
         
-        self.analyzer.symbol_table.enter_scope("foreach", ContextType.LOOP)
+        self.analyzer.symbol_table.enter_scope("foreach", ContextType.LOOP, self.scope_span(ctx))
         self.analyzer.loop_depth += 1
         
         
@@ -828,14 +1088,11 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
             
             iterable_type_str = self.safe_visit(ctx.expression())
             
+            iterable = self.analyzer.type_checker.intern(iterable_type_str) if iterable_type_str else None
             if iterable_type_str == "array":
                 element_type = DataType.INTEGER
-            elif iterable_type_str and iterable_type_str.endswith("[]"):
-                base_type = iterable_type_str[:-2]
-                try:
-                    element_type = DataType(base_type)
-                except ValueError:
-                    element_type = DataType.INTEGER
+            elif iterable and iterable.is_array:
+                element_type = iterable.element.data_type or DataType.INTEGER
             else:
                 element_type = DataType.INTEGER
                 if iterable_type_str != "error":
@@ -845,6 +1102,7 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
             self.analyzer.symbol_table.declare_variable(
                 iter_var, element_type, line, column, False, "auto_generated"
             )
+            self.record_definition(ctx.Identifier(), self.analyzer.symbol_table.lookup_current_scope(iter_var))
               
             array_place = self.get_place_from_ctx(ctx.expression())
             if not array_place:
@@ -909,13 +1167,15 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
         self.emit_goto(end_label)
         self.emit_label(catch_label)
         
-        self.analyzer.symbol_table.enter_scope("catch", ContextType.GLOBAL)
+        self.analyzer.symbol_table.enter_scope("catch", ContextType.GLOBAL,
+                                                  self.scope_span(blocks[1] if len(blocks) > 1 else ctx))
         
         try:
             error_var = ctx.Identifier().getText()
             self.analyzer.symbol_table.declare_variable(
                 error_var, DataType.STRING, line, column, False, "exception"
             )
+            self.record_definition(ctx.Identifier(), self.analyzer.symbol_table.lookup_current_scope(error_var))
             
             if blocks and len(blocks) > 1:
                 self.analyzer.unreachable_code = current_unreachable
@@ -1013,7 +1273,7 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
         return None
     
     def visitSwitchCase(self, ctx: CompiscriptParser.SwitchCaseContext):
-        self.analyzer.symbol_table.enter_scope("case", ContextType.GLOBAL)
+        self.analyzer.symbol_table.enter_scope("case", ContextType.GLOBAL, self.scope_span(ctx))
         
         try:
             if ctx.expression():
@@ -1029,7 +1289,7 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
         return None
     
     def visitDefaultCase(self, ctx: CompiscriptParser.DefaultCaseContext):
-        self.analyzer.symbol_table.enter_scope("default", ContextType.GLOBAL)
+        self.analyzer.symbol_table.enter_scope("default", ContextType.GLOBAL, self.scope_span(ctx))
         
         try:
             if ctx.statement():
@@ -1086,7 +1346,7 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
             self.analyzer.add_error(line, column, "'return' solo puede usarse dentro de funciones")
             return None
 
-        function_symbol = self.analyzer.symbol_table.lookup(self.analyzer.current_function)
+        function_symbol = self.analyzer.symbol_table.peek(self.analyzer.current_function)
         if not function_symbol:
             self.analyzer.add_error(line, column, 
                 f"No se puede encontrar información de la función '{self.analyzer.current_function}'")
@@ -1158,26 +1418,37 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
             line = ctx.start.line
             column = ctx.start.column
             
-            if parent_class:
-                parent_symbol = self.analyzer.symbol_table.lookup(parent_class)
-                if not parent_symbol or parent_symbol.symbol_type != SymbolType.CLASS:
-                    self.analyzer.add_error(line, column, 
-                        f"Clase padre '{parent_class}' no existe o no es una clase")
+            signature = self.signatures.get(ctx)
+            if signature is not None:
+                self.report_deferred(signature)
+                if signature.symbol is None:
                     return None
-            
-            success = self.analyzer.symbol_table.declare_class(
-                class_name, parent_class, line, column
-            )
-            
-            if not success:
-                return None
+                if parent_class:
+                    self.record_reference(ctx.Identifier(1), self.analyzer.symbol_table.lookup(parent_class))
+            else:
+                if parent_class:
+                    parent_symbol = self.analyzer.symbol_table.lookup(parent_class)
+                    if not parent_symbol or parent_symbol.symbol_type != SymbolType.CLASS:
+                        self.analyzer.add_error(line, column, 
+                            f"Clase padre '{parent_class}' no existe o no es una clase")
+                        return None
+                    self.record_reference(ctx.Identifier(1), parent_symbol)
+                
+                success = self.analyzer.symbol_table.declare_class(
+                    class_name, parent_class, line, column
+                )
+                
+                if not success:
+                    return None
+                
+                self.analyzer.type_checker.register_class(class_name, parent_class)
             
             class_start_label = self.label_manager.new_label(f"CLASS_{class_name}_START_")
             class_end_label = self.label_manager.new_label(f"CLASS_{class_name}_END_")
             
             self.emit_label(class_start_label)
             
-            self.analyzer.symbol_table.enter_scope(class_name, ContextType.CLASS)
+            self.analyzer.symbol_table.enter_scope(class_name, ContextType.CLASS, self.scope_span(ctx))
             self.analyzer.current_class = class_name
             
             self.push_reachability_state()
@@ -1187,7 +1458,11 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
                 "this", DataType.CLASS_TYPE, line, column, True, class_name
             )
             
-            class_symbol = self.analyzer.symbol_table.lookup(class_name)
+            class_symbol = self.analyzer.symbol_table.peek(class_name)
+            self.record_definition(ctx.Identifier(0), class_symbol)
+            self.analyzer.symbol_table.compute_class_layout(class_symbol)
+            self.analyzer.symbol_table.compute_class_vtable(class_symbol)
+            self.analyzer.symbol_table.build_member_index(class_symbol)
             
             if ctx.classMember():
                 for member in ctx.classMember():
@@ -1200,6 +1475,8 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
                         method_symbol = self.analyzer.symbol_table.lookup_current_scope(method_name)
                         if method_symbol:
                             class_symbol.methods[method_name] = method_symbol
+                            self.analyzer.symbol_table.add_class_member(class_name, method_name, method_symbol)
+                            self.analyzer.symbol_table.compute_class_vtable(class_symbol)
                     
                     elif member.variableDeclaration() or member.constantDeclaration():
                         self.safe_visit(member)
@@ -1212,6 +1489,8 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
                         attr_symbol = self.analyzer.symbol_table.lookup_current_scope(attr_name)
                         if attr_symbol:
                             class_symbol.attributes[attr_name] = attr_symbol
+                            self.analyzer.symbol_table.add_class_member(class_name, attr_name, attr_symbol)
+                            self.analyzer.symbol_table.compute_class_layout(class_symbol)
             
             self.emit_label(class_end_label)
             self.pop_reachability_state()
@@ -1247,6 +1526,7 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
                     self.analyzer.add_error(line, column, 
                         f"Variable '{var_name}' no está declarada")
                     return None
+                self.record_reference(identifier_node, symbol)
                 
                 if symbol.symbol_type == SymbolType.CONSTANT:
                     self.analyzer.add_error(line, column, 
@@ -1286,6 +1566,7 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
                     
                     if result_tuple[0] != "error":
                         attr_symbol = result_tuple[1]
+                        self.record_reference(identifier_node, attr_symbol)
                         
                         if attr_symbol and attr_symbol.symbol_type == SymbolType.CONSTANT:
                             self.analyzer.add_error(line, column,
@@ -1307,8 +1588,8 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
                             if not value_place:
                                 value_place = expressions[1].getText()
 
-                            property_access = f"{obj_place}.{property_name}"
-                            self.emit_tac("=", value_place, None, property_access, line)
+                            slot = self.field_slot(obj_type, property_name)
+                            self.emit_tac("setfield", slot, value_place, obj_place, line)
                             
                             self.release_if_temp(value_place)
                 else:
@@ -1667,7 +1948,7 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
                     is_zero_literal = (txt == "0")
                     is_zero_identifier = False
                     if not is_zero_literal and txt.isidentifier():
-                        sym = self.analyzer.symbol_table.lookup(txt)
+                        sym = self.analyzer.symbol_table.peek(txt)
                         if sym and getattr(sym, "value", None) == 0:
                             is_zero_identifier = True
                     if is_zero_literal or is_zero_identifier:
@@ -1840,7 +2121,7 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
         primary_identifier = None
         if hasattr(ctx.primaryAtom(), 'Identifier') and ctx.primaryAtom().Identifier():
             primary_identifier = ctx.primaryAtom().Identifier().getText()
-            primary_symbol = self.analyzer.symbol_table.lookup(primary_identifier)
+            primary_symbol = self.analyzer.symbol_table.peek(primary_identifier)
         
         current_result = primary_result
         current_symbol = primary_symbol
@@ -1884,7 +2165,7 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
                     if isinstance(result_tuple, tuple) and len(result_tuple) == 2:
                         current_result, current_place = result_tuple
                         if current_result != "error":
-                            current_symbol = self.analyzer.symbol_table.lookup(primary_identifier)
+                            current_symbol = self.analyzer.symbol_table.peek(primary_identifier)
                         else:
                             current_symbol = None
                             current_place = "error"
@@ -1904,7 +2185,8 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
                     current_place = "error"
             
             elif hasattr(suffix, 'expression') and suffix.expression():  
-                if current_result != "array" and not current_result.endswith("[]"):
+                indexed = self.analyzer.type_checker.intern(current_result)
+                if current_result != "array" and not indexed.is_array:
                     self.analyzer.add_error(
                         suffix.start.line, suffix.start.column,
                         f"No se puede indexar tipo '{current_result}'. Solo se pueden indexar arrays"
@@ -1922,9 +2204,8 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
                 if current_symbol and current_symbol.array_element_type:
                     element_type = current_symbol.array_element_type.value
                     current_result = element_type
-                elif current_result.endswith("[]"):
-                    element_type = current_result[:-2]
-                    current_result = element_type
+                elif indexed.is_array:
+                    current_result = indexed.element.name
                 else:
                     current_result = "integer"
                 
@@ -1953,6 +2234,7 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
                     if result_tuple[0] != "error":
                         current_result = result_tuple[0]
                         current_symbol = result_tuple[1]
+                        self.record_reference(suffix.Identifier(), current_symbol)
                         current_object_type = object_type
                         last_property_name = property_name
                         
@@ -1960,7 +2242,7 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
                             current_place = f"{current_place}.{property_name}"
                         else:
                             prop_temp = self.temp_manager.new_temp_from_type_string(current_result, self.current_scope_name)
-                            self.emit_tac(".", current_place, property_name, prop_temp)
+                            self.emit_tac("getfield", current_place, self.field_slot(object_type, property_name), prop_temp)
                             current_place = prop_temp
                             
                     else:
@@ -2045,94 +2327,49 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
         
         return (result_type_str, result_temp)
 
+    def field_slot(self, class_name: str, property_name: str) -> str:
+        layout = self.analyzer.symbol_table.get_class_layout(class_name)
+        return f"#{layout.slots[property_name]}"
+
     def handle_class_property_access(self, class_name: str, property_name: str, 
                 line: int, column: int, is_this: bool = False):
-        def search_in_class_hierarchy(current_class_name: str, property_name: str, visited_classes: set = None):
-            if visited_classes is None:
-                visited_classes = set()
-            
-            if current_class_name in visited_classes:
-                return None, None
-            
-            visited_classes.add(current_class_name)
-            
-            class_symbol = self.analyzer.symbol_table.lookup(current_class_name)
-            if not class_symbol or class_symbol.symbol_type != SymbolType.CLASS:
-                return None, None
-            
-            if property_name in class_symbol.attributes:
-                attr_symbol = class_symbol.attributes[property_name]
-                attr_symbol.is_used = True
-                
-                if attr_symbol.data_type == DataType.ARRAY and attr_symbol.array_element_type:
-                    return f"{attr_symbol.array_element_type.value}[]", attr_symbol
-                elif attr_symbol.data_type == DataType.CLASS_TYPE:
-                    return attr_symbol.class_type or attr_symbol.value, attr_symbol
-                else:
-                    return attr_symbol.data_type.value, attr_symbol
-            
-            if property_name in class_symbol.methods:
-                method_symbol = class_symbol.methods[property_name]
-                method_symbol.is_used = True
-                return "method", method_symbol
-            
-            if class_symbol.parent_class:
-                return search_in_class_hierarchy(class_symbol.parent_class, property_name, visited_classes)
-            
-            return None, None
-        
-        initial_class_symbol = self.analyzer.symbol_table.lookup(class_name)
-        if not initial_class_symbol or initial_class_symbol.symbol_type != SymbolType.CLASS:
+        symbol_table = self.analyzer.symbol_table
+        if symbol_table.get_class_members(class_name) is None:
             self.analyzer.add_error(line, column,
                 f"Clase '{class_name}' no encontrada")
             return "error", None
         
-        result_type, result_symbol = search_in_class_hierarchy(class_name, property_name)
+        member = symbol_table.find_class_member(class_name, property_name)
+        if member is not None:
+            member_symbol = member[1]
+            self.mark_used(member_symbol)
+            
+            if member_symbol.symbol_type in (SymbolType.FUNCTION, SymbolType.METHOD):
+                return "method", member_symbol
+            if member_symbol.data_type == DataType.ARRAY and member_symbol.array_element_type:
+                return f"{member_symbol.array_element_type.value}[]", member_symbol
+            elif member_symbol.data_type == DataType.CLASS_TYPE:
+                return member_symbol.class_type or member_symbol.value, member_symbol
+            else:
+                return member_symbol.data_type.value, member_symbol
         
-        if result_type is not None and result_symbol is not None:
-            return result_type, result_symbol
-        else:
-            hierarchy = []
-            current_class = class_name
-            while current_class:
-                hierarchy.append(current_class)
-                class_sym = self.analyzer.symbol_table.lookup(current_class)
-                if class_sym and class_sym.parent_class:
-                    current_class = class_sym.parent_class
-                else:
-                    break
-            
-            hierarchy_str = " -> ".join(hierarchy)
-            self.analyzer.add_error(line, column,
-                f"La clase '{class_name}' (jerarquía: {hierarchy_str}) no tiene un atributo o método llamado '{property_name}'")
-            return "error", None
+        hierarchy = []
+        current_class = class_name
+        while current_class:
+            hierarchy.append(current_class)
+            class_sym = symbol_table.peek(current_class)
+            if class_sym and class_sym.parent_class:
+                current_class = class_sym.parent_class
+            else:
+                break
+        
+        hierarchy_str = " -> ".join(hierarchy)
+        self.analyzer.add_error(line, column,
+            f"La clase '{class_name}' (jerarquía: {hierarchy_str}) no tiene un atributo o método llamado '{property_name}'")
+        return "error", None
 
     def lookup_class_member(self, class_name: str, member_name: str, member_type: str = "any") -> Optional[Symbol]:
-        def search_member_in_hierarchy(current_class_name: str, visited: set = None):
-            if visited is None:
-                visited = set()
-            
-            if current_class_name in visited:
-                return None
-            
-            visited.add(current_class_name)
-            
-            class_symbol = self.lookup(current_class_name)
-            if not class_symbol or class_symbol.symbol_type != SymbolType.CLASS:
-                return None
-            
-            if member_type in ["method", "any"] and member_name in class_symbol.methods:
-                return class_symbol.methods[member_name]
-            
-            if member_type in ["attribute", "any"] and member_name in class_symbol.attributes:
-                return class_symbol.attributes[member_name]
-            
-            if class_symbol.parent_class:
-                return search_member_in_hierarchy(class_symbol.parent_class, visited)
-            
-            return None
-        
-        return search_member_in_hierarchy(class_name)
+        return self.analyzer.symbol_table.lookup_class_member(class_name, member_name, member_type)
     
     def visitPrimaryAtom(self, ctx: CompiscriptParser.PrimaryAtomContext):
         return self.visitChildren(ctx)
@@ -2165,6 +2402,7 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
                 "UNDECLARED_VARIABLE"
             )
             return "error"
+        self.record_reference(ctx.Identifier(), symbol)
       
         self.set_place_to_ctx(ctx, symbol.unique_name)
 
@@ -2182,35 +2420,15 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
             line = ctx.start.line
             column = ctx.start.column
                         
-            class_symbol = self.analyzer.symbol_table.lookup(class_name)
-            if not class_symbol or class_symbol.symbol_type != SymbolType.CLASS:
+            if self.analyzer.symbol_table.get_class_members(class_name) is None:
                 self.analyzer.add_error(line, column, f"Clase '{class_name}' no está declarada")
                 return "error"
+            self.record_reference(ctx.Identifier(), self.analyzer.symbol_table.lookup(class_name))
             
-            def find_constructor_in_hierarchy(current_class: str, visited: set = None):
-                if visited is None:
-                    visited = set()
-                
-                if current_class in visited:
-                    return None
-                
-                visited.add(current_class)
-                
-                current_symbol = self.analyzer.symbol_table.lookup(current_class)
-                if not current_symbol or current_symbol.symbol_type != SymbolType.CLASS:
-                    return None
-                
-                if "constructor" in current_symbol.methods:
-                    return current_symbol.methods["constructor"]
-                
-                if current_symbol.parent_class:
-                    return find_constructor_in_hierarchy(current_symbol.parent_class, visited)
-                
-                return None
-            
-            constructor = find_constructor_in_hierarchy(class_name)
+            constructor = self.analyzer.symbol_table.lookup_class_member(class_name, "constructor", "method")
             
             if constructor:
+                self.mark_used(constructor)
                 if ctx.arguments():
                     arg_types = []
                     for expr in ctx.arguments().expression():
@@ -2272,38 +2490,18 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
         return self.analyzer.current_class
     
     def validate_method_call(self, object_type: str, method_name: str, arguments_ctx, line: int, column: int, object_place: str = None) -> str:
-        def find_method_in_hierarchy(class_name: str, method_name: str, visited: set = None):
-            if visited is None:
-                visited = set()
-            
-            if class_name in visited:
-                return None
-            
-            visited.add(class_name)
-            
-            class_symbol = self.analyzer.symbol_table.lookup(class_name)
-            if not class_symbol or class_symbol.symbol_type != SymbolType.CLASS:
-                return None
-            
-            if method_name in class_symbol.methods:
-                return class_symbol.methods[method_name]
-            
-            if class_symbol.parent_class:
-                return find_method_in_hierarchy(class_symbol.parent_class, method_name, visited)
-            
-            return None
-        
-        class_symbol = self.analyzer.symbol_table.lookup(object_type)
-        if not class_symbol or class_symbol.symbol_type != SymbolType.CLASS:
+        symbol_table = self.analyzer.symbol_table
+        if symbol_table.get_class_members(object_type) is None:
             self.analyzer.add_error(line, column,
                 f"'{object_type}' no es una clase válida")
             return "error"
         
-        method_symbol = find_method_in_hierarchy(object_type, method_name)
-        if not method_symbol:
+        member = symbol_table.find_class_member(object_type, method_name)
+        if member is None or member[1].symbol_type not in (SymbolType.FUNCTION, SymbolType.METHOD):
             self.analyzer.add_error(line, column,
                 f"La clase '{object_type}' no tiene un método llamado '{method_name}'")
             return "error"
+        defining_class, method_symbol = member
         
         expected_params = method_symbol.parameters
         expected_count = len(expected_params)
@@ -2346,16 +2544,11 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
 
         result_temp = self.temp_manager.new_temp_from_type_string(method_symbol.return_type.value, self.current_scope_name)
         
-        actual_class = object_type
-        current_class = object_type
-        while current_class:
-            class_sym = self.analyzer.symbol_table.lookup(current_class)
-            if class_sym and method_name in class_sym.methods:
-                actual_class = current_class
-                break
-            current_class = class_sym.parent_class if class_sym else None
-        
-        self.emit_tac("LCall", f"{actual_class}.{method_name}", None, result_temp, line)
+        vtable = symbol_table.get_class_vtable(object_type)
+        if object_place and vtable and method_name in vtable.slots:
+            self.emit_tac("VCall", object_place, f"{object_type}#{vtable.slots[method_name]}", result_temp, line)
+        else:
+            self.emit_tac("LCall", f"{defining_class}.{method_name}", None, result_temp, line)
 
         total_params = actual_count + (1 if object_place else 0)
         if total_params > 0:
@@ -2413,6 +2606,8 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
     def safe_visit(self, node):
         if node is None:
             return None
+        if self.cancelled is not None and self.cancelled.is_set():
+            raise CompilationCancelled()
         
         try:
             return self.visit(node)
@@ -2447,7 +2642,7 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
                             line = 0
                             column = 0
                         
-                        print(f"Error visitando nodo hijo: {str(child_error)} (línea {line})")
+                        self.analyzer.add_error(line, column, f"Error visitando nodo hijo: {str(child_error)}")
                         continue
         
         except Exception as e:
@@ -2471,5 +2666,7 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
             'warnings': self.analyzer.symbol_table.get_warnings(),
             'symbol_table': self.analyzer.symbol_table,
             'tac_code': self.tac_code,
-            'tac_count': len(self.tac_code)
+            'tac_count': len(self.tac_code),
+            'devirtualized_calls': self.devirtualized_calls,
+            'position_index': self.position_index
         }
\ No newline at end of file
@@ -0,0 +1,180 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from programa_tac import BasicBlock, build_cfg, instruction_operands, instruction_target, is_name
+
+
+@dataclass
+class LiveInterval:
+    name: str
+    start: int
+    end: int
+    crosses_call: bool = False
+    register: Optional[str] = None
+    spilled: bool = False
+
+    def overlaps(self, other: 'LiveInterval') -> bool:
+        return self.start <= other.end and other.start <= self.end
+
+
+def frame_word(symbol) -> Optional[int]:
+    # El analizador asigna offsets negativos en unidades de 4 bytes; cada unidad
+    # se convierte en una palabra de la máquina destino.
+    if symbol is None or symbol.offset >= 0:
+        return None
+    return (-symbol.offset + 3) // 4
+
+
+def trailing_labels(instructions: list) -> Set[str]:
+    ends = set()
+    for instruction in reversed(instructions):
+        if instruction.op != "label":
+            break
+        ends.add(instruction.result)
+    return ends
+
+
+def deferred_param_uses(instructions: list) -> Dict[int, int]:
+    # Los PushParam se leen cuando se ejecuta la llamada que los consume.
+    deferred = {}
+    pushes: List[int] = []
+    for position, instruction in enumerate(instructions):
+        if instruction.op == "PushParam":
+            pushes.append(position)
+        elif instruction.op in ("LCall", "VCall"):
+            for push in pushes:
+                deferred[push] = position
+            pushes = []
+        elif instruction.op == "new":
+            count = int(instruction.arg2 or 0)
+            for push in pushes[len(pushes) - count:] if count else []:
+                deferred[push] = position
+            del pushes[len(pushes) - count:]
+    return deferred
+
+
+def uses_and_defs(instruction, names: Set[str]) -> Tuple[List[str], Optional[str]]:
+    uses = [o for o in instruction_operands(instruction) if is_name(o) and o in names]
+    target = instruction_target(instruction)
+    return uses, target if target in names else None
+
+
+def block_liveness(blocks: List[BasicBlock], names: Set[str]) -> Tuple[List[Set[str]], List[Set[str]]]:
+    gen: List[Set[str]] = []
+    kill: List[Set[str]] = []
+    for block in blocks:
+        block_gen, block_kill = set(), set()
+        for instruction in block.instructions:
+            uses, target = uses_and_defs(instruction, names)
+            block_gen.update(u for u in uses if u not in block_kill)
+            if target:
+                block_kill.add(target)
+        gen.append(block_gen)
+        kill.append(block_kill)
+
+    live_in = [set() for _ in blocks]
+    live_out = [set() for _ in blocks]
+    changed = True
+    while changed:
+        changed = False
+        for block in reversed(blocks):
+            out = set()
+            for successor in block.successors:
+                out |= live_in[successor]
+            new_in = gen[block.index] | (out - kill[block.index])
+            if out != live_out[block.index] or new_in != live_in[block.index]:
+                live_out[block.index] = out
+                live_in[block.index] = new_in
+                changed = True
+    return live_in, live_out
+
+
+def live_intervals(instructions: list, names: Set[str], call_positions: List[int],
+                   deferred_uses: Optional[Dict[int, int]] = None) -> Tuple[Dict[str, LiveInterval], Set[str]]:
+    deferred_uses = deferred_uses or {}
+    blocks = build_cfg(instructions)
+    live_in, live_out = block_liveness(blocks, names)
+    intervals: Dict[str, LiveInterval] = {}
+
+    def extend(name: str, position: int):
+        interval = intervals.get(name)
+        if interval is None:
+            intervals[name] = LiveInterval(name, position, position)
+        else:
+            interval.start = min(interval.start, position)
+            interval.end = max(interval.end, position)
+
+    # Lo que está vivo al entrar a la función (los parámetros) empieza antes de la primera
+    # instrucción: si esa instrucción es una llamada, el intervalo la cruza.
+    for name in (live_in[0] if blocks else ()):
+        extend(name, -1)
+    for block in blocks:
+        for name in live_in[block.index]:
+            extend(name, block.start)
+        for name in live_out[block.index]:
+            extend(name, block.end)
+        for offset, instruction in enumerate(block.instructions):
+            position = block.start + offset
+            uses, target = uses_and_defs(instruction, names)
+            for name in uses:
+                extend(name, deferred_uses.get(position, position))
+            if target:
+                extend(target, position)
+
+    for interval in intervals.values():
+        interval.crosses_call = any(interval.start < p < interval.end for p in call_positions)
+    return intervals, (live_in[0] if blocks else set())
+
+
+def linear_scan(intervals: Dict[str, LiveInterval], registers: List[str],
+                preserved: Set[str]) -> List[LiveInterval]:
+    ordered = sorted(intervals.values(), key=lambda i: (i.start, i.end, i.name))
+    free = list(registers)
+    active: List[LiveInterval] = []
+
+    def eligible(interval: LiveInterval, register: str) -> bool:
+        return register in preserved or not interval.crosses_call
+
+    for interval in ordered:
+        for old in [a for a in active if a.end < interval.start]:
+            active.remove(old)
+            free.append(old.register)
+
+        candidates = [r for r in free if eligible(interval, r)]
+        if candidates:
+            scratch = [r for r in candidates if r not in preserved]
+            register = scratch[0] if scratch and not interval.crosses_call else candidates[0]
+            free.remove(register)
+            interval.register = register
+            active.append(interval)
+            continue
+
+        victims = [a for a in active if eligible(interval, a.register)]
+        victim = max(victims, key=lambda a: a.end, default=None)
+        if victim is not None and victim.end > interval.end:
+            interval.register = victim.register
+            victim.register = None
+            victim.spilled = True
+            active.remove(victim)
+            active.append(interval)
+        else:
+            interval.spilled = True
+    return ordered
+
+
+def assign_spill_words(intervals: List[LiveInterval], frame_symbols: Dict[str, object],
+                       local_names: Set[str], fixed: Set[str]) -> Tuple[Dict[str, int], int]:
+    symbol_words = [frame_word(frame_symbols.get(n)) for n in local_names]
+    next_word = max([w for w in symbol_words if w] + [0]) + 1
+    owners: Dict[int, List[LiveInterval]] = {}
+    words: Dict[str, int] = {}
+    for interval in intervals:
+        if interval.register or interval.name in fixed:
+            continue
+        word = frame_word(frame_symbols.get(interval.name))
+        if word is None or any(o.overlaps(interval) for o in owners.get(word, [])):
+            word = next_word
+            next_word += 1
+        owners.setdefault(word, []).append(interval)
+        words[interval.name] = word
+    return words, max(words.values(), default=0)
@@ -0,0 +1,272 @@
+import os
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from programa_tac import (TACProgram, TACFunction, TACBackendError, BINARY_OPERATORS,
+                          is_int_literal, is_string_literal, is_name, field_slot, vtable_slot,
+                          string_literal_value, jump_targets, instruction_target,
+                          instruction_operands, int_literal_value)
+
+RUNTIME_PATH = Path(__file__).parent / "cps_runtime.h"
+DEFAULT_CFLAGS = ["-O2", "-w", "-fwrapv"]
+# Value guarda los enteros en un long long; con -fwrapv el desborde da la vuelta en vez de ser indefinido.
+INT_BITS = 64
+
+COMPARISONS = {"<": "<", "<=": "<=", ">": ">", ">=": ">="}
+
+
+def c_name(name: str) -> str:
+    return f"v_{name}"
+
+
+def c_function(name: str) -> str:
+    return "f_" + name.replace(".", "__")
+
+
+def c_label(label: str) -> str:
+    return f"L_{label}"
+
+
+def c_string_literal(text: str) -> str:
+    out = []
+    for byte in text.encode("utf-8"):
+        ch = chr(byte)
+        if ch == "\\":
+            out.append("\\\\")
+        elif ch == '"':
+            out.append('\\"')
+        elif ch == "\n":
+            out.append("\\n")
+        elif ch == "\t":
+            out.append("\\t")
+        elif 32 <= byte < 127:
+            out.append(ch)
+        else:
+            out.append(f"\\{byte:03o}")
+    return '"' + "".join(out) + '"'
+
+
+def find_compiler() -> Optional[str]:
+    for candidate in (os.environ.get("CC"), "cc", "gcc", "clang"):
+        if candidate and shutil.which(candidate):
+            return candidate
+    return None
+
+
+class CBackend:
+
+    def __init__(self, program: TACProgram):
+        self.program = program
+        self.strings: Dict[str, int] = {}
+        self.class_names = list(program.classes)
+
+    def operand(self, operand: Optional[str]) -> str:
+        if operand is None or operand == "null":
+            return "CPS_NULL"
+        if is_int_literal(operand):
+            return f"cps_int({int_literal_value(operand, INT_BITS)}LL)"
+        if is_string_literal(operand):
+            value = string_literal_value(operand)
+            if value not in self.strings:
+                self.strings[value] = len(self.strings)
+            return f"cps_strings[{self.strings[value]}]"
+        if operand == "true":
+            return "cps_bool(1)"
+        if operand == "false":
+            return "cps_bool(0)"
+        if is_name(operand):
+            return c_name(operand)
+        raise TACBackendError(f"Operando no soportado por el backend C: '{operand}'")
+
+    def _binary(self, instruction) -> str:
+        op = instruction.op
+        left = self.operand(instruction.arg1)
+        right = self.operand(instruction.arg2)
+        if op == "+":
+            return f"cps_add({left}, {right})"
+        if op == "-":
+            return f"cps_int(({left}).as.i - ({right}).as.i)"
+        if op == "*":
+            return f"cps_int(({left}).as.i * ({right}).as.i)"
+        if op == "/":
+            return f"cps_div({left}, {right})"
+        if op == "%":
+            return f"cps_mod({left}, {right})"
+        if op == "==":
+            return f"cps_bool(cps_equals({left}, {right}))"
+        if op == "!=":
+            return f"cps_bool(!cps_equals({left}, {right}))"
+        if op in COMPARISONS:
+            return f"cps_bool(cps_compare({left}, {right}) {COMPARISONS[op]} 0)"
+        if op == "&&":
+            return f"cps_bool(cps_truthy({left}) && cps_truthy({right}))"
+        return f"cps_bool(cps_truthy({left}) || cps_truthy({right}))"
+
+    def _body(self, instructions: list, is_main: bool) -> List[str]:
+        lines = []
+        targets = jump_targets(instructions)
+        pending: List[str] = []
+        for instruction in instructions:
+            op = instruction.op
+            target = self.operand(instruction.result) if instruction_target(instruction) else None
+
+            if op == "label":
+                if instruction.result in targets:
+                    lines.append(f"{c_label(instruction.result)}: ;")
+            elif op == "goto":
+                lines.append(f"    goto {c_label(instruction.result)};")
+            elif op in ("if_false", "if_true"):
+                negate = "!" if op == "if_false" else ""
+                lines.append(f"    if ({negate}cps_truthy({self.operand(instruction.arg1)})) "
+                             f"goto {c_label(instruction.result)};")
+            elif op == "SetReturn":
+                if not is_main:
+                    value = "CPS_NULL" if instruction.arg1 == "void" else self.operand(instruction.arg1)
+                    lines.append(f"    ret = {value};")
+            elif op == "=":
+                lines.append(f"    {target} = {self.operand(instruction.arg1)};")
+            elif op == "setfield":
+                lines.append(f"    *cps_field({self.operand(instruction.result)}, "
+                             f"{field_slot(instruction.arg1)}) = {self.operand(instruction.arg2)};")
+            elif op == "getfield":
+                lines.append(f"    {target} = *cps_field({self.operand(instruction.arg1)}, "
+                             f"{field_slot(instruction.arg2)});")
+            elif op in BINARY_OPERATORS and instruction.arg2 is not None:
+                lines.append(f"    {target} = {self._binary(instruction)};")
+            elif op == "-":
+                lines.append(f"    {target} = cps_int(-({self.operand(instruction.arg1)}).as.i);")
+            elif op == "!":
+                lines.append(f"    {target} = cps_bool(!cps_truthy({self.operand(instruction.arg1)}));")
+            elif op == "[]":
+                lines.append(f"    {target} = *cps_slot({self.operand(instruction.arg1)}, "
+                             f"{self.operand(instruction.arg2)});")
+            elif op == "[]=":
+                lines.append(f"    *cps_slot({self.operand(instruction.result)}, "
+                             f"{self.operand(instruction.arg1)}) = {self.operand(instruction.arg2)};")
+            elif op == "new_array":
+                lines.append(f"    {target} = cps_new_array(({self.operand(instruction.arg1)}).as.i);")
+            elif op == "length":
+                lines.append(f"    {target} = cps_length({self.operand(instruction.arg1)});")
+            elif op == "call":
+                lines.append(f"    cps_print({self.operand(instruction.arg2)});")
+            elif op == "PushParam":
+                pending.append(self.operand(instruction.arg1))
+            elif op == "LCall":
+                function = self.program.resolve_call(instruction.arg1)
+                if function is None:
+                    raise TACBackendError(f"Llamada a función desconocida: '{instruction.arg1}'")
+                lines.append(f"    {target} = {c_function(function.name)}({', '.join(pending)});")
+                pending = []
+            elif op == "VCall":
+                _, slot = vtable_slot(instruction.arg2)
+                signature = ", ".join("Value" for _ in pending) or "void"
+                lines.append(f"    {target} = ((Value (*)({signature}))cps_object({pending[0]})->cls->vtable[{slot}])"
+                             f"({', '.join(pending)});")
+                pending = []
+            elif op == "new":
+                count = int(instruction.arg2 or 0)
+                args = pending[len(pending) - count:] if count else []
+                del pending[len(pending) - count:]
+                class_name = instruction.arg1
+                if class_name not in self.class_names:
+                    raise TACBackendError(f"Clase desconocida: '{class_name}'")
+                lines.append(f"    {target} = cps_new_object(&cps_class_{class_name});")
+                constructor = self.program.resolve_method(class_name, "constructor")
+                if constructor is not None:
+                    lines.append(f"    {c_function(constructor.name)}({', '.join([target] + args)});")
+            elif op in ("PopParams", "return", "ActivationRecord"):
+                pass
+            else:
+                raise TACBackendError(f"Instrucción TAC no soportada por el backend C: '{op}'")
+        return lines
+
+    def _locals(self, instructions: list, params: List[str], global_names, scope: str) -> List[str]:
+        names = []
+        for instruction in instructions:
+            target = instruction_target(instruction)
+            if target and target not in params and target not in global_names and target not in names:
+                names.append(target)
+        # Un nombre que se lee sin ser parámetro, local ni global (la variable de un catch, un
+        # parámetro de la función que encierra a una anidada) no tiene valor en C.
+        declared = set(params) | set(names) | set(global_names)
+        for instruction in instructions:
+            for operand in instruction_operands(instruction):
+                if is_name(operand) and operand not in declared:
+                    raise TACBackendError(f"Variable '{operand}' sin valor en '{scope}': "
+                                          "el backend C no la puede traducir")
+        return names
+
+    def _function(self, function: TACFunction) -> List[str]:
+        params = ", ".join(f"Value {c_name(p)}" for p in function.params) or "void"
+        lines = [f"static Value {c_function(function.name)}({params}) {{", "    Value ret = CPS_NULL;"]
+        for name in self._locals(function.body, function.params, self.program.global_names, function.name):
+            lines.append(f"    Value {c_name(name)} = CPS_NULL;")
+        lines += self._body(function.body, is_main=False)
+        lines += ["    return ret;", "}"]
+        return lines
+
+    def _prototype(self, function: TACFunction) -> str:
+        params = ", ".join("Value" for _ in function.params) or "void"
+        return f"static Value {c_function(function.name)}({params});"
+
+    def _classes(self) -> List[str]:
+        lines = []
+        for class_name in self.class_names:
+            functions = self.program.vtable_functions(class_name)
+            if functions:
+                lines.append(f"static void (*const cps_vtable_{class_name}[])(void) = {{ "
+                             + ", ".join(f"(void (*)(void)){c_function(f.name)}" for f in functions) + " };")
+        for class_name in self.class_names:
+            size = f"sizeof(CpsInstance) + {self.program.class_size(class_name)} * sizeof(Value)"
+            vtable = f"cps_vtable_{class_name}" if self.program.class_vtables.get(class_name) else "NULL"
+            lines.append(f"static const CpsClass cps_class_{class_name} = "
+                         f"{{ \"{class_name}\", {size}, {vtable} }};")
+        return lines
+
+    def generate(self) -> str:
+        self.strings = {}
+        functions = []
+        for function in self.program.functions.values():
+            functions += self._function(function) + [""]
+
+        main_lines = ["static void cps_main(void) {"]
+        for name in self._locals(self.program.main, [], self.program.global_names, "main"):
+            main_lines.append(f"    Value {c_name(name)} = CPS_NULL;")
+        main_lines += self._body(self.program.main, is_main=True)
+        main_lines += ["}", ""]
+
+        out = [RUNTIME_PATH.read_text(encoding="utf-8"), ""]
+        out.append(f"static Value cps_strings[{max(len(self.strings), 1)}];")
+        out += [f"static Value {c_name(n)};" for n in sorted(self.program.global_names)]
+        out += [self._prototype(f) for f in self.program.functions.values()] + [""]
+        out += self._classes() + [""]
+        out += functions + main_lines
+        out.append("static void cps_init_strings(void) {")
+        for text, index in self.strings.items():
+            out.append(f"    cps_strings[{index}] = cps_string_n({c_string_literal(text)}, "
+                       f"{len(text.encode('utf-8'))});")
+        out += ["}", ""]
+        out += [
+            "int main(int argc, char **argv) {",
+            "    long long repeat = argc > 1 ? atoll(argv[1]) : 1;",
+            "    cps_init_strings();",
+            "    for (long long i = 0; i < repeat; i++) cps_main();",
+            "    return 0;",
+            "}",
+        ]
+        return "\n".join(out) + "\n"
+
+    def build(self, c_path: str, exe_path: str, compiler: Optional[str] = None,
+              flags: Optional[List[str]] = None) -> str:
+        compiler = compiler or find_compiler()
+        if compiler is None:
+            raise TACBackendError("No se encontró un compilador de C (cc/gcc/clang)")
+        with open(c_path, "w", encoding="utf-8") as f:
+            f.write(self.generate())
+        command = [compiler] + (flags if flags is not None else DEFAULT_CFLAGS) + [c_path, "-o", exe_path]
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise TACBackendError(f"Falló la compilación de C:\n{result.stderr.strip()}")
+        return exe_path
@@ -0,0 +1,559 @@
+from typing import Dict, List, Optional, Set
+
+from programa_tac import (TACProgram, TACFunction, TACBackendError, BINARY_OPERATORS,
+                          is_int_literal, is_string_literal, is_name, is_temp, field_slot, vtable_slot,
+                          string_literal_value, jump_targets, instruction_names)
+from asignacion_registros import (LiveInterval, live_intervals, linear_scan, deferred_param_uses,
+                                  trailing_labels, assign_spill_words)
+from backend_c import c_string_literal
+from backend_x86 import asm_function, asm_global, tagged_int
+
+WORD = 4
+# Enteros etiquetados como en x86-64, pero en palabras de 32 bits.
+INT_BITS = 31
+ARGUMENT_REGISTERS = ["$a0", "$a1", "$a2", "$a3"]
+CALLEE_SAVED = ["$s0", "$s1", "$s2", "$s3", "$s4", "$s5", "$s6", "$s7"]
+CALLER_SAVED = ["$t2", "$t3", "$t4", "$t5", "$t6", "$t7"]
+ALLOCATABLE = CALLER_SAVED + CALLEE_SAVED
+# Las rutinas del runtime (cps_*) solo modifican $v0, $v1 y $ra; por eso los
+# únicos puntos de llamada para el asignador son las llamadas a funciones TAC.
+CALL_OPS = {"LCall", "VCall", "new"}
+
+TRUE_VALUE = 6
+FALSE_VALUE = 2
+RELATIONAL = {"<", "<=", ">", ">="}
+
+
+def fits_imm16(value: int) -> bool:
+    return -(1 << 15) <= value < (1 << 15)
+
+
+class MipsFunctionGenerator:
+
+    def __init__(self, backend: 'MipsBackend', label: str, instructions: list,
+                 params: List[str], local_names: Set[str], class_name: Optional[str], is_main: bool):
+        self.backend = backend
+        self.program = backend.program
+        self.label = label
+        self.instructions = instructions
+        self.params = params
+        self.local_names = local_names
+        self.class_name = class_name
+        self.is_main = is_main
+        self.prefix = f"L{backend.next_function_id()}"
+        self.lines: List[str] = []
+        self.cold: List[str] = []
+        self.locations: Dict[str, str] = {}
+        self.counter = 0
+        self.fused = None
+        self.outgoing = len(ARGUMENT_REGISTERS)
+
+    def emit(self, text: str):
+        self.lines.append("    " + text)
+
+    def new_label(self, hint: str) -> str:
+        self.counter += 1
+        return f"{self.prefix}_{hint}{self.counter}"
+
+    def block_label(self, label: str) -> str:
+        return f"{self.prefix}_{label}"
+
+    def is_register(self, location: str) -> bool:
+        return location.startswith("$")
+
+    def use(self, operand: Optional[str], scratch: str) -> str:
+        if operand is None or operand == "null":
+            return "$zero"
+        location = self.locations.get(operand)
+        if location is not None:
+            if self.is_register(location):
+                return location
+            self.emit(f"lw {scratch}, {location}")
+        elif is_int_literal(operand):
+            self.emit(f"li {scratch}, {tagged_int(operand, INT_BITS)}")
+        elif operand in ("true", "false"):
+            self.emit(f"li {scratch}, {TRUE_VALUE if operand == 'true' else FALSE_VALUE}")
+        elif is_string_literal(operand):
+            self.emit(f"la {scratch}, {self.backend.string_label(string_literal_value(operand))}")
+        elif is_name(operand):
+            self.backend.referenced_globals.add(operand)
+            self.emit(f"lw {scratch}, {asm_global(operand)}")
+        else:
+            raise TACBackendError(f"Operando no soportado por el backend MIPS: '{operand}'")
+        return scratch
+
+    def load_to(self, operand: Optional[str], register: str):
+        value = self.use(operand, register)
+        if value != register:
+            self.emit(f"move {register}, {value}")
+
+    def target(self, name: str, scratch: str) -> str:
+        location = self.locations.get(name)
+        return location if location is not None and self.is_register(location) else scratch
+
+    def commit(self, name: str, register: str):
+        location = self.locations.get(name)
+        if location is None:
+            self.backend.referenced_globals.add(name)
+            self.emit(f"sw {register}, {asm_global(name)}")
+        elif not self.is_register(location):
+            self.emit(f"sw {register}, {location}")
+        elif location != register:
+            self.emit(f"move {location}, {register}")
+
+    def box_flag(self, flag: str, destination: str):
+        self.emit(f"sll {destination}, {flag}, 2")
+        self.emit(f"addiu {destination}, {destination}, 2")
+
+    def null_check(self, register: str):
+        self.emit(f"beq {register}, $zero, {self.prefix}_fail_null")
+        self.stubs.add("fail_null")
+
+    def field_address(self, obj: str, slot: str) -> str:
+        register = self.use(obj, "$t0")
+        self.null_check(register)
+        return f"{8 + WORD * field_slot(slot)}({register})"
+
+    def call(self, function: str, args: List[str], dispatch: Optional[int] = None):
+        self.outgoing = max(self.outgoing, len(args))
+        for index, arg in enumerate(args[len(ARGUMENT_REGISTERS):], len(ARGUMENT_REGISTERS)):
+            self.emit(f"sw {self.use(arg, '$t0')}, {WORD * index}($sp)")
+        for arg, register in zip(args, ARGUMENT_REGISTERS):
+            self.load_to(arg, register)
+        if dispatch is None:
+            self.emit(f"jal {function}")
+        else:
+            # El receptor ya está en $a0: objeto -> descriptor de clase -> vtable -> slot.
+            self.null_check("$a0")
+            self.emit("lw $t9, 4($a0)")
+            self.emit("lw $t9, 8($t9)")
+            self.emit(f"lw $t9, {WORD * dispatch}($t9)")
+            self.emit("jalr $t9")
+
+    def _binary(self, instruction, position: int):
+        op = instruction.op
+        left, right, result = instruction.arg1, instruction.arg2, instruction.result
+        a = self.use(left, "$t0")
+        right_value = tagged_int(right, INT_BITS) if is_int_literal(right) else None
+
+        if op == "+" and right_value is not None and fits_imm16(right_value - 1) and not is_string_literal(left):
+            destination = self.target(result, "$v1")
+            if not is_int_literal(left):
+                slow, done = self.new_label("add_slow"), self.new_label("add_done")
+                self.emit(f"andi $t8, {a}, 1")
+                self.emit(f"beq $t8, $zero, {slow}")
+                self.cold += [f"{slow}:", f"    move $a0, {a}", f"    li $a1, {right_value}",
+                              "    jal cps_add", f"    move {destination}, $v0", f"    j {done}"]
+                self.emit(f"addiu {destination}, {a}, {right_value - 1}")
+                self.lines.append(f"{done}:")
+            else:
+                self.emit(f"addiu {destination}, {a}, {right_value - 1}")
+            self.commit(result, destination)
+            return
+        if op == "-" and right_value is not None and fits_imm16(1 - right_value):
+            destination = self.target(result, "$v1")
+            self.emit(f"addiu {destination}, {a}, {1 - right_value}")
+            self.commit(result, destination)
+            return
+
+        b = self.use(right, "$t1")
+        if op == "+":
+            destination = self.target(result, "$v1")
+            if is_string_literal(left) or is_string_literal(right):
+                self.emit(f"move $a0, {a}")
+                self.emit(f"move $a1, {b}")
+                self.emit("jal cps_add")
+                self.commit(result, "$v0")
+                return
+            checks = [r for r, operand in ((a, left), (b, right)) if not is_int_literal(operand)]
+            slow, done = self.new_label("add_slow"), self.new_label("add_done")
+            if len(checks) == 2:
+                self.emit(f"and $t8, {a}, {b}")
+                self.emit("andi $t8, $t8, 1")
+            else:
+                self.emit(f"andi $t8, {checks[0]}, 1")
+            self.emit(f"beq $t8, $zero, {slow}")
+            self.cold += [f"{slow}:", f"    move $a0, {a}", f"    move $a1, {b}",
+                          "    jal cps_add", f"    move {destination}, $v0", f"    j {done}"]
+            self.emit(f"addu {destination}, {a}, {b}")
+            self.emit(f"addiu {destination}, {destination}, -1")
+            self.lines.append(f"{done}:")
+            self.commit(result, destination)
+        elif op == "-":
+            destination = self.target(result, "$v1")
+            self.emit(f"subu {destination}, {a}, {b}")
+            self.emit(f"addiu {destination}, {destination}, 1")
+            self.commit(result, destination)
+        elif op == "*":
+            destination = self.target(result, "$v1")
+            self.emit(f"sra $t8, {a}, 1")
+            self.emit(f"addiu $t9, {b}, -1")
+            self.emit(f"mul {destination}, $t8, $t9")
+            self.emit(f"addiu {destination}, {destination}, 1")
+            self.commit(result, destination)
+        elif op in ("/", "%"):
+            destination = self.target(result, "$v1")
+            self.emit("li $t8, 1")
+            self.emit(f"beq {b}, $t8, {self.prefix}_fail_div")
+            self.stubs.add("fail_div")
+            self.emit(f"sra $t8, {a}, 1")
+            self.emit(f"sra $t9, {b}, 1")
+            self.emit("div $t8, $t9")
+            self.emit(f"{'mflo' if op == '/' else 'mfhi'} {destination}")
+            self.emit(f"sll {destination}, {destination}, 1")
+            self.emit(f"addiu {destination}, {destination}, 1")
+            self.commit(result, destination)
+        elif op in RELATIONAL:
+            compare = self.new_label("cmp")
+            if not (is_int_literal(left) or is_int_literal(right)):
+                if a != "$t0":
+                    self.emit(f"move $t0, {a}")
+                if b != "$t1":
+                    self.emit(f"move $t1, {b}")
+                a, b = "$t0", "$t1"
+                slow = self.new_label("cmp_slow")
+                self.emit("and $t8, $t0, $t1")
+                self.emit("andi $t8, $t8, 1")
+                self.emit(f"beq $t8, $zero, {slow}")
+                self.cold += [f"{slow}:", "    move $a0, $t0", "    move $a1, $t1", "    jal cps_compare",
+                              "    move $t0, $v0", "    move $t1, $zero", f"    j {compare}"]
+            self.lines.append(f"{compare}:")
+            negated = op in ("<=", ">=")
+            first, second = (a, b) if op in ("<", ">=") else (b, a)
+            self.emit(f"slt $t8, {first}, {second}")
+            if self._can_fuse(instruction, position):
+                self.fused = (result, negated)
+                return
+            if negated:
+                self.emit("xori $t8, $t8, 1")
+            destination = self.target(result, "$v1")
+            self.box_flag("$t8", destination)
+            self.commit(result, destination)
+        elif op in ("==", "!="):
+            destination = self.target(result, "$v1")
+            if any(is_int_literal(o) or o in ("true", "false", "null") for o in (left, right)):
+                self.emit(f"xor $t8, {a}, {b}")
+                self.emit("sltiu $t8, $t8, 1" if op == "==" else "sltu $t8, $zero, $t8")
+                self.box_flag("$t8", destination)
+                self.commit(result, destination)
+                return
+            equal, different, done = self.new_label("eq"), self.new_label("ne"), self.new_label("eq_done")
+            self.emit(f"beq {a}, {b}, {equal}")
+            self.emit(f"or $t8, {a}, {b}")
+            self.emit("andi $t8, $t8, 3")
+            self.emit(f"bne $t8, $zero, {different}")
+            self.emit(f"move $a0, {a}")
+            self.emit(f"move $a1, {b}")
+            self.emit("jal cps_equals")
+            self.emit(f"move {destination}, $v0")
+            self.emit(f"j {done}")
+            self.lines.append(f"{equal}:")
+            self.emit(f"li {destination}, {TRUE_VALUE}")
+            self.emit(f"j {done}")
+            self.lines.append(f"{different}:")
+            self.emit(f"li {destination}, {FALSE_VALUE}")
+            self.lines.append(f"{done}:")
+            if op == "!=":
+                self.emit(f"xori {destination}, {destination}, 4")
+            self.commit(result, destination)
+        else:
+            destination = self.target(result, "$v1")
+            self.emit(f"sltiu $t8, {a}, 3")
+            self.emit(f"sltiu $t9, {b}, 3")
+            self.emit("or $t8, $t8, $t9" if op == "&&" else "and $t8, $t8, $t9")
+            self.emit("xori $t8, $t8, 1")
+            self.box_flag("$t8", destination)
+            self.commit(result, destination)
+
+    def _can_fuse(self, instruction, position: int) -> bool:
+        if position + 1 >= len(self.instructions):
+            return False
+        following = self.instructions[position + 1]
+        interval = self.intervals.get(instruction.result)
+        return (following.op in ("if_false", "if_true") and following.arg1 == instruction.result
+                and is_temp(instruction.result) and interval is not None
+                and interval.end == position + 1)
+
+    def _branch(self, instruction):
+        target = self.block_label(instruction.result)
+        condition = instruction.arg1
+        jump_if_false = instruction.op == "if_false"
+        if self.fused is not None and self.fused[0] == condition:
+            negated = self.fused[1]
+            self.fused = None
+            # $t8 es 1 cuando la comparación es verdadera, salvo que esté negada.
+            self.emit(f"{'bne' if jump_if_false == negated else 'beq'} $t8, $zero, {target}")
+            return
+        if condition in ("true", "false", "null") or is_int_literal(condition):
+            truthy = condition == "true" or (is_int_literal(condition) and int(condition) != 0)
+            if truthy != jump_if_false:
+                self.emit(f"j {target}")
+            return
+        register = self.use(condition, "$t0")
+        self.emit(f"sltiu $t8, {register}, 3")
+        self.emit(f"{'bne' if jump_if_false else 'beq'} $t8, $zero, {target}")
+
+    def _lower(self, instruction, position: int, pending: List[str], targets: Set[str]):
+        op = instruction.op
+        result = instruction.result
+
+        if op == "label":
+            if result in targets:
+                self.lines.append(f"{self.block_label(result)}:")
+        elif op == "goto":
+            self.emit(f"j {self.block_label(result)}")
+        elif op in ("if_false", "if_true"):
+            self._branch(instruction)
+        elif op == "SetReturn":
+            if self.is_main:
+                return
+            if instruction.arg1 == "void":
+                self.emit("move $v0, $zero")
+            else:
+                self.load_to(instruction.arg1, "$v0")
+            following = self.instructions[position + 1] if position + 1 < len(self.instructions) else None
+            if following is not None and following.op == "goto" and following.result in self.end_labels:
+                self.emit(f"j {self.prefix}_return")
+                self.skip_next = True
+            else:
+                self.emit(f"sw $v0, {self.return_slot}")
+        elif op == "=":
+            self.commit(result, self.use(instruction.arg1, "$t0"))
+        elif op == "setfield":
+            address = self.field_address(result, instruction.arg1)
+            self.emit(f"sw {self.use(instruction.arg2, '$t1')}, {address}")
+        elif op == "getfield":
+            address = self.field_address(instruction.arg1, instruction.arg2)
+            destination = self.target(result, "$t1")
+            self.emit(f"lw {destination}, {address}")
+            self.commit(result, destination)
+        elif op in BINARY_OPERATORS and instruction.arg2 is not None:
+            self._binary(instruction, position)
+        elif op == "-":
+            value = self.use(instruction.arg1, "$t0")
+            destination = self.target(result, "$v1")
+            self.emit("li $t8, 2")
+            self.emit(f"subu {destination}, $t8, {value}")
+            self.commit(result, destination)
+        elif op == "!":
+            value = self.use(instruction.arg1, "$t0")
+            destination = self.target(result, "$v1")
+            self.emit(f"sltiu $t8, {value}, 3")
+            self.box_flag("$t8", destination)
+            self.commit(result, destination)
+        elif op in ("[]", "[]="):
+            array, index = (instruction.arg1, instruction.arg2) if op == "[]" else (result, instruction.arg1)
+            array_register = self.use(array, "$t0")
+            self.null_check(array_register)
+            index_register = self.use(index, "$t1")
+            self.emit(f"sra $t8, {index_register}, 1")
+            self.emit(f"lw $t9, 4({array_register})")
+            self.emit("sltu $t9, $t8, $t9")
+            self.emit(f"beq $t9, $zero, {self.prefix}_fail_index")
+            self.stubs.add("fail_index")
+            self.emit("sll $t8, $t8, 2")
+            self.emit(f"addu $t8, {array_register}, $t8")
+            if op == "[]":
+                destination = self.target(result, "$t1")
+                self.emit(f"lw {destination}, 8($t8)")
+                self.commit(result, destination)
+            else:
+                self.emit(f"sw {self.use(instruction.arg2, '$t9')}, 8($t8)")
+        elif op == "new_array":
+            self.load_to(instruction.arg1, "$a0")
+            self.emit("jal cps_new_array")
+            self.commit(result, "$v0")
+        elif op == "length":
+            array_register = self.use(instruction.arg1, "$t0")
+            self.null_check(array_register)
+            destination = self.target(result, "$v1")
+            self.emit(f"lw $t8, 4({array_register})")
+            self.emit("sll $t8, $t8, 1")
+            self.emit(f"addiu {destination}, $t8, 1")
+            self.commit(result, destination)
+        elif op == "call":
+            self.load_to(instruction.arg2, "$a0")
+            self.emit("jal cps_print")
+        elif op == "PushParam":
+            pending.append(instruction.arg1)
+        elif op == "LCall":
+            function = self.program.resolve_call(instruction.arg1)
+            if function is None:
+                raise TACBackendError(f"Llamada a función desconocida: '{instruction.arg1}'")
+            self.call(asm_function(function.name), list(pending))
+            pending.clear()
+            if result:
+                self.commit(result, "$v0")
+        elif op == "VCall":
+            _, slot = vtable_slot(instruction.arg2)
+            self.call(None, list(pending), dispatch=slot)
+            pending.clear()
+            if result:
+                self.commit(result, "$v0")
+        elif op == "new":
+            count = int(instruction.arg2 or 0)
+            args = pending[len(pending) - count:] if count else []
+            del pending[len(pending) - count:]
+            class_name = instruction.arg1
+            if class_name not in self.program.classes:
+                raise TACBackendError(f"Clase desconocida: '{class_name}'")
+            self.emit(f"la $a0, {self.backend.class_label(class_name)}")
+            self.emit("jal cps_new_object")
+            constructor = self.program.resolve_method(class_name, "constructor")
+            if constructor is not None:
+                self.emit(f"sw $v0, {self.new_slot}")
+                self.call(asm_function(constructor.name), ["%new"] + args)
+                self.emit(f"lw $v0, {self.new_slot}")
+            self.commit(result, "$v0")
+        elif op in ("PopParams", "return", "ActivationRecord"):
+            pass
+        else:
+            raise TACBackendError(f"Instrucción TAC no soportada por el backend MIPS: '{op}'")
+
+    def _allocate(self) -> List[LiveInterval]:
+        calls = [p for p, i in enumerate(self.instructions) if i.op in CALL_OPS]
+        self.intervals, self.entry_live = live_intervals(
+            self.instructions, self.local_names, calls, deferred_param_uses(self.instructions))
+        return linear_scan(self.intervals, ALLOCATABLE, set(CALLEE_SAVED))
+
+    def _assign_slots(self, intervals: List[LiveInterval]):
+        used = {i.register for i in intervals if i.register}
+        self.saved_registers = [r for r in CALLEE_SAVED if r in used]
+        base = 2 * WORD + WORD * len(self.saved_registers)
+        self.return_slot = f"-{base + WORD}($fp)"
+        self.new_slot = f"-{base + 2 * WORD}($fp)"
+        self.locations["%new"] = self.new_slot
+        base += 2 * WORD
+
+        stack_params = set(self.params[len(ARGUMENT_REGISTERS):])
+        words, top = assign_spill_words(intervals, self.program.frame_symbols, self.local_names, stack_params)
+        for interval in intervals:
+            if interval.register:
+                self.locations[interval.name] = interval.register
+            elif interval.name in stack_params:
+                self.locations[interval.name] = f"{WORD * self.params.index(interval.name)}($fp)"
+            else:
+                self.locations[interval.name] = f"-{base + WORD * words[interval.name]}($fp)"
+        self.locals_size = base + WORD * top
+        self.spilled = sum(1 for i in intervals if i.spilled)
+
+    def generate(self) -> List[str]:
+        self.stubs: Set[str] = set()
+        self.skip_next = False
+        self.end_labels = trailing_labels(self.instructions)
+        self._assign_slots(self._allocate())
+
+        targets = jump_targets(self.instructions)
+        pending: List[str] = []
+        for position, instruction in enumerate(self.instructions):
+            if self.skip_next:
+                self.skip_next = False
+                if instruction.op == "goto":
+                    continue
+            self._lower(instruction, position, pending, targets)
+        body, self.lines = self.lines, []
+
+        frame = self.locals_size + WORD * self.outgoing
+        frame = (frame + 7) & ~7
+        self.lines.append(f"{self.label}:")
+        self.emit(f"addiu $sp, $sp, -{frame}")
+        self.emit(f"sw $ra, {frame - WORD}($sp)")
+        self.emit(f"sw $fp, {frame - 2 * WORD}($sp)")
+        self.emit(f"addiu $fp, $sp, {frame}")
+        for index, register in enumerate(self.saved_registers):
+            self.emit(f"sw {register}, -{WORD * (index + 3)}($fp)")
+        if not self.is_main:
+            self.emit(f"sw $zero, {self.return_slot}")
+        for index, name in enumerate(self.params[:len(ARGUMENT_REGISTERS)]):
+            if name in self.entry_live:
+                self.commit(name, ARGUMENT_REGISTERS[index])
+        for index, name in enumerate(self.params[len(ARGUMENT_REGISTERS):], len(ARGUMENT_REGISTERS)):
+            location = self.locations.get(name)
+            if name in self.entry_live and location and self.is_register(location):
+                self.emit(f"lw {location}, {WORD * index}($fp)")
+        for name in sorted(self.entry_live - set(self.params)):
+            self.commit(name, "$zero")
+
+        self.lines += body
+        if not self.is_main:
+            self.emit(f"lw $v0, {self.return_slot}")
+        self.lines.append(f"{self.prefix}_return:")
+        for index, register in enumerate(self.saved_registers):
+            self.emit(f"lw {register}, -{WORD * (index + 3)}($fp)")
+        self.emit("move $sp, $fp")
+        self.emit(f"lw $ra, -{WORD}($sp)")
+        self.emit(f"lw $fp, -{2 * WORD}($sp)")
+        self.emit("jr $ra")
+        self.lines += self.cold
+        for stub in sorted(self.stubs):
+            self.lines.append(f"{self.prefix}_{stub}:")
+            self.emit(f"jal cps_{stub}")
+        return self.lines
+
+
+class MipsBackend:
+
+    def __init__(self, program: TACProgram):
+        self.program = program
+        self.strings: Dict[str, str] = {}
+        self.referenced_globals: Set[str] = set()
+        self.function_count = 0
+        self.spilled: Dict[str, int] = {}
+
+    def next_function_id(self) -> int:
+        self.function_count += 1
+        return self.function_count
+
+    def string_label(self, text: str) -> str:
+        if text not in self.strings:
+            self.strings[text] = f"cps_str_{len(self.strings)}"
+        return self.strings[text]
+
+    def class_label(self, class_name: str) -> str:
+        return f"cps_class_{class_name}"
+
+    def _function(self, function: TACFunction) -> List[str]:
+        local_names = function.names() - self.program.function_globals(function)
+        generator = MipsFunctionGenerator(self, asm_function(function.name), function.body,
+                                          function.params, local_names, function.class_name, False)
+        lines = generator.generate()
+        self.spilled[function.name] = generator.spilled
+        return lines
+
+    def _main(self) -> List[str]:
+        local_names = {n for i in self.program.main for n in instruction_names(i)} - self.program.global_names
+        generator = MipsFunctionGenerator(self, "cps_main", self.program.main, [], local_names, None, True)
+        lines = generator.generate()
+        self.spilled["main"] = generator.spilled
+        return lines
+
+    def _data(self) -> List[str]:
+        lines = ["", "    .data"]
+        for class_name in self.program.classes:
+            lines += ["    .align 2", f"{self.class_label(class_name)}:",
+                      f"    .word cps_class_name_{class_name}, {self.program.class_size(class_name)}, "
+                      + (f"cps_vtable_{class_name}" if self.program.class_vtables.get(class_name) else "0")]
+            functions = self.program.vtable_functions(class_name)
+            if functions:
+                lines.append(f"cps_vtable_{class_name}:")
+                lines.append("    .word " + ", ".join(asm_function(f.name) for f in functions))
+        for text, label in self.strings.items():
+            lines += ["    .align 2", f"{label}:", f"    .word 1, {len(text.encode('utf-8'))}",
+                      f"    .asciiz {c_string_literal(text)}"]
+        lines.append("    .align 2")
+        for name in sorted(self.program.global_names | self.referenced_globals):
+            lines.append(f"{asm_global(name)}: .word 0")
+        for class_name in self.program.classes:
+            lines.append(f"cps_class_name_{class_name}: .asciiz \"{class_name}\"")
+        return lines
+
+    def generate(self) -> str:
+        self.strings = {}
+        self.referenced_globals = set()
+        self.function_count = 0
+        self.spilled = {}
+        text = ["    .text", "    .globl cps_main"]
+        text += self._main()
+        for function in self.program.functions.values():
+            text += [""] + self._function(function)
+        return "\n".join(text + self._data()) + "\n"
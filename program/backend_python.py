@@ -0,0 +1,373 @@
+import os
+import sys
+import marshal
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from programa_tac import (TACProgram, TACFunction, TACBackendError, BINARY_OPERATORS,
+                          is_int_literal, is_string_literal, is_name, field_slot, vtable_slot,
+                          string_literal_value, jump_targets)
+
+BACKEND_VERSION = "2"
+DEFAULT_CACHE_DIR = Path(os.environ.get("COMPISCRIPT_CACHE",
+                                        Path.home() / ".cache" / "compiscript")) / "python"
+MAIN_FUNCTION = "_cps_main"
+
+
+class CpsObject:
+    __slots__ = ("class_name", "fields")
+
+    def __init__(self, class_name: str, fields: list):
+        self.class_name = class_name
+        self.fields = fields
+
+
+def _rt_str(value) -> str:
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if value is None:
+        return "null"
+    if isinstance(value, list):
+        return "[" + ", ".join(_rt_str(v) for v in value) + "]"
+    if isinstance(value, CpsObject):
+        return f"<{value.class_name}>"
+    return str(value)
+
+
+def _rt_add(a, b):
+    if type(a) is str or type(b) is str:
+        return _rt_str(a) + _rt_str(b)
+    return a + b
+
+
+def _rt_div(a, b):
+    q = a // b
+    if q < 0 and q * b != a:
+        q += 1
+    return q
+
+
+def _rt_mod(a, b):
+    return a - b * _rt_div(a, b)
+
+
+def _rt_print(value):
+    print(_rt_str(value))
+
+
+def make_allocator(class_sizes: Dict[str, int]):
+    def _rt_new(class_name: str) -> CpsObject:
+        return CpsObject(class_name, [None] * class_sizes.get(class_name, 0))
+    return _rt_new
+
+
+RUNTIME_NAMES = ("CpsObject", "_rt_str", "_rt_add", "_rt_div", "_rt_mod", "_rt_print")
+
+
+def python_name(name: str) -> str:
+    return f"v_{name}"
+
+
+def function_symbol(name: str) -> str:
+    return "f_" + name.replace(".", "__")
+
+
+class PythonFunctionGenerator:
+
+    def __init__(self, program: TACProgram, instructions: list, params: List[str],
+                 global_names, is_main: bool = False):
+        self.program = program
+        self.instructions = instructions
+        self.params = params
+        self.global_names = sorted(global_names)
+        self.is_main = is_main
+        self.lines: List[str] = []
+        self.pending_params: List[str] = []
+
+    def operand(self, operand: Optional[str]) -> str:
+        if operand is None:
+            return "None"
+        if is_int_literal(operand):
+            return operand
+        if is_string_literal(operand):
+            return repr(string_literal_value(operand))
+        if operand == "true":
+            return "True"
+        if operand == "false":
+            return "False"
+        if operand == "null":
+            return "None"
+        if is_name(operand):
+            return python_name(operand)
+        raise TACBackendError(f"Operando no soportado por el backend Python: '{operand}'")
+
+    def return_statement(self, value: str = "_ret") -> str:
+        return "return" if self.is_main else f"return {value}"
+
+    def _split_blocks(self) -> List[tuple]:
+        targets = jump_targets(self.instructions)
+        blocks = [(None, [])]
+        for instruction in self.instructions:
+            if instruction.op == "label":
+                if instruction.result in targets:
+                    blocks.append((instruction.result, []))
+                continue
+            blocks[-1][1].append(instruction)
+            if instruction.op in ("goto", "if_false", "if_true"):
+                blocks.append((None, []))
+        blocks = [b for i, b in enumerate(blocks) if b[1] or b[0] is not None or i == len(blocks) - 1]
+        if not blocks[0][1] and len(blocks) > 1 and blocks[0][0] is None:
+            blocks.pop(0)
+        return blocks
+
+    def _end_labels(self, blocks: List[tuple]) -> set:
+        ends = set()
+        for label, body in reversed(blocks):
+            if body:
+                break
+            ends.add(label)
+        return ends
+
+    def generate(self, def_name: str) -> str:
+        args = ", ".join(python_name(p) for p in self.params)
+        self.lines.append(f"def {def_name}({args}):")
+        if self.global_names:
+            self.lines.append("    global " + ", ".join(python_name(n) for n in self.global_names))
+        if not self.is_main:
+            self.lines.append("    _ret = None")
+
+        blocks = self._split_blocks()
+        self.block_index = {label: i for i, (label, _) in enumerate(blocks)}
+        self.end_labels = self._end_labels(blocks)
+
+        if len(blocks) == 1:
+            if not self._emit_block(blocks[0][1], 0, 1, "    "):
+                self.lines.append("    " + self.return_statement())
+        else:
+            self.lines.append("    _b = 0")
+            self.lines.append("    while True:")
+            last = len(blocks) - 1
+            while last > 0 and blocks[last][0] in self.end_labels:
+                last -= 1
+            for index in range(last + 1):
+                self.lines.append(f"        if _b == {index}:")
+                if self._emit_block(blocks[index][1], index, index + 1, "            "):
+                    continue
+                if index == last:
+                    self.lines.append("            " + self.return_statement())
+                else:
+                    self.lines.append(f"            _b = {index + 1}")
+        return "\n".join(self.lines) + "\n"
+
+    def _jump(self, label: str, current: int, indent: str):
+        if label in self.end_labels:
+            self.lines.append(indent + self.return_statement())
+            return
+        target = self.block_index[label]
+        self.lines.append(f"{indent}_b = {target}")
+        if target <= current:
+            self.lines.append(f"{indent}continue")
+
+    def _emit_block(self, body: list, current: int, fallthrough: int, indent: str) -> bool:
+        self.pending_params = []
+        for position, instruction in enumerate(body):
+            op = instruction.op
+            if op == "goto":
+                self._jump(instruction.result, current, indent)
+                return True
+            elif op in ("if_false", "if_true"):
+                condition = self.operand(instruction.arg1)
+                test = f"not {condition}" if op == "if_false" else condition
+                self.lines.append(f"{indent}if {test}:")
+                self._jump(instruction.result, current, indent + "    ")
+                if instruction.result not in self.end_labels and self.block_index[instruction.result] > current:
+                    self.lines.append(f"{indent}else:")
+                    self.lines.append(f"{indent}    _b = {fallthrough}")
+                    return True
+            elif op == "SetReturn":
+                value = "None" if instruction.arg1 == "void" else self.operand(instruction.arg1)
+                following = body[position + 1] if position + 1 < len(body) else None
+                if (following is not None and following.op == "goto"
+                        and following.result in self.end_labels and not self.is_main):
+                    self.lines.append(f"{indent}return {value}")
+                    return True
+                self.lines.append(f"{indent}_ret = {value}")
+            else:
+                self._emit_instruction(instruction, indent)
+        return False
+
+    def _emit_instruction(self, instruction, indent: str):
+        op = instruction.op
+        if op == "=":
+            self.lines.append(f"{indent}{self.operand(instruction.result)} = {self.operand(instruction.arg1)}")
+        elif op == "setfield":
+            self.lines.append(f"{indent}{self.operand(instruction.result)}.fields[{field_slot(instruction.arg1)}] = "
+                              f"{self.operand(instruction.arg2)}")
+        elif op == "getfield":
+            self.lines.append(f"{indent}{self.operand(instruction.result)} = "
+                              f"{self.operand(instruction.arg1)}.fields[{field_slot(instruction.arg2)}]")
+        elif op in BINARY_OPERATORS and instruction.arg2 is not None:
+            self.lines.append(f"{indent}{self.operand(instruction.result)} = {self._binary(instruction)}")
+        elif op in ("-", "!"):
+            operator = "-" if op == "-" else "not "
+            self.lines.append(f"{indent}{self.operand(instruction.result)} = "
+                              f"{operator}{self.operand(instruction.arg1)}")
+        elif op == "[]":
+            self.lines.append(f"{indent}{self.operand(instruction.result)} = "
+                              f"{self.operand(instruction.arg1)}[{self.operand(instruction.arg2)}]")
+        elif op == "[]=":
+            self.lines.append(f"{indent}{self.operand(instruction.result)}[{self.operand(instruction.arg1)}] = "
+                              f"{self.operand(instruction.arg2)}")
+        elif op == "new_array":
+            self.lines.append(f"{indent}{self.operand(instruction.result)} = "
+                              f"[None] * {self.operand(instruction.arg1)}")
+        elif op == "length":
+            self.lines.append(f"{indent}{self.operand(instruction.result)} = "
+                              f"len({self.operand(instruction.arg1)})")
+        elif op == "call":
+            self.lines.append(f"{indent}_rt_print({self.operand(instruction.arg2)})")
+        elif op == "PushParam":
+            self.pending_params.append(self.operand(instruction.arg1))
+        elif op == "PopParams":
+            pass
+        elif op == "LCall":
+            function = self.program.resolve_call(instruction.arg1)
+            if function is None:
+                raise TACBackendError(f"Llamada a función desconocida: '{instruction.arg1}'")
+            args = ", ".join(self.pending_params)
+            self.pending_params = []
+            self.lines.append(f"{indent}{self.operand(instruction.result)} = "
+                              f"{function_symbol(function.name)}({args})")
+        elif op == "VCall":
+            _, slot = vtable_slot(instruction.arg2)
+            args = ", ".join(self.pending_params)
+            receiver = self.pending_params[0]
+            self.pending_params = []
+            self.lines.append(f"{indent}{self.operand(instruction.result)} = "
+                              f"_rt_vtables[{receiver}.class_name][{slot}]({args})")
+        elif op == "new":
+            count = int(instruction.arg2 or 0)
+            args = self.pending_params[len(self.pending_params) - count:] if count else []
+            del self.pending_params[len(self.pending_params) - count:]
+            target = self.operand(instruction.result)
+            self.lines.append(f"{indent}{target} = _rt_new({instruction.arg1!r})")
+            constructor = self.program.resolve_method(instruction.arg1, "constructor")
+            if constructor is not None:
+                self.lines.append(f"{indent}{function_symbol(constructor.name)}"
+                                  f"({', '.join([target] + args)})")
+        elif op in ("return", "ActivationRecord", "label"):
+            pass
+        else:
+            raise TACBackendError(f"Instrucción TAC no soportada por el backend Python: '{op}'")
+
+    def _binary(self, instruction) -> str:
+        op = instruction.op
+        left = self.operand(instruction.arg1)
+        right = self.operand(instruction.arg2)
+        if op == "+":
+            if is_int_literal(instruction.arg1) and is_int_literal(instruction.arg2):
+                return f"{left} + {right}"
+            return f"_rt_add({left}, {right})"
+        if op == "/":
+            return f"_rt_div({left}, {right})"
+        if op == "%":
+            return f"_rt_mod({left}, {right})"
+        if op == "&&":
+            return f"({left} and {right})"
+        if op == "||":
+            return f"({left} or {right})"
+        return f"{left} {op} {right}"
+
+
+class PythonBackend:
+
+    def __init__(self, program: TACProgram, cache_dir: Optional[Path] = DEFAULT_CACHE_DIR):
+        self.program = program
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.cache_hits = 0
+        self.compiled = 0
+
+    def function_source(self, function: TACFunction) -> str:
+        generator = PythonFunctionGenerator(
+            self.program, function.body, function.params,
+            self.program.function_globals(function))
+        return generator.generate(function_symbol(function.name))
+
+    def main_source(self) -> str:
+        generator = PythonFunctionGenerator(
+            self.program, self.program.main, [], self.program.global_names, is_main=True)
+        return generator.generate(MAIN_FUNCTION)
+
+    def class_sizes(self) -> Dict[str, int]:
+        return {name: self.program.class_size(name) for name in self.program.classes}
+
+    def vtables(self) -> Dict[str, tuple]:
+        return {name: tuple(function_symbol(f.name) for f in self.program.vtable_functions(name))
+                for name in self.program.classes}
+
+    def sources(self) -> List[str]:
+        return [self.function_source(f) for f in self.program.functions.values()] + [self.main_source()]
+
+    def module_source(self) -> str:
+        header = [
+            "from backend_python import " + ", ".join(RUNTIME_NAMES + ("make_allocator",)),
+            "",
+            f"_rt_new = make_allocator({self.class_sizes()!r})",
+        ]
+        header += [f"{python_name(n)} = None" for n in sorted(self.program.global_names)]
+        body = "\n\n".join(self.sources())
+        vtables = ", ".join(f"{name!r}: ({''.join(f + ', ' for f in functions)})"
+                            for name, functions in self.vtables().items())
+        footer = f'\n_rt_vtables = {{{vtables}}}\n\nif __name__ == "__main__":\n    {MAIN_FUNCTION}()\n'
+        return "\n".join(header) + "\n\n\n" + body + footer
+
+    def _cache_path(self, source: str) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        key = f"{BACKEND_VERSION}:{sys.implementation.cache_tag}:{source}"
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{digest}.bin"
+
+    def compile_source(self, source: str):
+        path = self._cache_path(source)
+        if path is not None and path.exists():
+            try:
+                code = marshal.loads(path.read_bytes())
+                self.cache_hits += 1
+                return code
+            except (ValueError, EOFError, TypeError, OSError):
+                pass
+
+        code = compile(source, "<compiscript>", "exec")
+        self.compiled += 1
+
+        if path is not None:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
+                with os.fdopen(fd, "wb") as f:
+                    f.write(marshal.dumps(code))
+                os.replace(tmp_name, path)
+            except OSError:
+                pass
+        return code
+
+    def load(self) -> dict:
+        namespace = {name: globals()[name] for name in RUNTIME_NAMES}
+        namespace["_rt_new"] = make_allocator(self.class_sizes())
+        for name in self.program.global_names:
+            namespace[python_name(name)] = None
+        for source in self.sources():
+            exec(self.compile_source(source), namespace)
+        namespace["_rt_vtables"] = {name: tuple(namespace[f] for f in functions)
+                                    for name, functions in self.vtables().items()}
+        return namespace
+
+    def run(self) -> dict:
+        namespace = self.load()
+        namespace[MAIN_FUNCTION]()
+        return namespace
@@ -0,0 +1,593 @@
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from programa_tac import (TACProgram, TACFunction, TACBackendError, BINARY_OPERATORS,
+                          is_int_literal, is_string_literal, is_name, is_temp, field_slot, vtable_slot,
+                          string_literal_value, jump_targets, instruction_names,
+                          int_literal_value)
+from asignacion_registros import (LiveInterval, live_intervals, linear_scan, deferred_param_uses,
+                                  trailing_labels, assign_spill_words)
+from backend_c import find_compiler, c_string_literal
+
+RUNTIME_PATH = Path(__file__).parent / "cps_runtime_asm.c"
+DEFAULT_CFLAGS = ["-O2", "-w", "-fwrapv"]
+# Los enteros van etiquetados ((n << 1) | 1) en una palabra de 64 bits: queda un bit menos.
+INT_BITS = 63
+
+WORD = 8
+ARGUMENT_REGISTERS = ["%rdi", "%rsi", "%rdx", "%rcx", "%r8", "%r9"]
+CALLEE_SAVED = ["%rbx", "%r12", "%r13", "%r14", "%r15"]
+CALLER_SAVED = ["%r10", "%r11"]
+ALLOCATABLE = CALLER_SAVED + CALLEE_SAVED
+CALL_OPS = {"LCall", "VCall", "new", "call", "new_array"}
+
+TRUE_VALUE = 6
+FALSE_VALUE = 2
+CONDITION_CODES = {"<": "l", "<=": "le", ">": "g", ">=": "ge", "==": "e", "!=": "ne"}
+NEGATED_CODES = {"l": "ge", "le": "g", "g": "le", "ge": "l", "e": "ne", "ne": "e"}
+RELATIONAL = {"<", "<=", ">", ">="}
+
+
+def asm_function(name: str) -> str:
+    return "f_" + name.replace(".", "__")
+
+
+def asm_global(name: str) -> str:
+    return f"v_{name}"
+
+
+def tagged_int(literal: str, bits: int = INT_BITS) -> int:
+    return (int_literal_value(literal, bits) << 1) | 1
+
+
+def fits_imm32(value: int) -> bool:
+    return -(1 << 31) <= value < (1 << 31)
+
+
+class X86FunctionGenerator:
+
+    def __init__(self, backend: 'X86Backend', label: str, instructions: list,
+                 params: List[str], local_names: Set[str], class_name: Optional[str], is_main: bool):
+        self.backend = backend
+        self.program = backend.program
+        self.label = label
+        self.instructions = instructions
+        self.params = params
+        self.local_names = local_names
+        self.class_name = class_name
+        self.is_main = is_main
+        self.prefix = f".L{backend.next_function_id()}"
+        self.lines: List[str] = []
+        self.cold: List[str] = []
+        self.locations: Dict[str, str] = {}
+        self.counter = 0
+        self.fused = None
+
+    def emit(self, text: str):
+        self.lines.append("    " + text)
+
+    def new_label(self, hint: str) -> str:
+        self.counter += 1
+        return f"{self.prefix}_{hint}{self.counter}"
+
+    def block_label(self, label: str) -> str:
+        return f"{self.prefix}_{label}"
+
+    def source(self, operand: Optional[str]) -> Optional[str]:
+        if operand is None or operand == "null":
+            return "$0"
+        if operand in self.locations:
+            return self.locations[operand]
+        if is_int_literal(operand):
+            value = tagged_int(operand)
+            return f"${value}" if fits_imm32(value) else None
+        if operand == "true":
+            return f"${TRUE_VALUE}"
+        if operand == "false":
+            return f"${FALSE_VALUE}"
+        if is_string_literal(operand):
+            return None
+        if is_name(operand):
+            self.backend.referenced_globals.add(operand)
+            return f"{asm_global(operand)}(%rip)"
+        raise TACBackendError(f"Operando no soportado por el backend x86-64: '{operand}'")
+
+    def load(self, operand: Optional[str], register: str):
+        source = self.source(operand)
+        if source is None and is_string_literal(operand):
+            self.emit(f"leaq {self.backend.string_label(string_literal_value(operand))}(%rip), {register}")
+        elif source is None:
+            self.emit(f"movabsq ${tagged_int(operand)}, {register}")
+        elif source != register:
+            self.emit(f"movq {source}, {register}")
+
+    def store(self, register: str, name: str):
+        destination = self.source(name)
+        if destination != register:
+            self.emit(f"movq {register}, {destination}")
+
+    def is_memory(self, location: Optional[str]) -> bool:
+        return location is not None and "(" in location
+
+    def box_flag(self, code: str):
+        self.emit(f"set{code} %al")
+        self.emit("movzbl %al, %eax")
+        self.emit("leaq 2(,%rax,4), %rax")
+
+    def runtime_call_lines(self, function: str) -> List[str]:
+        # Las llamadas al runtime fuera de los puntos de llamada del TAC preservan
+        # los registros asignables que el llamado puede destruir.
+        saved = sorted(r for r in self.used_registers if r in CALLER_SAVED)
+        lines = [f"    pushq {r}" for r in saved]
+        if len(saved) % 2:
+            lines.append("    subq $8, %rsp")
+        lines.append(f"    call {function}")
+        if len(saved) % 2:
+            lines.append("    addq $8, %rsp")
+        lines += [f"    popq {r}" for r in reversed(saved)]
+        return lines
+
+    def runtime_call(self, function: str):
+        self.lines += self.runtime_call_lines(function)
+
+    def null_check(self, register: str):
+        self.emit(f"testq {register}, {register}")
+        self.emit(f"jz {self.prefix}_fail_null")
+        self.needs_null_stub = True
+
+    def field_address(self, obj: str, slot: str) -> str:
+        self.load(obj, "%rax")
+        self.null_check("%rax")
+        return f"{16 + WORD * field_slot(slot)}(%rax)"
+
+    def call(self, function: str, args: List[str], dispatch: Optional[int] = None):
+        stack_args = args[len(ARGUMENT_REGISTERS):]
+        padding = len(stack_args) % 2
+        if padding:
+            self.emit("subq $8, %rsp")
+        for arg in reversed(stack_args):
+            source = self.source(arg)
+            if source is None:
+                self.load(arg, "%rax")
+                source = "%rax"
+            self.emit(f"pushq {source}")
+        for arg, register in zip(args, ARGUMENT_REGISTERS):
+            self.load(arg, register)
+        if dispatch is None:
+            self.emit(f"call {function}")
+        else:
+            # El receptor ya está en %rdi: objeto -> descriptor de clase -> vtable -> slot.
+            self.null_check("%rdi")
+            self.emit("movq 8(%rdi), %r11")
+            self.emit("movq 16(%r11), %r11")
+            self.emit(f"call *{WORD * dispatch}(%r11)")
+        if stack_args:
+            self.emit(f"addq ${WORD * (len(stack_args) + padding)}, %rsp")
+
+    def _binary(self, instruction, position: int):
+        op = instruction.op
+        left, right = instruction.arg1, instruction.arg2
+        self.load(left, "%rax")
+        right_source = self.source(right)
+        if right_source is None or not right_source.startswith("$") or op in ("/", "%", "*", "&&", "||"):
+            self.load(right, "%rcx")
+            right_source = "%rcx"
+
+        if op == "+":
+            if is_string_literal(left) or is_string_literal(right):
+                self.emit("movq %rax, %rdi")
+                self.emit(f"movq {right_source}, %rsi")
+                self.runtime_call("cps_add")
+                return
+            slow, done = self.new_label("add_slow"), self.new_label("add_done")
+            checks = [r for r, operand in (("%eax", left), ("%ecx", right)) if not is_int_literal(operand)]
+            if checks:
+                self.emit(f"movl {checks[0]}, %edx")
+                for register in checks[1:]:
+                    self.emit(f"andl {register}, %edx")
+                self.emit("testb $1, %dl")
+                self.emit(f"jz {slow}")
+            self.emit("leaq -1(%rax,%rcx), %rax" if right_source == "%rcx"
+                      else f"addq ${int(right_source[1:]) - 1}, %rax")
+            self.lines.append(f"{done}:")
+            if checks:
+                self.cold.append(f"{slow}:")
+                self.cold.append("    movq %rax, %rdi")
+                self.cold.append(f"    movq {right_source}, %rsi")
+                self.cold += self.runtime_call_lines("cps_add")
+                self.cold.append(f"    jmp {done}")
+        elif op == "-":
+            if right_source.startswith("$"):
+                self.emit(f"subq ${int(right_source[1:]) - 1}, %rax")
+            else:
+                self.emit(f"subq {right_source}, %rax")
+                self.emit("incq %rax")
+        elif op == "*":
+            self.emit("sarq $1, %rax")
+            self.emit("decq %rcx")
+            self.emit("imulq %rcx, %rax")
+            self.emit("incq %rax")
+        elif op in ("/", "%"):
+            self.emit("cmpq $1, %rcx")
+            self.emit(f"je {self.prefix}_fail_div")
+            self.needs_div_stub = True
+            self.emit("sarq $1, %rax")
+            self.emit("sarq $1, %rcx")
+            self.emit("cqto")
+            self.emit("idivq %rcx")
+            self.emit("leaq 1(%rax,%rax), %rax" if op == "/" else "leaq 1(%rdx,%rdx), %rax")
+        elif op in RELATIONAL:
+            compare = self.new_label("cmp")
+            if not (is_int_literal(left) or is_int_literal(right)):
+                slow = self.new_label("cmp_slow")
+                self.emit("movl %eax, %edx")
+                self.emit("andl %ecx, %edx")
+                self.emit("testb $1, %dl")
+                self.emit(f"jz {slow}")
+                self.cold.append(f"{slow}:")
+                self.cold.append("    movq %rax, %rdi")
+                self.cold.append("    movq %rcx, %rsi")
+                self.cold += self.runtime_call_lines("cps_compare")
+                self.cold.append("    xorl %ecx, %ecx")
+                self.cold.append(f"    jmp {compare}")
+            self.lines.append(f"{compare}:")
+            self.emit(f"cmpq {right_source}, %rax")
+            if self._can_fuse(instruction, position):
+                self.fused = (instruction.result, CONDITION_CODES[op])
+                return False
+            self.box_flag(CONDITION_CODES[op])
+        elif op in ("==", "!="):
+            identity = any(is_int_literal(o) or o in ("true", "false", "null") for o in (left, right))
+            self.emit(f"cmpq {right_source}, %rax")
+            if identity:
+                self.box_flag(CONDITION_CODES[op])
+                return
+            equal, different, done = self.new_label("eq"), self.new_label("ne"), self.new_label("eq_done")
+            self.emit(f"je {equal}")
+            self.emit("movq %rax, %rdx")
+            self.emit("orq %rcx, %rdx")
+            self.emit("testb $7, %dl")
+            self.emit(f"jnz {different}")
+            self.emit("movq %rax, %rdi")
+            self.emit("movq %rcx, %rsi")
+            self.runtime_call("cps_equals")
+            self.emit(f"jmp {done}")
+            self.lines.append(f"{equal}:")
+            self.emit(f"movl ${TRUE_VALUE}, %eax")
+            self.emit(f"jmp {done}")
+            self.lines.append(f"{different}:")
+            self.emit(f"movl ${FALSE_VALUE}, %eax")
+            self.lines.append(f"{done}:")
+            if op == "!=":
+                self.emit("xorq $4, %rax")
+        else:
+            self.emit("cmpq $2, %rax")
+            self.emit("seta %al")
+            self.emit(f"cmpq $2, {right_source}")
+            self.emit("seta %cl")
+            self.emit("andb %cl, %al" if op == "&&" else "orb %cl, %al")
+            self.emit("movzbl %al, %eax")
+            self.emit("leaq 2(,%rax,4), %rax")
+
+    def _can_fuse(self, instruction, position: int) -> bool:
+        if position + 1 >= len(self.instructions):
+            return False
+        following = self.instructions[position + 1]
+        interval = self.intervals.get(instruction.result)
+        return (following.op in ("if_false", "if_true") and following.arg1 == instruction.result
+                and is_temp(instruction.result) and interval is not None
+                and interval.end == position + 1)
+
+    def _branch(self, instruction):
+        target = self.block_label(instruction.result)
+        condition = instruction.arg1
+        if self.fused is not None and self.fused[0] == condition:
+            code = self.fused[1]
+            self.fused = None
+            self.emit(f"j{NEGATED_CODES[code] if instruction.op == 'if_false' else code} {target}")
+            return
+        if condition in ("true", "false", "null") or is_int_literal(condition):
+            truthy = condition == "true" or (is_int_literal(condition) and int(condition) != 0)
+            if truthy == (instruction.op == "if_true"):
+                self.emit(f"jmp {target}")
+            return
+        source = self.source(condition)
+        self.emit(f"cmpq $2, {source}")
+        self.emit(f"{'jbe' if instruction.op == 'if_false' else 'ja'} {target}")
+
+    def _assign(self, value: str, target: str):
+        source, destination = self.source(value), self.source(target)
+        if source is not None and (not self.is_memory(source) or not self.is_memory(destination)):
+            if source != destination:
+                self.emit(f"movq {source}, {destination}")
+            return
+        if not self.is_memory(destination):
+            self.load(value, destination)
+            return
+        self.load(value, "%rax")
+        self.store("%rax", target)
+
+    def _lower(self, instruction, position: int, pending: List[str], targets: Set[str]):
+        op = instruction.op
+        result = instruction.result
+
+        if op == "label":
+            if result in targets:
+                self.lines.append(f"{self.block_label(result)}:")
+        elif op == "goto":
+            self.emit(f"jmp {self.block_label(result)}")
+        elif op in ("if_false", "if_true"):
+            self._branch(instruction)
+        elif op == "SetReturn":
+            if self.is_main:
+                return
+            if instruction.arg1 == "void":
+                self.emit("xorl %eax, %eax")
+            else:
+                self.load(instruction.arg1, "%rax")
+            following = self.instructions[position + 1] if position + 1 < len(self.instructions) else None
+            if following is not None and following.op == "goto" and following.result in self.end_labels:
+                self.emit(f"jmp {self.prefix}_return")
+                self.skip_next = True
+            else:
+                self.emit(f"movq %rax, {self.return_slot}")
+        elif op == "=":
+            self._assign(instruction.arg1, result)
+        elif op == "setfield":
+            address = self.field_address(result, instruction.arg1)
+            self.load(instruction.arg2, "%rcx")
+            self.emit(f"movq %rcx, {address}")
+        elif op == "getfield":
+            address = self.field_address(instruction.arg1, instruction.arg2)
+            self.emit(f"movq {address}, %rax")
+            self.store("%rax", result)
+        elif op in BINARY_OPERATORS and instruction.arg2 is not None:
+            if self._binary(instruction, position) is not False:
+                self.store("%rax", result)
+        elif op == "-":
+            self.emit("movl $2, %eax")
+            source = self.source(instruction.arg1)
+            if source is None:
+                self.load(instruction.arg1, "%rcx")
+                source = "%rcx"
+            self.emit(f"subq {source}, %rax")
+            self.store("%rax", result)
+        elif op == "!":
+            self.load(instruction.arg1, "%rcx")
+            self.emit("cmpq $2, %rcx")
+            self.box_flag("be")
+            self.store("%rax", result)
+        elif op in ("[]", "[]="):
+            array, index = (instruction.arg1, instruction.arg2) if op == "[]" else (result, instruction.arg1)
+            self.load(array, "%rax")
+            self.load(index, "%rcx")
+            self.null_check("%rax")
+            self.emit("sarq $1, %rcx")
+            self.emit("cmpq 8(%rax), %rcx")
+            self.emit(f"jae {self.prefix}_fail_index")
+            self.needs_index_stub = True
+            if op == "[]":
+                self.emit("movq 16(%rax,%rcx,8), %rax")
+                self.store("%rax", result)
+            else:
+                self.load(instruction.arg2, "%rdx")
+                self.emit("movq %rdx, 16(%rax,%rcx,8)")
+        elif op == "new_array":
+            self.load(instruction.arg1, "%rdi")
+            self.emit("call cps_new_array")
+            self.store("%rax", result)
+        elif op == "length":
+            self.load(instruction.arg1, "%rax")
+            self.null_check("%rax")
+            self.emit("movq 8(%rax), %rax")
+            self.emit("leaq 1(%rax,%rax), %rax")
+            self.store("%rax", result)
+        elif op == "call":
+            self.load(instruction.arg2, "%rdi")
+            self.emit("call cps_print")
+        elif op == "PushParam":
+            pending.append(instruction.arg1)
+        elif op == "LCall":
+            function = self.program.resolve_call(instruction.arg1)
+            if function is None:
+                raise TACBackendError(f"Llamada a función desconocida: '{instruction.arg1}'")
+            self.call(asm_function(function.name), list(pending))
+            pending.clear()
+            if result:
+                self.store("%rax", result)
+        elif op == "VCall":
+            _, slot = vtable_slot(instruction.arg2)
+            self.call(None, list(pending), dispatch=slot)
+            pending.clear()
+            if result:
+                self.store("%rax", result)
+        elif op == "new":
+            count = int(instruction.arg2 or 0)
+            args = pending[len(pending) - count:] if count else []
+            del pending[len(pending) - count:]
+            class_name = instruction.arg1
+            if class_name not in self.program.classes:
+                raise TACBackendError(f"Clase desconocida: '{class_name}'")
+            self.emit(f"leaq {self.backend.class_label(class_name)}(%rip), %rdi")
+            self.runtime_call("cps_new_object")
+            constructor = self.program.resolve_method(class_name, "constructor")
+            if constructor is not None:
+                self.emit(f"movq %rax, {self.new_slot}")
+                self.call(asm_function(constructor.name), ["%new"] + args)
+                self.emit(f"movq {self.new_slot}, %rax")
+            self.store("%rax", result)
+        elif op in ("PopParams", "return", "ActivationRecord"):
+            pass
+        else:
+            raise TACBackendError(f"Instrucción TAC no soportada por el backend x86-64: '{op}'")
+
+    def _allocate(self) -> List[LiveInterval]:
+        calls = [p for p, i in enumerate(self.instructions) if i.op in CALL_OPS]
+        self.intervals, self.entry_live = live_intervals(
+            self.instructions, self.local_names, calls, deferred_param_uses(self.instructions))
+        return linear_scan(self.intervals, ALLOCATABLE, set(CALLEE_SAVED))
+
+    def _assign_slots(self, intervals: List[LiveInterval]):
+        self.used_registers = {i.register for i in intervals if i.register}
+        saved = [r for r in CALLEE_SAVED if r in self.used_registers]
+        self.saved_registers = saved
+        base = WORD * len(saved)
+        self.return_slot = f"-{base + WORD}(%rbp)"
+        self.new_slot = f"-{base + 2 * WORD}(%rbp)"
+        self.locations["%new"] = self.new_slot
+        base += 2 * WORD
+
+        stack_params = set(self.params[len(ARGUMENT_REGISTERS):])
+        words, top = assign_spill_words(intervals, self.program.frame_symbols, self.local_names, stack_params)
+        for interval in intervals:
+            if interval.register:
+                self.locations[interval.name] = interval.register
+            elif interval.name in stack_params:
+                stack_index = self.params.index(interval.name) - len(ARGUMENT_REGISTERS)
+                self.locations[interval.name] = f"{16 + WORD * stack_index}(%rbp)"
+            else:
+                self.locations[interval.name] = f"-{base + WORD * words[interval.name]}(%rbp)"
+        size = base + WORD * top
+        self.frame_size = (size + 15) & ~15
+        self.spilled = sum(1 for i in intervals if i.spilled)
+
+    def generate(self) -> List[str]:
+        self.needs_null_stub = self.needs_div_stub = self.needs_index_stub = False
+        self.skip_next = False
+        self.end_labels = trailing_labels(self.instructions)
+        self._assign_slots(self._allocate())
+
+        targets = jump_targets(self.instructions)
+        pending: List[str] = []
+        for position, instruction in enumerate(self.instructions):
+            if self.skip_next:
+                self.skip_next = False
+                if instruction.op == "goto":
+                    continue
+            self._lower(instruction, position, pending, targets)
+        body, self.lines = self.lines, []
+
+        self.lines.append(f"{self.label}:")
+        self.emit("pushq %rbp")
+        self.emit("movq %rsp, %rbp")
+        if self.frame_size:
+            self.emit(f"subq ${self.frame_size}, %rsp")
+        for index, register in enumerate(self.saved_registers):
+            self.emit(f"movq {register}, -{WORD * (index + 1)}(%rbp)")
+        if not self.is_main:
+            self.emit(f"movq $0, {self.return_slot}")
+        for index, name in enumerate(self.params[:len(ARGUMENT_REGISTERS)]):
+            if name in self.entry_live:
+                self.store(ARGUMENT_REGISTERS[index], name)
+        for index, name in enumerate(self.params[len(ARGUMENT_REGISTERS):]):
+            location = self.locations.get(name)
+            if name in self.entry_live and location and not self.is_memory(location):
+                self.emit(f"movq {16 + WORD * index}(%rbp), {location}")
+        for name in sorted(self.entry_live - set(self.params)):
+            self.emit(f"movq $0, {self.locations[name]}")
+
+        self.lines += body
+        if not self.is_main:
+            self.emit(f"movq {self.return_slot}, %rax")
+        self.lines.append(f"{self.prefix}_return:")
+        for index, register in enumerate(self.saved_registers):
+            self.emit(f"movq -{WORD * (index + 1)}(%rbp), {register}")
+        self.emit("leave")
+        self.emit("ret")
+        self.lines += self.cold
+        for needed, stub, runtime in ((self.needs_null_stub, "fail_null", "cps_fail_null"),
+                                      (self.needs_div_stub, "fail_div", "cps_fail_div"),
+                                      (self.needs_index_stub, "fail_index", "cps_fail_index")):
+            if needed:
+                self.lines.append(f"{self.prefix}_{stub}:")
+                self.emit(f"call {runtime}")
+        return self.lines
+
+
+class X86Backend:
+
+    def __init__(self, program: TACProgram):
+        self.program = program
+        self.strings: Dict[str, str] = {}
+        self.referenced_globals: Set[str] = set()
+        self.function_count = 0
+        self.spilled: Dict[str, int] = {}
+
+    def next_function_id(self) -> int:
+        self.function_count += 1
+        return self.function_count
+
+    def string_label(self, text: str) -> str:
+        if text not in self.strings:
+            self.strings[text] = f"cps_str_{len(self.strings)}"
+        return self.strings[text]
+
+    def class_label(self, class_name: str) -> str:
+        return f"cps_class_{class_name}"
+
+    def _function(self, function: TACFunction) -> List[str]:
+        local_names = function.names() - self.program.function_globals(function)
+        generator = X86FunctionGenerator(self, asm_function(function.name), function.body,
+                                         function.params, local_names, function.class_name, False)
+        lines = generator.generate()
+        self.spilled[function.name] = generator.spilled
+        return lines
+
+    def _main(self) -> List[str]:
+        local_names = {n for i in self.program.main for n in instruction_names(i)} - self.program.global_names
+        generator = X86FunctionGenerator(self, "cps_main", self.program.main, [], local_names, None, True)
+        lines = generator.generate()
+        self.spilled["main"] = generator.spilled
+        return lines
+
+    def _data(self) -> List[str]:
+        lines = ["", "    .data"]
+        for class_name in self.program.classes:
+            lines += ["    .p2align 3", f"{self.class_label(class_name)}:",
+                      f"    .quad .Lclass_name_{class_name}, {self.program.class_size(class_name)}, "
+                      + (f".Lvtable_{class_name}" if self.program.class_vtables.get(class_name) else "0")]
+            functions = self.program.vtable_functions(class_name)
+            if functions:
+                lines.append(f".Lvtable_{class_name}:")
+                lines.append("    .quad " + ", ".join(asm_function(f.name) for f in functions))
+        for text, label in self.strings.items():
+            data = text.encode("utf-8")
+            lines += ["    .p2align 3", f"{label}:", f"    .quad 1, {len(data)}",
+                      f"    .asciz {c_string_literal(text)}"]
+
+        lines += ["", "    .section .rodata"]
+        for class_name in self.program.classes:
+            lines.append(f".Lclass_name_{class_name}: .asciz \"{class_name}\"")
+
+        lines += ["", "    .bss", "    .p2align 3"]
+        for name in sorted(self.program.global_names | self.referenced_globals):
+            lines.append(f"{asm_global(name)}: .zero {WORD}")
+        return lines
+
+    def generate(self) -> str:
+        self.strings = {}
+        self.referenced_globals = set()
+        self.function_count = 0
+        self.spilled = {}
+        text = ["    .text"]
+        for function in self.program.functions.values():
+            text += [""] + self._function(function)
+        text += ["", "    .globl cps_main"] + self._main()
+        out = text + self._data() + ["", '    .section .note.GNU-stack,"",@progbits']
+        return "\n".join(out) + "\n"
+
+    def build(self, asm_path: str, exe_path: str, compiler: Optional[str] = None,
+              flags: Optional[List[str]] = None) -> str:
+        compiler = compiler or find_compiler()
+        if compiler is None:
+            raise TACBackendError("No se encontró un compilador de C (cc/gcc/clang) para ensamblar")
+        with open(asm_path, "w", encoding="utf-8") as f:
+            f.write(self.generate())
+        command = ([compiler] + (flags if flags is not None else DEFAULT_CFLAGS)
+                   + [asm_path, str(RUNTIME_PATH), "-o", exe_path])
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise TACBackendError(f"Falló el ensamblado:\n{result.stderr.strip()}")
+        return exe_path
+
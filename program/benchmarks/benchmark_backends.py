@@ -0,0 +1,86 @@
+import io
+import os
+import sys
+import time
+import tempfile
+import subprocess
+import contextlib
+from pathlib import Path
+
+PROGRAM_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROGRAM_DIR))
+
+from antlr4 import InputStream, CommonTokenStream
+from CompiscriptLexer import CompiscriptLexer
+from CompiscriptParser import CompiscriptParser
+from analizador_semantico import CompiscriptSemanticVisitor
+from programa_tac import TACProgram
+from backend_python import PythonBackend
+from backend_c import CBackend, find_compiler
+from backend_x86 import X86Backend
+
+
+def analyze(path: Path):
+    source = path.read_text(encoding="utf-8")
+    parser = CompiscriptParser(CommonTokenStream(CompiscriptLexer(InputStream(source))))
+    parser.removeErrorListeners()
+    tree = parser.program()
+    visitor = CompiscriptSemanticVisitor()
+    with contextlib.redirect_stdout(io.StringIO()):
+        visitor.visit(tree)
+    return visitor.get_analysis_result()
+
+
+def time_python(program: TACProgram, repeat: int) -> float:
+    namespace = PythonBackend(program, cache_dir=None).load()
+    main = namespace["_cps_main"]
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            main()
+        return time.perf_counter() - start
+
+
+def time_native(backend, extension: str, repeat: int, workdir: str) -> float:
+    source_path = os.path.join(workdir, "programa" + extension)
+    exe_path = os.path.join(workdir, "programa")
+    backend.build(source_path, exe_path)
+    subprocess.run([exe_path, "1"], stdout=subprocess.DEVNULL, check=True)
+    start = time.perf_counter()
+    subprocess.run([exe_path, str(repeat)], stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    args = sys.argv[1:]
+    repeat = 20
+    if args and args[0].startswith("--repeat="):
+        repeat = int(args.pop(0).split("=", 1)[1])
+    files = [Path(a) for a in args] or (sorted((PROGRAM_DIR / "pruebas").glob("*.cps"))
+                                        + sorted((PROGRAM_DIR / "benchmarks").glob("*.cps")))
+
+    if find_compiler() is None:
+        print("No se encontró un compilador de C; no se puede comparar la ejecución nativa")
+        sys.exit(1)
+
+    print(f"{'Programa':<28}{'Python (ms)':>14}{'C (ms)':>14}{'x86-64 (ms)':>14}{'Aceleración':>14}")
+    print("-" * 84)
+    with tempfile.TemporaryDirectory() as workdir:
+        for path in files:
+            result = analyze(path)
+            if not result["success"]:
+                print(f"{path.name:<28}{'con errores semánticos, omitido':>56}")
+                continue
+            program = TACProgram(result["tac_code"], result["symbol_table"])
+            python_time = time_python(program, repeat)
+            c_time = time_native(CBackend(program), ".c", repeat, workdir)
+            asm_time = time_native(X86Backend(program), ".s", repeat, workdir)
+            best = min(c_time, asm_time)
+            speedup = python_time / best if best > 0 else float("inf")
+            print(f"{path.name:<28}{python_time * 1000:>14.2f}{c_time * 1000:>14.2f}"
+                  f"{asm_time * 1000:>14.2f}{speedup:>13.1f}x")
+    print(f"\n{repeat} ejecuciones por programa; el tiempo nativo incluye el arranque del proceso.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import io
+import os
+import sys
+import time
+import contextlib
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+PROGRAM_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROGRAM_DIR))
+
+from analizador_semantico import CompiscriptSemanticVisitor
+from analisis_paralelo import (BODY_COST, WORKER_COST, STARTUP_COST, parse_program, weigh_bodies,
+                               parallel_jobs, shard_bodies, masked_source, check_shards)
+from benchmark_symbols import generate_program
+
+
+def analyze(tree) -> float:
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        CompiscriptSemanticVisitor().visit(tree)
+    return time.perf_counter() - start
+
+
+def parse_and_analyze(source: str) -> float:
+    start = time.perf_counter()
+    analyze(parse_program(source))
+    return time.perf_counter() - start
+
+
+def startup_time() -> float:
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        pool.submit(weigh_bodies, []).result()
+    return time.perf_counter() - start
+
+
+def break_even(body_cost: float, worker_cost: float, startup: float, jobs: int) -> str:
+    gain = body_cost - worker_cost / jobs
+    return f"{startup / gain:,.0f}" if gain > 0 else "nunca"
+
+
+def main():
+    args = sys.argv[1:]
+    declarations = 20_000
+    jobs_list = [2, 4, 8]
+    for arg in args:
+        if arg.startswith("--declarations="):
+            declarations = int(arg.split("=", 1)[1])
+        elif arg.startswith("--jobs="):
+            jobs_list = [int(value) for value in arg.split("=", 1)[1].split(",")]
+
+    source = generate_program(declarations)
+    tree = parse_program(source)
+    statements = tree.statement()
+    weighted = weigh_bodies(statements)
+    tokens = sum(weight for _, weight in weighted)
+    every_body = {ordinal for ordinal, _ in weighted}
+
+    # Costos por token de cuerpo: lo que cuesta revisarlo en serie y lo que cuesta en un proceso,
+    # que además debe volver a analizarlo sintácticamente. Se restan las declaraciones de nivel superior.
+    empty = masked_source(source, statements, every_body)
+    body_cost = (analyze(tree) - analyze(parse_program(empty))) / tokens
+    worker_cost = (parse_and_analyze(source) - parse_and_analyze(empty)) / tokens
+    startup = startup_time()
+
+    print(f"Declaraciones generadas: {declarations}  (tokens en cuerpos: {tokens}, CPUs: {os.cpu_count()})")
+    print(f"{'Costo':<28}{'Medido':>12}{'Configurado':>14}")
+    print("-" * 54)
+    print(f"{'Cuerpo en serie (µs/token)':<28}{body_cost * 1e6:>12.1f}{BODY_COST * 1e6:>14.1f}")
+    print(f"{'Cuerpo en proceso (µs/token)':<28}{worker_cost * 1e6:>12.1f}{WORKER_COST * 1e6:>14.1f}")
+    print(f"{'Arranque de proceso (s)':<28}{startup:>12.2f}{STARTUP_COST:>14.2f}")
+    print("-" * 54)
+
+    serial = analyze(tree)
+    print(f"\n{'Procesos':<10}{'Serial (s)':>12}{'Paralelo (s)':>14}{'Aceleración':>13}"
+          f"{'Umbral (tokens)':>17}  Decisión")
+    print("-" * 80)
+    for jobs in jobs_list:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            check_shards(source, tree, shard_bodies(weighted, jobs))
+        elapsed = time.perf_counter() - start
+        decision = "paralelo" if parallel_jobs(weighted, jobs) > 1 else "serial"
+        print(f"{jobs:<10}{serial:>12.2f}{elapsed:>14.2f}{serial / elapsed:>12.2f}x"
+              f"{break_even(BODY_COST, WORKER_COST, STARTUP_COST, jobs):>17}  {decision}")
+    print("-" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import io
+import sys
+import time
+import contextlib
+from pathlib import Path
+
+PROGRAM_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROGRAM_DIR))
+
+from antlr4 import InputStream, CommonTokenStream
+from CompiscriptLexer import CompiscriptLexer
+from CompiscriptParser import CompiscriptParser
+from analizador_semantico import CompiscriptSemanticVisitor
+
+LOCALS_PER_FUNCTION = 48
+FIELDS_PER_CLASS = 8
+
+
+def generate_program(declarations: int) -> str:
+    # Mezcla representativa: funciones con parámetros y muchas variables locales,
+    # algunas clases con atributos y variables globales que las usan.
+    lines = []
+    count = 0
+    index = 0
+    while count < declarations:
+        if index % 10 == 9:
+            fields = "".join(f" let c{k}: integer;" for k in range(FIELDS_PER_CLASS))
+            lines.append(f"class K{index} {{{fields} function get(): integer {{ return this.c0; }} }}")
+            lines.append(f"let o{index}: K{index} = new K{index}();")
+            lines.append(f"print(o{index}.get());")
+            count += FIELDS_PER_CLASS + 3
+        else:
+            body = ["  let v0: integer = a;"]
+            body += [f"  let v{k}: integer = v{k - 1} + b;" for k in range(1, LOCALS_PER_FUNCTION)]
+            lines.append(f"function f{index}(a: integer, b: integer): integer {{")
+            lines.extend(body)
+            lines.append(f"  return v{LOCALS_PER_FUNCTION - 1};")
+            lines.append("}")
+            lines.append(f"let g{index}: integer = f{index}({index}, 1);")
+            lines.append(f"print(g{index});")
+            count += LOCALS_PER_FUNCTION + 4
+        index += 1
+    return "\n".join(lines) + "\n"
+
+
+def own_values(obj) -> list:
+    if hasattr(obj, "__dict__"):
+        return list(vars(obj).values())
+    values = []
+    for cls in type(obj).__mro__:
+        for slot in getattr(cls, "__slots__", ()):
+            if hasattr(obj, slot):
+                values.append(getattr(obj, slot))
+    return values
+
+
+def symbol_bytes(symbol) -> int:
+    # Tamaño propio del símbolo: el objeto, su __dict__ (si lo tiene) y los contenedores que posee.
+    size = sys.getsizeof(symbol)
+    if hasattr(symbol, "__dict__"):
+        size += sys.getsizeof(symbol.__dict__)
+    for value in own_values(symbol):
+        if isinstance(value, (list, dict)) or (isinstance(value, tuple) and value):
+            size += sys.getsizeof(value)
+    return size
+
+
+def collect_symbols(symbol_table) -> list:
+    seen = {}
+    pending = [symbol for scope in symbol_table.iter_scopes() for symbol in scope.symbols.values()]
+    while pending:
+        symbol = pending.pop()
+        if id(symbol) in seen:
+            continue
+        seen[id(symbol)] = symbol
+        pending.extend(symbol.parameters)
+    return list(seen.values())
+
+
+def main():
+    args = sys.argv[1:]
+    declarations = 100_000
+    if args and args[0].startswith("--declarations="):
+        declarations = int(args.pop(0).split("=", 1)[1])
+
+    source = generate_program(declarations)
+    start = time.perf_counter()
+    parser = CompiscriptParser(CommonTokenStream(CompiscriptLexer(InputStream(source))))
+    parser.removeErrorListeners()
+    tree = parser.program()
+    parse_time = time.perf_counter() - start
+
+    visitor = CompiscriptSemanticVisitor()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        visitor.visit(tree)
+    analysis_time = time.perf_counter() - start
+
+    symbols = collect_symbols(visitor.get_analysis_result()["symbol_table"])
+    by_kind = {}
+    for symbol in symbols:
+        total, amount = by_kind.get(type(symbol).__name__, (0, 0))
+        by_kind[type(symbol).__name__] = (total + symbol_bytes(symbol), amount + 1)
+    total_bytes = sum(total for total, _ in by_kind.values())
+
+    print(f"Declaraciones generadas: {declarations}  (símbolos: {len(symbols)})")
+    print(f"Análisis sintáctico: {parse_time:.2f} s, análisis semántico: {analysis_time:.2f} s\n")
+    print(f"{'Representación':<20}{'Símbolos':>12}{'Bytes/símbolo':>16}{'Total (KiB)':>14}")
+    print("-" * 62)
+    for kind, (total, amount) in sorted(by_kind.items()):
+        print(f"{kind:<20}{amount:>12}{total / amount:>16.1f}{total / 1024:>14.1f}")
+    print("-" * 62)
+    print(f"{'Total':<20}{len(symbols):>12}{total_bytes / len(symbols):>16.1f}{total_bytes / 1024:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import io
+import os
+import time
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional
+
+from compilador import Compiler
+
+SOURCE_EXTENSION = ".cps"
+TAC_EXTENSION = ".tac"
+FAILURES_SHOWN = 20
+
+
+@dataclass
+class FileResult:
+    path: str
+    success: bool
+    stage: str
+    errors: int = 0
+    warnings: int = 0
+    tac_count: int = 0
+    seconds: float = 0.0
+    output: Optional[str] = None
+    first_error: Optional[str] = None
+
+
+def collect_sources(paths: List[str]) -> List[str]:
+    sources = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                sources.extend(os.path.join(root, name) for name in sorted(files)
+                               if name.endswith(SOURCE_EXTENSION))
+        else:
+            sources.append(path)
+    return sources
+
+
+def output_base(path: str, roots: List[str], out_dir: Optional[str]) -> str:
+    # Sin --out cada salida queda junto a su fuente; con --out se replica la estructura relativa.
+    base = os.path.splitext(path)[0]
+    if not out_dir:
+        return base
+    for root in roots:
+        if os.path.isdir(root) and os.path.abspath(path).startswith(os.path.abspath(root) + os.sep):
+            return os.path.join(out_dir, os.path.relpath(base, root))
+    relative = os.path.relpath(base)
+    return os.path.join(out_dir, os.path.basename(base) if relative.startswith(os.pardir) else relative)
+
+
+class BatchWorker:
+    # Un compilador por proceso: el lexer y el parser se crean una vez y se reinician por archivo.
+    def __init__(self, roots: List[str], options: dict):
+        self.roots = roots
+        self.options = options
+        self.compiler = Compiler()
+
+    def compile(self, path: str) -> FileResult:
+        start = time.perf_counter()
+        result = self.compile_file(path)
+        result.seconds = time.perf_counter() - start
+        return result
+
+    def compile_file(self, path: str) -> FileResult:
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                source = file.read()
+        except (OSError, UnicodeDecodeError) as e:
+            return FileResult(path, False, "lectura", errors=1, first_error=str(e))
+
+        analysis = self.compiler.compile(source)
+        if analysis.syntax_errors:
+            return FileResult(path, False, "sintaxis", errors=len(analysis.syntax_errors),
+                              first_error=analysis.errors[0])
+        if analysis.internal_error:
+            return FileResult(path, False, "semántica", errors=1, first_error=analysis.internal_error)
+        result = FileResult(path, analysis.success, "semántica", len(analysis.errors),
+                            len(analysis.warnings), analysis.tac_count,
+                            first_error=analysis.errors[0] if analysis.errors else None)
+
+        base = output_base(path, self.roots, self.options['output'])
+        # Un error al escribir las salidas falla solo este archivo, no el lote entero.
+        try:
+            if self.options['generate_tac'] or self.options['emit']:
+                os.makedirs(os.path.dirname(base) or ".", exist_ok=True)
+            if self.options['generate_tac']:
+                result.output = base + TAC_EXTENSION
+                with open(result.output, 'w', encoding='utf-8') as file:
+                    file.write(analysis.tac_listing())
+        except OSError as e:
+            result.success, result.stage, result.first_error = False, "escritura", str(e)
+            return result
+        if result.success and self.options['emit']:
+            from main import EMIT_EXTENSIONS, run_backends
+            emit_options = dict(self.options, output=base + EMIT_EXTENSIONS[self.options['emit']], run=False)
+            messages = io.StringIO()
+            with contextlib.redirect_stdout(messages):
+                emitted = run_backends(analysis, path, emit_options)
+            if not emitted:
+                # run_backends informa el error por la salida estándar; se guarda su primera línea.
+                lines = messages.getvalue().strip().splitlines()
+                result.success, result.stage = False, "generación"
+                result.first_error = lines[0] if lines else None
+            result.output = emit_options['output']
+        if result.success:
+            result.stage = "ok"
+        return result
+
+
+worker: Optional[BatchWorker] = None
+
+
+def init_worker(roots: List[str], options: dict):
+    global worker
+    worker = BatchWorker(roots, options)
+
+
+def compile_in_worker(path: str) -> FileResult:
+    return worker.compile(path)
+
+
+def compile_batch(paths: List[str], options: dict, jobs: Optional[int] = None) -> List[FileResult]:
+    sources = collect_sources(paths)
+    if not sources:
+        return []
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(sources)))
+    if jobs == 1:
+        init_worker(paths, options)
+        return [compile_in_worker(path) for path in sources]
+    # Lotes de varios archivos por envío: con decenas de miles de programas pequeños la
+    # comunicación entre procesos pesa más que la compilación de cada uno.
+    chunksize = max(1, min(64, len(sources) // (jobs * 8)))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(paths, options)) as pool:
+        return list(pool.map(compile_in_worker, sources, chunksize=chunksize))
+
+
+def print_batch_summary(results: List[FileResult], elapsed: float):
+    print("\n" + "="*85)
+    print("           RESUMEN DEL LOTE")
+    print("="*85)
+    print(f"{'Estado':<18}{'Errores':>8}{'Warnings':>10}{'TAC':>8}{'Tiempo (ms)':>13}  Archivo")
+    print("-"*85)
+    for result in results:
+        status = "OK" if result.success else f"FALLA/{result.stage}"
+        print(f"{status:<18}{result.errors:>8}{result.warnings:>10}{result.tac_count:>8}"
+              f"{result.seconds * 1000:>13.1f}  {result.path}")
+    print("-"*85)
+
+    failed = [result for result in results if not result.success]
+    total_time = sum(result.seconds for result in results)
+    print(f"Archivos: {len(results)}, exitosos: {len(results) - len(failed)}, fallidos: {len(failed)}")
+    print(f"Errores: {sum(result.errors for result in results)}, "
+          f"Warnings: {sum(result.warnings for result in results)}, "
+          f"Instrucciones TAC: {sum(result.tac_count for result in results)}")
+    if results:
+        slowest = max(results, key=lambda result: result.seconds)
+        print(f"Tiempo total: {elapsed:.2f} s (suma por archivo: {total_time:.2f} s, "
+              f"promedio: {total_time / len(results) * 1000:.1f} ms, "
+              f"más lento: {slowest.path} con {slowest.seconds * 1000:.1f} ms)")
+
+    if failed:
+        print(f"\nARCHIVOS CON ERRORES ({len(failed)}):")
+        for result in failed[:FAILURES_SHOWN]:
+            print(f"  {result.path}: {result.first_error}")
+        if len(failed) > FAILURES_SHOWN:
+            print(f"  ... y {len(failed) - FAILURES_SHOWN} archivos más")
+    print("="*85)
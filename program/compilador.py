@@ -0,0 +1,285 @@
+import os
+import asyncio
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from antlr4 import InputStream, CommonTokenStream, ParseTreeListener
+from antlr4.error.ErrorListener import ErrorListener
+from CompiscriptLexer import CompiscriptLexer
+from CompiscriptParser import CompiscriptParser
+from analizador_semantico import CompiscriptSemanticVisitor, CompilationCancelled, TACInstruction, format_tac
+from indice_posiciones import symbol_type_name
+from tabla_simbolos import CompiscriptSymbolTable, Diagnostic, Symbol, SymbolType
+
+
+class SyntaxErrorCollector(ErrorListener):
+    def __init__(self):
+        super().__init__()
+        self.errors: List[tuple] = []
+
+    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
+        self.errors.append((line, column, msg))
+
+
+class CancellationListener(ParseTreeListener):
+    # Revisa la señal de cancelación al entrar a cada regla del parser.
+    def __init__(self, cancelled: threading.Event):
+        self.cancelled = cancelled
+
+    def enterEveryRule(self, ctx):
+        if self.cancelled.is_set():
+            raise CompilationCancelled()
+
+
+@dataclass
+class CompileOptions:
+    jobs: int = 1
+    keep_tree: bool = False
+
+
+@dataclass
+class CompilationResult:
+    success: bool
+    syntax_errors: List[Diagnostic] = field(default_factory=list)
+    diagnostics: List[Diagnostic] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    symbol_table: Optional[CompiscriptSymbolTable] = None
+    tac: List[TACInstruction] = field(default_factory=list)
+    devirtualized_calls: int = 0
+    position_index: Optional[object] = None
+    tree: Optional[CompiscriptParser.ProgramContext] = None
+    internal_error: Optional[str] = None
+
+    @property
+    def tac_count(self) -> int:
+        return len(self.tac)
+
+    def tac_listing(self) -> str:
+        return format_tac(self.tac)
+
+
+class Compiler:
+    # Compilador en memoria: el lexer y el parser se crean una vez y se reinician en cada
+    # llamada. No escribe en stdout ni en disco; todo lo producido viaja en el resultado.
+    # Una instancia no se comparte entre hilos; cada hilo usa la suya.
+    def __init__(self):
+        self.lexer = CompiscriptLexer(InputStream(""))
+        self.tokens = CommonTokenStream(self.lexer)
+        self.parser = CompiscriptParser(self.tokens)
+        self.syntax_errors = SyntaxErrorCollector()
+        for recognizer in (self.lexer, self.parser):
+            recognizer.removeErrorListeners()
+            recognizer.addErrorListener(self.syntax_errors)
+
+    def parse(self, source: str, cancelled: Optional[threading.Event] = None
+              ) -> Tuple[CompiscriptParser.ProgramContext, List[Diagnostic]]:
+        self.syntax_errors.errors.clear()
+        self.lexer.inputStream = InputStream(source)
+        self.tokens.setTokenSource(self.lexer)
+        # reset() del runtime falla si quedan oyentes registrados: se quitan antes de reiniciar.
+        self.parser.removeParseListeners()
+        self.parser.setTokenStream(self.tokens)
+        if cancelled is not None:
+            self.parser.addParseListener(CancellationListener(cancelled))
+        tree = self.parser.program()
+        return tree, [Diagnostic("error", line, column, message)
+                      for line, column, message in self.syntax_errors.errors]
+
+    def compile(self, source: str, options: Optional[CompileOptions] = None,
+                cancelled: Optional[threading.Event] = None) -> CompilationResult:
+        # Con cancelled, activar el evento desde otro hilo detiene el análisis en la siguiente
+        # regla del parser o sentencia del visitor con CompilationCancelled.
+        options = options or CompileOptions()
+        tree, syntax_errors = self.parse(source, cancelled)
+        if syntax_errors:
+            return CompilationResult(False, syntax_errors=syntax_errors,
+                                     errors=[f"Línea {item.line}, columna {item.column}: {item.message}"
+                                             for item in syntax_errors],
+                                     tree=tree if options.keep_tree else None)
+        try:
+            visitor = self.analyze(source, tree, options, cancelled)
+        except Exception as e:
+            return CompilationResult(False, errors=[str(e)], internal_error=str(e),
+                                     tree=tree if options.keep_tree else None)
+
+        table = visitor.analyzer.symbol_table
+        errors = table.get_errors()
+        return CompilationResult(
+            success=not errors,
+            diagnostics=list(table.diagnostics),
+            errors=errors,
+            warnings=table.get_warnings(),
+            symbol_table=table,
+            tac=visitor.tac_code,
+            devirtualized_calls=visitor.devirtualized_calls,
+            position_index=visitor.position_index,
+            tree=tree if options.keep_tree else None,
+        )
+
+    def analyze(self, source: str, tree, options: CompileOptions,
+                cancelled: Optional[threading.Event] = None) -> CompiscriptSemanticVisitor:
+        if options.jobs > 1:
+            from analisis_paralelo import analyze_parallel
+            return analyze_parallel(source, tree, options.jobs, cancelled)
+        visitor = CompiscriptSemanticVisitor()
+        visitor.cancelled = cancelled
+        visitor.visit(tree)
+        return visitor
+
+
+local = threading.local()
+
+
+def compile(source: str, options: Optional[CompileOptions] = None,
+            cancelled: Optional[threading.Event] = None) -> CompilationResult:
+    # Un compilador por hilo: las llamadas concurrentes nunca comparten lexer ni parser.
+    compiler = getattr(local, "compiler", None)
+    if compiler is None:
+        compiler = local.compiler = Compiler()
+    return compiler.compile(source, options, cancelled)
+
+
+class AsyncCompiler:
+    # Puerta asyncio: el trabajo de CPU corre en un pool de hilos y el semáforo limita cuántas
+    # compilaciones están en curso a la vez. Al cancelar la tarea, o al vencer su plazo, se
+    # activa la señal del hilo y el análisis se detiene en la siguiente regla o sentencia.
+    def __init__(self, limit: Optional[int] = None, executor: Optional[ThreadPoolExecutor] = None):
+        self.limit = limit or os.cpu_count() or 1
+        self.executor = executor or ThreadPoolExecutor(self.limit, thread_name_prefix="compiscript")
+        self.semaphores = weakref.WeakKeyDictionary()
+
+    def semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self.semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self.semaphores[loop] = asyncio.Semaphore(self.limit)
+        return semaphore
+
+    async def compile(self, source: str, options: Optional[CompileOptions] = None,
+                      timeout: Optional[float] = None) -> CompilationResult:
+        # El plazo incluye la espera por el semáforo; al vencer se lanza asyncio.TimeoutError.
+        if timeout is None:
+            return await self.run_limited(source, options)
+        return await asyncio.wait_for(self.run_limited(source, options), timeout)
+
+    async def run_limited(self, source: str, options: Optional[CompileOptions]) -> CompilationResult:
+        async with self.semaphore():
+            cancelled = threading.Event()
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(self.executor, compile, source, options, cancelled)
+            except BaseException:
+                cancelled.set()
+                raise
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+default_async_compiler: Optional[AsyncCompiler] = None
+
+
+async def compile_async(source: str, options: Optional[CompileOptions] = None,
+                        timeout: Optional[float] = None) -> CompilationResult:
+    global default_async_compiler
+    if default_async_compiler is None:
+        default_async_compiler = AsyncCompiler()
+    return await default_async_compiler.compile(source, options, timeout)
+
+
+SYNTAX_CODE = "E-SYNTAX"
+SEMANTIC_CODE = "E-SEMANTIC"
+WARNING_CODE = "W-SEMANTIC"
+
+
+def diagnostic_to_json(item: Diagnostic, code: Optional[str] = None) -> dict:
+    code = code or (SEMANTIC_CODE if item.severity == "error" else WARNING_CODE)
+    return {"severity": item.severity, "code": code, "line": item.line, "column": item.column,
+            "message": item.message}
+
+
+def instruction_to_json(instruction: TACInstruction) -> dict:
+    return {"op": instruction.op, "arg1": instruction.arg1, "arg2": instruction.arg2,
+            "result": instruction.result, "line": instruction.line_number, "text": str(instruction)}
+
+
+def symbol_to_json(symbol: Symbol) -> dict:
+    payload = {"name": symbol.name, "kind": symbol.symbol_type.value, "type": symbol_type_name(symbol),
+               "line": symbol.line_number, "column": symbol.column_number, "used": symbol.is_used,
+               "offset": symbol.offset, "size": symbol.size_bytes, "unique_name": symbol.unique_name}
+    if symbol.address is not None:
+        payload["address"] = symbol.address
+    if symbol.symbol_type in (SymbolType.FUNCTION, SymbolType.METHOD):
+        payload["parameters"] = [{"name": parameter.name, "type": symbol_type_name(parameter)}
+                                 for parameter in symbol.parameters]
+        payload["constructor"] = symbol.is_constructor
+    if symbol.class_type and symbol.symbol_type != SymbolType.CLASS:
+        payload["class"] = symbol.class_type
+    if symbol.symbol_type == SymbolType.CLASS:
+        payload["parent"] = symbol.parent_class
+        payload["attributes"] = list(symbol.attributes)
+        payload["methods"] = list(symbol.methods)
+    return payload
+
+
+def scopes_to_json(table: CompiscriptSymbolTable) -> List[dict]:
+    # Ámbitos en preorden; cada uno indica el id de su padre para reconstruir el árbol.
+    ids = {}
+    scopes = []
+    for scope in table.iter_scopes():
+        ids[id(scope)] = len(scopes)
+        scopes.append({"id": len(scopes), "name": scope.scope_name, "level": scope.scope_level,
+                       "context": scope.context_type.value,
+                       "parent": ids.get(id(scope.parent_scope)) if scope.parent_scope else None,
+                       "span": list(scope.span) if scope.span else None,
+                       "symbols": [symbol_to_json(symbol) for symbol in table.source_order(scope)]})
+    return scopes
+
+
+def summary_to_json(result: CompilationResult) -> dict:
+    payload = {"success": result.success, "syntax_errors": len(result.syntax_errors),
+               "errors": len(result.errors) - len(result.syntax_errors), "warnings": len(result.warnings),
+               "tac_count": result.tac_count, "devirtualized_calls": result.devirtualized_calls}
+    if result.internal_error:
+        payload["internal_error"] = result.internal_error
+    return payload
+
+
+def result_to_json(result: CompilationResult, include_tac: bool = True, include_symbols: bool = False) -> dict:
+    payload = {
+        "success": result.success,
+        "syntax_errors": [diagnostic_to_json(item, SYNTAX_CODE) for item in result.syntax_errors],
+        "diagnostics": [diagnostic_to_json(item) for item in result.diagnostics],
+        "tac_count": result.tac_count,
+        "devirtualized_calls": result.devirtualized_calls,
+    }
+    if result.internal_error:
+        payload["internal_error"] = result.internal_error
+    if include_symbols and result.symbol_table is not None:
+        payload["scopes"] = scopes_to_json(result.symbol_table)
+    if include_tac:
+        payload["tac"] = [instruction_to_json(instruction) for instruction in result.tac]
+    return payload
+
+
+def result_records(result: CompilationResult, include_tac: bool = True, include_symbols: bool = True):
+    # Un registro por diagnóstico, ámbito, símbolo e instrucción, con el resumen al final; pensado
+    # para NDJSON, donde el consumidor procesa cada línea sin esperar el documento completo.
+    for item in result.syntax_errors:
+        yield {"record": "diagnostic", **diagnostic_to_json(item, SYNTAX_CODE)}
+    for item in result.diagnostics:
+        yield {"record": "diagnostic", **diagnostic_to_json(item)}
+    if include_symbols and result.symbol_table is not None:
+        for scope in scopes_to_json(result.symbol_table):
+            symbols = scope.pop("symbols")
+            yield {"record": "scope", **scope}
+            for symbol in symbols:
+                yield {"record": "symbol", "scope": scope["id"], **symbol}
+    if include_tac:
+        for index, instruction in enumerate(result.tac):
+            yield {"record": "tac", "index": index, **instruction_to_json(instruction)}
+    yield {"record": "summary", **summary_to_json(result)}
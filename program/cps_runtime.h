@@ -0,0 +1,184 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+typedef enum { CPS_NULL_T = 0, CPS_INT, CPS_BOOL, CPS_STR, CPS_ARR, CPS_OBJ } CpsTag;
+
+typedef struct CpsString { long long length; char data[]; } CpsString;
+typedef struct CpsArray CpsArray;
+typedef struct CpsObject CpsObject;
+
+typedef struct {
+    CpsTag tag;
+    union { long long i; CpsString *s; CpsArray *a; CpsObject *o; } as;
+} Value;
+
+struct CpsArray { long long length; Value items[]; };
+
+typedef struct CpsClass {
+    const char *name;
+    size_t size;
+    void (*const *vtable)(void);
+} CpsClass;
+
+struct CpsObject { const CpsClass *cls; };
+typedef struct { CpsObject header; Value fields[]; } CpsInstance;
+
+#define CPS_NULL ((Value){ CPS_NULL_T, { .i = 0 } })
+
+static void cps_fail(const char *message) {
+    fprintf(stderr, "Error en tiempo de ejecución: %s\n", message);
+    exit(1);
+}
+
+static inline Value cps_int(long long i) { Value v; v.tag = CPS_INT; v.as.i = i; return v; }
+static inline Value cps_bool(int b) { Value v; v.tag = CPS_BOOL; v.as.i = b != 0; return v; }
+
+static inline int cps_truthy(Value v) {
+    switch (v.tag) {
+        case CPS_NULL_T: return 0;
+        case CPS_INT: case CPS_BOOL: return v.as.i != 0;
+        default: return 1;
+    }
+}
+
+static CpsString *cps_alloc_string(long long length) {
+    CpsString *s = malloc(sizeof(CpsString) + (size_t)length + 1);
+    if (!s) cps_fail("memoria insuficiente");
+    s->length = length;
+    s->data[length] = '\0';
+    return s;
+}
+
+static Value cps_string_n(const char *data, long long length) {
+    Value v;
+    v.tag = CPS_STR;
+    v.as.s = cps_alloc_string(length);
+    memcpy(v.as.s->data, data, (size_t)length);
+    return v;
+}
+
+static Value cps_string(const char *data) { return cps_string_n(data, (long long)strlen(data)); }
+
+static Value cps_to_string(Value v);
+
+static Value cps_concat(Value a, Value b) {
+    Value v;
+    v.tag = CPS_STR;
+    v.as.s = cps_alloc_string(a.as.s->length + b.as.s->length);
+    memcpy(v.as.s->data, a.as.s->data, (size_t)a.as.s->length);
+    memcpy(v.as.s->data + a.as.s->length, b.as.s->data, (size_t)b.as.s->length);
+    return v;
+}
+
+static Value cps_to_string(Value v) {
+    char buffer[32];
+    switch (v.tag) {
+        case CPS_STR: return v;
+        case CPS_INT:
+            snprintf(buffer, sizeof buffer, "%lld", v.as.i);
+            return cps_string(buffer);
+        case CPS_BOOL: return cps_string(v.as.i ? "true" : "false");
+        case CPS_NULL_T: return cps_string("null");
+        case CPS_ARR: {
+            Value out = cps_string("[");
+            for (long long i = 0; i < v.as.a->length; i++) {
+                if (i > 0) out = cps_concat(out, cps_string(", "));
+                out = cps_concat(out, cps_to_string(v.as.a->items[i]));
+            }
+            return cps_concat(out, cps_string("]"));
+        }
+        case CPS_OBJ: {
+            Value out = cps_concat(cps_string("<"), cps_string(v.as.o->cls->name));
+            return cps_concat(out, cps_string(">"));
+        }
+    }
+    return cps_string("?");
+}
+
+static inline Value cps_add(Value a, Value b) {
+    if (a.tag == CPS_INT && b.tag == CPS_INT) return cps_int(a.as.i + b.as.i);
+    if (a.tag == CPS_STR || b.tag == CPS_STR) return cps_concat(cps_to_string(a), cps_to_string(b));
+    cps_fail("operandos inválidos para '+'");
+    return CPS_NULL;
+}
+
+static inline Value cps_div(Value a, Value b) {
+    if (b.as.i == 0) cps_fail("división entre cero");
+    /* LLONG_MIN / -1 lo atrapa el procesador; con -fwrapv la negación da la vuelta. */
+    if (b.as.i == -1) return cps_int(-a.as.i);
+    return cps_int(a.as.i / b.as.i);
+}
+
+static inline Value cps_mod(Value a, Value b) {
+    if (b.as.i == 0) cps_fail("división entre cero");
+    if (b.as.i == -1) return cps_int(0);
+    return cps_int(a.as.i % b.as.i);
+}
+
+static int cps_compare(Value a, Value b) {
+    if (a.tag == CPS_STR && b.tag == CPS_STR) return strcmp(a.as.s->data, b.as.s->data);
+    return (a.as.i > b.as.i) - (a.as.i < b.as.i);
+}
+
+static inline int cps_equals(Value a, Value b) {
+    int a_num = a.tag == CPS_INT || a.tag == CPS_BOOL;
+    int b_num = b.tag == CPS_INT || b.tag == CPS_BOOL;
+    if (a_num && b_num) return a.as.i == b.as.i;
+    if (a.tag != b.tag) return 0;
+    switch (a.tag) {
+        case CPS_NULL_T: return 1;
+        case CPS_STR: return a.as.s->length == b.as.s->length && strcmp(a.as.s->data, b.as.s->data) == 0;
+        case CPS_ARR: return a.as.a == b.as.a;
+        case CPS_OBJ: return a.as.o == b.as.o;
+        default: return 0;
+    }
+}
+
+static Value cps_new_array(long long length) {
+    CpsArray *a = calloc(1, sizeof(CpsArray) + (size_t)length * sizeof(Value));
+    if (!a) cps_fail("memoria insuficiente");
+    a->length = length;
+    Value v;
+    v.tag = CPS_ARR;
+    v.as.a = a;
+    return v;
+}
+
+static inline CpsArray *cps_array(Value v) {
+    if (v.tag != CPS_ARR) cps_fail("se esperaba un arreglo");
+    return v.as.a;
+}
+
+static inline Value *cps_slot(Value array, Value index) {
+    CpsArray *a = cps_array(array);
+    if (index.as.i < 0 || index.as.i >= a->length) cps_fail("índice fuera de rango");
+    return &a->items[index.as.i];
+}
+
+static inline Value cps_length(Value array) { return cps_int(cps_array(array)->length); }
+
+static Value cps_new_object(const CpsClass *cls) {
+    CpsObject *o = calloc(1, cls->size);
+    if (!o) cps_fail("memoria insuficiente");
+    o->cls = cls;
+    Value v;
+    v.tag = CPS_OBJ;
+    v.as.o = o;
+    return v;
+}
+
+static inline CpsObject *cps_object(Value v) {
+    if (v.tag != CPS_OBJ) cps_fail("acceso a propiedad sobre un valor que no es objeto");
+    return v.as.o;
+}
+
+static inline Value *cps_field(Value v, long long slot) {
+    return &((CpsInstance *)cps_object(v))->fields[slot];
+}
+
+static void cps_print(Value v) {
+    Value s = cps_to_string(v);
+    fwrite(s.as.s->data, 1, (size_t)s.as.s->length, stdout);
+    fputc('\n', stdout);
+}
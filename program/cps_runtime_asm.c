@@ -0,0 +1,143 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <stdint.h>
+
+/* Valores de 64 bits etiquetados: enteros (n << 1) | 1, false = 2, true = 6, null = 0,
+   y punteros alineados a 8 bytes cuyo primer campo indica el tipo del objeto. */
+typedef int64_t cps_value;
+
+enum { CPS_KIND_STRING = 1, CPS_KIND_ARRAY = 2, CPS_KIND_OBJECT = 3 };
+
+#define CPS_FALSE 2
+#define CPS_TRUE 6
+#define CPS_IS_INT(v) (((v) & 1) != 0)
+#define CPS_IS_BOOL(v) ((v) == CPS_FALSE || (v) == CPS_TRUE)
+#define CPS_IS_POINTER(v) ((v) != 0 && ((v) & 7) == 0)
+#define CPS_UNTAG(v) ((v) >> 1)
+#define CPS_TAG(n) ((cps_value)(((uint64_t)(n) << 1) | 1))
+
+typedef struct { int64_t kind; int64_t length; char data[]; } CpsString;
+typedef struct { int64_t kind; int64_t length; cps_value items[]; } CpsArray;
+typedef struct { const char *name; int64_t nfields; void (*const *vtable)(void); } CpsClass;
+typedef struct { int64_t kind; const CpsClass *cls; cps_value fields[]; } CpsObject;
+
+extern void cps_main(void);
+
+static void cps_fail(const char *message) {
+    fprintf(stderr, "Error en tiempo de ejecución: %s\n", message);
+    exit(1);
+}
+
+void cps_fail_null(void) { cps_fail("acceso a propiedad sobre un valor que no es objeto"); }
+void cps_fail_index(void) { cps_fail("índice fuera de rango"); }
+void cps_fail_div(void) { cps_fail("división entre cero"); }
+
+static int64_t cps_kind(cps_value v) {
+    return CPS_IS_POINTER(v) ? *(int64_t *)(intptr_t)v : 0;
+}
+
+static CpsString *cps_alloc_string(int64_t length) {
+    CpsString *s = malloc(sizeof(CpsString) + (size_t)length + 1);
+    if (!s) cps_fail("memoria insuficiente");
+    s->kind = CPS_KIND_STRING;
+    s->length = length;
+    s->data[length] = '\0';
+    return s;
+}
+
+static CpsString *cps_string_n(const char *data, int64_t length) {
+    CpsString *s = cps_alloc_string(length);
+    memcpy(s->data, data, (size_t)length);
+    return s;
+}
+
+static CpsString *cps_concat(const CpsString *a, const CpsString *b) {
+    CpsString *s = cps_alloc_string(a->length + b->length);
+    memcpy(s->data, a->data, (size_t)a->length);
+    memcpy(s->data + a->length, b->data, (size_t)b->length);
+    return s;
+}
+
+static CpsString *cps_literal(const char *text) { return cps_string_n(text, (int64_t)strlen(text)); }
+
+static CpsString *cps_to_string(cps_value v) {
+    char buffer[32];
+    if (CPS_IS_INT(v)) {
+        snprintf(buffer, sizeof buffer, "%lld", (long long)CPS_UNTAG(v));
+        return cps_literal(buffer);
+    }
+    if (v == 0) return cps_literal("null");
+    if (CPS_IS_BOOL(v)) return cps_literal(v == CPS_TRUE ? "true" : "false");
+    switch (cps_kind(v)) {
+        case CPS_KIND_STRING: return (CpsString *)(intptr_t)v;
+        case CPS_KIND_ARRAY: {
+            CpsArray *a = (CpsArray *)(intptr_t)v;
+            CpsString *out = cps_literal("[");
+            for (int64_t i = 0; i < a->length; i++) {
+                if (i > 0) out = cps_concat(out, cps_literal(", "));
+                out = cps_concat(out, cps_to_string(a->items[i]));
+            }
+            return cps_concat(out, cps_literal("]"));
+        }
+        case CPS_KIND_OBJECT: {
+            CpsObject *o = (CpsObject *)(intptr_t)v;
+            return cps_concat(cps_concat(cps_literal("<"), cps_literal(o->cls->name)), cps_literal(">"));
+        }
+    }
+    return cps_literal("?");
+}
+
+cps_value cps_add(cps_value a, cps_value b) {
+    if (CPS_IS_INT(a) && CPS_IS_INT(b)) return a + b - 1;
+    if (cps_kind(a) == CPS_KIND_STRING || cps_kind(b) == CPS_KIND_STRING)
+        return (cps_value)(intptr_t)cps_concat(cps_to_string(a), cps_to_string(b));
+    cps_fail("operandos inválidos para '+'");
+    return 0;
+}
+
+int64_t cps_compare(cps_value a, cps_value b) {
+    if (cps_kind(a) == CPS_KIND_STRING && cps_kind(b) == CPS_KIND_STRING)
+        return strcmp(((CpsString *)(intptr_t)a)->data, ((CpsString *)(intptr_t)b)->data);
+    return (a > b) - (a < b);
+}
+
+cps_value cps_equals(cps_value a, cps_value b) {
+    if (a == b) return CPS_TRUE;
+    if (cps_kind(a) == CPS_KIND_STRING && cps_kind(b) == CPS_KIND_STRING) {
+        CpsString *x = (CpsString *)(intptr_t)a, *y = (CpsString *)(intptr_t)b;
+        return x->length == y->length && memcmp(x->data, y->data, (size_t)x->length) == 0
+               ? CPS_TRUE : CPS_FALSE;
+    }
+    return CPS_FALSE;
+}
+
+cps_value cps_new_array(cps_value length) {
+    int64_t n = CPS_IS_INT(length) ? CPS_UNTAG(length) : -1;
+    if (n < 0) cps_fail("tamaño de arreglo inválido");
+    CpsArray *a = calloc(1, sizeof(CpsArray) + (size_t)n * sizeof(cps_value));
+    if (!a) cps_fail("memoria insuficiente");
+    a->kind = CPS_KIND_ARRAY;
+    a->length = n;
+    return (cps_value)(intptr_t)a;
+}
+
+cps_value cps_new_object(const CpsClass *cls) {
+    CpsObject *o = calloc(1, sizeof(CpsObject) + (size_t)cls->nfields * sizeof(cps_value));
+    if (!o) cps_fail("memoria insuficiente");
+    o->kind = CPS_KIND_OBJECT;
+    o->cls = cls;
+    return (cps_value)(intptr_t)o;
+}
+
+void cps_print(cps_value v) {
+    CpsString *s = cps_to_string(v);
+    fwrite(s->data, 1, (size_t)s->length, stdout);
+    fputc('\n', stdout);
+}
+
+int main(int argc, char **argv) {
+    long long repeat = argc > 1 ? atoll(argv[1]) : 1;
+    for (long long i = 0; i < repeat; i++) cps_main();
+    return 0;
+}
@@ -0,0 +1,126 @@
+from bisect import bisect_right
+from typing import Dict, List, Optional
+
+from tabla_simbolos import DataType, Symbol, SymbolType
+
+
+def symbol_type_name(symbol: Symbol) -> str:
+    if symbol.symbol_type == SymbolType.CLASS:
+        return symbol.name
+    if symbol.data_type == DataType.CLASS_TYPE:
+        return symbol.class_type or symbol.value
+    if symbol.data_type == DataType.ARRAY and symbol.array_element_type:
+        return f"{symbol.array_element_type.value}[]"
+    return symbol.data_type.value
+
+
+def symbol_signature(symbol: Symbol) -> str:
+    if symbol.symbol_type == SymbolType.CLASS:
+        parent = f" extends {symbol.parent_class}" if symbol.parent_class else ""
+        return f"class {symbol.name}{parent}"
+    if symbol.symbol_type in (SymbolType.FUNCTION, SymbolType.METHOD):
+        params = ", ".join(f"{p.name}: {symbol_type_name(p)}" for p in symbol.parameters)
+        owner = f"{symbol.class_type}." if symbol.class_type else ""
+        return f"function {owner}{symbol.name}({params}): {symbol_type_name(symbol)}"
+    kind = "const" if symbol.symbol_type == SymbolType.CONSTANT else "let"
+    return f"{kind} {symbol.name}: {symbol_type_name(symbol)}"
+
+
+class PositionIndex:
+    # Posiciones como las entrega ANTLR: líneas desde 1 y columnas desde 0.
+    # Cada aparición es (línea, columna, columna final, id de símbolo); la lista se ordena
+    # una sola vez al consultar, así que las búsquedas por posición son binarias.
+    def __init__(self, symbol_table=None):
+        self.symbol_table = symbol_table
+        self.symbols: List[Symbol] = []
+        self.symbol_ids: Dict[int, int] = {}
+        self.occurrences: List[tuple] = []
+        self.definitions: Dict[int, tuple] = {}
+        self.references: Dict[int, List[tuple]] = {}
+        self._sorted = True
+
+    def symbol_id(self, symbol: Symbol) -> int:
+        key = id(symbol)
+        if key not in self.symbol_ids:
+            self.symbol_ids[key] = len(self.symbols)
+            self.symbols.append(symbol)
+        return self.symbol_ids[key]
+
+    def add_definition(self, token, symbol: Symbol):
+        self.add_record(token.line, token.column, token.column + len(token.text), symbol, True)
+
+    def add_reference(self, token, symbol: Symbol):
+        self.add_record(token.line, token.column, token.column + len(token.text), symbol, False)
+
+    def add_record(self, line: int, column: int, end_column: int, symbol: Symbol, is_definition: bool):
+        symbol_id = self.symbol_id(symbol)
+        occurrence = (line, column, end_column, symbol_id)
+        if self.occurrences and occurrence < self.occurrences[-1]:
+            self._sorted = False
+        self.occurrences.append(occurrence)
+        if is_definition:
+            self.definitions.setdefault(symbol_id, (line, column))
+        else:
+            self.references.setdefault(symbol_id, []).append((line, column))
+
+    def mark(self) -> int:
+        return len(self.occurrences)
+
+    def records_since(self, mark: int) -> List[tuple]:
+        return [(line, column, end_column, self.symbols[symbol_id],
+                 self.definitions.get(symbol_id) == (line, column))
+                for line, column, end_column, symbol_id in self.occurrences[mark:]]
+
+    def _ensure_sorted(self):
+        if self._sorted:
+            return
+        self.occurrences = sorted(set(self.occurrences))
+        for positions in self.references.values():
+            positions.sort()
+        self._sorted = True
+
+    def occurrence_at(self, line: int, column: int) -> Optional[tuple]:
+        self._ensure_sorted()
+        position = bisect_right(self.occurrences, (line, column, float("inf")))
+        if position:
+            candidate = self.occurrences[position - 1]
+            if candidate[0] == line and candidate[1] <= column < candidate[2]:
+                return candidate
+        return None
+
+    def symbol_at(self, line: int, column: int) -> Optional[Symbol]:
+        occurrence = self.occurrence_at(line, column)
+        return self.symbols[occurrence[3]] if occurrence else None
+
+    def definition_at(self, line: int, column: int) -> Optional[tuple]:
+        occurrence = self.occurrence_at(line, column)
+        return self.definitions.get(occurrence[3]) if occurrence else None
+
+    def definition_of(self, symbol: Symbol) -> Optional[tuple]:
+        symbol_id = self.symbol_ids.get(id(symbol))
+        return self.definitions.get(symbol_id) if symbol_id is not None else None
+
+    def references_of(self, symbol: Symbol, include_definition: bool = False) -> List[tuple]:
+        self._ensure_sorted()
+        symbol_id = self.symbol_ids.get(id(symbol))
+        if symbol_id is None:
+            return []
+        positions = list(self.references.get(symbol_id, []))
+        if include_definition and symbol_id in self.definitions:
+            positions = sorted(set(positions) | {self.definitions[symbol_id]})
+        return positions
+
+    def type_at(self, line: int, column: int) -> Optional[str]:
+        symbol = self.symbol_at(line, column)
+        return symbol_type_name(symbol) if symbol else None
+
+    def hover_at(self, line: int, column: int) -> Optional[str]:
+        symbol = self.symbol_at(line, column)
+        return symbol_signature(symbol) if symbol else None
+
+    def scope_at(self, line: int, column: int = 0):
+        return self.symbol_table.scope_at(line, column) if self.symbol_table else None
+
+    def document_symbols(self) -> List[tuple]:
+        return sorted(((position, self.symbols[symbol_id]) for symbol_id, position in self.definitions.items()),
+                      key=lambda item: item[0])
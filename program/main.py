@@ -1,9 +1,13 @@
 import sys
 import os
-from antlr4 import *
-from CompiscriptLexer import CompiscriptLexer
-from CompiscriptParser import CompiscriptParser
-from analizador_semantico import CompiscriptSemanticVisitor
+import json
+import contextlib
+from compilador import Compiler, CompileOptions, result_records, result_to_json
+from programa_tac import TACProgram, TACBackendError
+
+EMIT_TARGETS = ('python', 'c', 'asm', 'mips')
+EMIT_EXTENSIONS = {'python': '.py', 'c': '.c', 'asm': '.s', 'mips': '.s'}
+OUTPUT_FORMATS = ('text', 'json', 'ndjson')
 
 def print_ast(node, depth=0):
     if node is None:
@@ -29,13 +33,24 @@ def parse_arguments():
     if not args:
         sys.exit(0)
     
-    file_path = None
+    paths = []
     options = {
         'show_ast': False,
         'show_tac': True,  
         'generate_tac': True,
         'show_symbols': True,  
-        'verbose': False
+        'verbose': False,
+        'emit': None,
+        'run': False,
+        'output': None,
+        'lsp': False,
+        'jobs': None,
+        'batch': None,
+        'serve': False,
+        'port': None,
+        'socket': None,
+        'timeout': None,
+        'format': 'text'
     }
     
     for arg in args:
@@ -51,143 +66,351 @@ def parse_arguments():
                 options['show_symbols'] = True
             elif arg == '--verbose':
                 options['verbose'] = True
+            elif arg.startswith('--emit='):
+                options['emit'] = arg.split('=', 1)[1]
+                if options['emit'] not in EMIT_TARGETS:
+                    print(f"Error: Destino de emisión desconocido '{options['emit']}' "
+                          f"(opciones: {', '.join(EMIT_TARGETS)})")
+                    sys.exit(1)
+            elif arg.startswith('--format='):
+                options['format'] = arg.split('=', 1)[1]
+                if options['format'] not in OUTPUT_FORMATS:
+                    print(f"Error: Formato de salida desconocido '{options['format']}' "
+                          f"(opciones: {', '.join(OUTPUT_FORMATS)})")
+                    sys.exit(1)
+            elif arg.startswith('--out='):
+                options['output'] = arg.split('=', 1)[1]
+            elif arg == '--run':
+                options['run'] = True
+            elif arg == '--lsp':
+                options['lsp'] = True
+            elif arg == '--batch':
+                options['batch'] = []
+            elif arg == '--serve':
+                options['serve'] = True
+            elif arg.startswith('--port='):
+                value = arg.split('=', 1)[1]
+                if not value.isdigit() or not 0 < int(value) < 65536:
+                    print(f"Error: Puerto inválido '{value}'")
+                    sys.exit(1)
+                options['port'] = int(value)
+            elif arg.startswith('--socket='):
+                options['socket'] = arg.split('=', 1)[1]
+            elif arg.startswith('--timeout='):
+                value = arg.split('=', 1)[1]
+                try:
+                    options['timeout'] = float(value)
+                except ValueError:
+                    options['timeout'] = 0
+                if options['timeout'] <= 0:
+                    print(f"Error: Plazo inválido '{value}'")
+                    sys.exit(1)
+            elif arg.startswith('--jobs='):
+                value = arg.split('=', 1)[1]
+                if not value.isdigit() or int(value) < 1:
+                    print(f"Error: Número de procesos inválido '{value}'")
+                    sys.exit(1)
+                options['jobs'] = int(value)
             else:
                 sys.exit(1)
         elif arg.endswith('.cps') or not arg.startswith('-'):
-            if file_path is None:
-                file_path = arg
-            else:
-                print("Error: Solo se puede procesar un archivo a la vez")
-                sys.exit(1)
+            paths.append(arg)
+    
+    if options['serve']:
+        return None, options
     
-    if file_path is None:
-        file_path = "archivo.cps"  
+    if options['batch'] is not None:
+        if not paths:
+            print("Error: --batch requiere un directorio o una lista de archivos")
+            sys.exit(1)
+        options['batch'] = paths
+        return None, options
+    
+    if len(paths) > 1:
+        print("Error: Solo se puede procesar un archivo a la vez (use --batch para varios)")
+        sys.exit(1)
+    
+    file_path = paths[0] if paths else "archivo.cps"
     
     return file_path, options
 
+def output_path(file_path, options):
+    if options['output']:
+        return options['output']
+    return os.path.splitext(file_path)[0] + EMIT_EXTENSIONS[options['emit']]
+
+def run_native(exe_path):
+    # --run con un destino nativo ejecuta el binario recién construido, no el backend de Python.
+    import subprocess
+    print("\n" + "="*50)
+    print("           EJECUCIÓN")
+    print("="*50)
+    completed = subprocess.run([os.path.abspath(exe_path)], capture_output=True, text=True)
+    print(completed.stdout, end="")
+    if completed.returncode != 0:
+        print(f"Error en tiempo de ejecución: el ejecutable terminó con código {completed.returncode}")
+        if completed.stderr:
+            print(completed.stderr.strip())
+        return False
+    return True
+
+def run_backends(result, file_path, options):
+    exe_path = None
+    try:
+        program = TACProgram(result.tac, result.symbol_table)
+        
+        if options['emit'] == 'python':
+            from backend_python import PythonBackend
+            path = output_path(file_path, options)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(PythonBackend(program).module_source())
+            print(f"✓ Código Python generado en '{path}'")
+        
+        elif options['emit'] == 'c':
+            from backend_c import CBackend, find_compiler
+            path = output_path(file_path, options)
+            backend = CBackend(program)
+            if find_compiler():
+                exe_path = os.path.splitext(path)[0]
+                backend.build(path, exe_path)
+                print(f"✓ Código C generado en '{path}' y compilado en '{exe_path}'")
+            else:
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(backend.generate())
+                print(f"✓ Código C generado en '{path}' (no se encontró compilador de C)")
+        
+        elif options['emit'] == 'asm':
+            from backend_x86 import X86Backend
+            from backend_c import find_compiler
+            path = output_path(file_path, options)
+            backend = X86Backend(program)
+            if find_compiler():
+                exe_path = os.path.splitext(path)[0]
+                backend.build(path, exe_path)
+                print(f"✓ Ensamblador x86-64 generado en '{path}' y enlazado en '{exe_path}'")
+            else:
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(backend.generate())
+                print(f"✓ Ensamblador x86-64 generado en '{path}' (no se encontró compilador de C)")
+            if options['verbose']:
+                for name, count in backend.spilled.items():
+                    print(f"  {name}: {count} variable(s) en memoria")
+        
+        elif options['emit'] == 'mips':
+            from backend_mips import MipsBackend
+            path = output_path(file_path, options)
+            mips_source = MipsBackend(program).generate()
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(mips_source)
+            print(f"✓ Ensamblador MIPS generado en '{path}'")
+        
+        if options['run'] and options['emit'] == 'mips':
+            from simulador_mips import MipsSimulator, MipsSimulationError
+            simulator = MipsSimulator(mips_source)
+            print("\n" + "="*50)
+            print("           SIMULACIÓN MIPS")
+            print("="*50)
+            try:
+                simulator.run()
+            except MipsSimulationError as e:
+                print(f"Error en tiempo de ejecución: {e}")
+                return False
+            print()
+            print(simulator.report())
+        elif options['run'] and options['emit'] in ('c', 'asm'):
+            if exe_path is None:
+                print("Error: --run requiere un compilador de C para construir el ejecutable nativo")
+                return False
+            return run_native(exe_path)
+        elif options['run']:
+            from backend_python import PythonBackend
+            backend = PythonBackend(program)
+            print("\n" + "="*50)
+            print("           EJECUCIÓN")
+            print("="*50)
+            backend.run()
+            if options['verbose']:
+                print(f"Funciones compiladas: {backend.compiled}, desde caché: {backend.cache_hits}")
+    except TACBackendError as e:
+        print(f"Error de generación de código: {e}")
+        return False
+    except Exception as e:
+        print(f"Error en tiempo de ejecución: {e}")
+        if options['verbose']:
+            import traceback
+            traceback.print_exc()
+        return False
+    return True
+
+def print_semantic_diagnostics(result):
+    if result.errors:
+        print("\nErrores semanticos")
+        for i, error in enumerate(result.errors, 1):
+            print(f"{i}. {error}")
+    
+    print(f"Errores: {len(result.errors)}, Warnings: {len(result.warnings)}")
+
 def print_compilation_summary(result, options):
     print("\n" + "="*60)
     print("           RESUMEN DE COMPILACIÓN")
     print("="*60)
     
     
-    if result['success']:
+    if result.success:
         print("COMPILACIÓN EXITOSA")
     else:
         print("COMPILACIÓN FALLIDA")
     
     
-    print(f"\nEstadísticas:")
-    print(f"  • Errores semánticos: {len(result['errors'])}")
-    print(f"  • Advertencias: {len(result['warnings'])}")
+    print("\nEstadísticas:")
+    print(f"  • Errores semánticos: {len(result.errors)}")
+    print(f"  • Advertencias: {len(result.warnings)}")
     
     if options['generate_tac']:
-        print(f"  • Instrucciones TAC generadas: {result['tac_count']}")
+        print(f"  • Instrucciones TAC generadas: {result.tac_count}")
+        print(f"  • Llamadas virtuales desvirtualizadas: {result.devirtualized_calls}")
     
     
-    if result['errors']:
-        print(f"\nERRORES ENCONTRADOS ({len(result['errors'])}):")
-        for i, error in enumerate(result['errors'][:10], 1):  
+    if result.errors:
+        print(f"\nERRORES ENCONTRADOS ({len(result.errors)}):")
+        for i, error in enumerate(result.errors[:10], 1):  
             print(f"  {i}. {error}")
         
-        if len(result['errors']) > 10:
-            print(f"  ... y {len(result['errors']) - 10} errores más")
+        if len(result.errors) > 10:
+            print(f"  ... y {len(result.errors) - 10} errores más")
     
     
-    if result['warnings']:
-        print(f"\nADVERTENCIAS ({len(result['warnings'])}):")
-        for i, warning in enumerate(result['warnings'][:5], 1):  
+    if result.warnings:
+        print(f"\nADVERTENCIAS ({len(result.warnings)}):")
+        for i, warning in enumerate(result.warnings[:5], 1):  
             print(f"  {i}. {warning}")
         
-        if len(result['warnings']) > 5:
-            print(f"  ... y {len(result['warnings']) - 5} advertencias más")
+        if len(result.warnings) > 5:
+            print(f"  ... y {len(result.warnings) - 5} advertencias más")
     
     print("="*60)
 
+def print_structured_output(result, file_path, options):
+    # Salida para herramientas: solo JSON en stdout. Los mensajes de los backends y la salida
+    # del programa ejecutado van a stderr.
+    include_tac = options['generate_tac']
+    if options['format'] == 'json':
+        payload = {"file": file_path, **result_to_json(result, include_tac, include_symbols=True)}
+        print(json.dumps(payload, ensure_ascii=False, indent=2))
+    else:
+        print(json.dumps({"record": "file", "path": file_path}, ensure_ascii=False), flush=True)
+        for record in result_records(result, include_tac):
+            print(json.dumps(record, ensure_ascii=False), flush=True)
+    
+    if result.success and (options['emit'] or options['run']):
+        with contextlib.redirect_stdout(sys.stderr):
+            if not run_backends(result, file_path, options):
+                return False
+    return result.success
+
+def print_structured_failure(message, file_path, options):
+    if options['format'] == 'json':
+        print(json.dumps({"file": file_path, "success": False, "error": message}, ensure_ascii=False, indent=2))
+    else:
+        print(json.dumps({"record": "failure", "path": file_path, "error": message}, ensure_ascii=False))
+
+def compile_batch_files(options):
+    import time
+    from compilacion_lotes import compile_batch, print_batch_summary
+    start = time.perf_counter()
+    results = compile_batch(options['batch'], options, options['jobs'])
+    if not results:
+        print("Error: No se encontraron archivos .cps para compilar")
+        return False
+    print_batch_summary(results, time.perf_counter() - start)
+    return all(result.success for result in results)
+
 def main():
     try:
         file_path, options = parse_arguments()
         
+        if options['lsp']:
+            from servidor_lsp import serve
+            return serve()
+        
+        if options['serve']:
+            from servidor_compilacion import serve
+            return serve(options)
+        
         if options['verbose']:
-            print(f"Opciones activas: {[k for k, v in options.items() if v]}")
+            print(f"Opciones activas: {[k for k, v in options.items() if v]}",
+                  file=sys.stdout if options['format'] == 'text' else sys.stderr)
+        
+        if options['batch']:
+            return compile_batch_files(options)
         
         
         try:
             with open(file_path, 'r', encoding='utf-8') as file:
                 codigo_fuente = file.read()
         except FileNotFoundError:
-            print(f"Error: No se pudo encontrar el archivo '{file_path}'")
+            message = f"No se pudo encontrar el archivo '{file_path}'"
+            if options['format'] != 'text':
+                print_structured_failure(message, file_path, options)
+            else:
+                print(f"Error: {message}")
             return False
         except Exception as e:
-            print(f"Error al leer el archivo: {str(e)}")
+            if options['format'] != 'text':
+                print_structured_failure(str(e), file_path, options)
+            else:
+                print(f"Error al leer el archivo: {str(e)}")
             return False
         
         
-        input_stream = InputStream(codigo_fuente)
-        lexer = CompiscriptLexer(input_stream)
-        
+        result = Compiler().compile(codigo_fuente, CompileOptions(jobs=options['jobs'] or 1,
+                                                                  keep_tree=options['show_ast']))
         
-        if hasattr(lexer, '_errHandler') and hasattr(lexer._errHandler, 'errorCount'):
-            if lexer._errHandler.errorCount > 0:
-                print(f"Se encontraron errores léxicos")
-                return False
+        if options['format'] != 'text':
+            return print_structured_output(result, file_path, options)
         
-        
-        tokens = CommonTokenStream(lexer)
-        parser = CompiscriptParser(tokens)
-        
-        
-        parser.removeErrorListeners()
-        
-        
-        ast = parser.program()
-        
-        
-        if parser.getNumberOfSyntaxErrors() > 0:
-            print(f"Se encontraron {parser.getNumberOfSyntaxErrors()} errores sintácticos")
+        if result.syntax_errors:
+            print(f"Se encontraron {len(result.syntax_errors)} errores sintácticos")
             return False
         
-        print(f"✓ AST generado exitosamente: {type(ast).__name__}")
+        print("✓ AST generado exitosamente: ProgramContext")
         
         
         if options['show_ast']:
             print("\n" + "="*50)
             print("           ÁRBOL SINTÁCTICO ABSTRACTO")
             print("="*50)
-            print_ast(ast, 0)
+            print_ast(result.tree, 0)
         
         
-        semantic_visitor = CompiscriptSemanticVisitor()
-        
-        try:
-            semantic_visitor.visit(ast)
-        except Exception as e:
-            print(f"Error durante el análisis semántico: {e}")
-            if options['verbose']:
-                import traceback
-                traceback.print_exc()
+        if result.internal_error:
+            print(f"Error durante el análisis semántico: {result.internal_error}")
             return False
         
-        
-        result = semantic_visitor.get_analysis_result()
+        print_semantic_diagnostics(result)
         
         
         if options['show_symbols']:
             print("\n" + "="*50)
             print("           TABLA DE SÍMBOLOS")
             print("="*50)
-            semantic_visitor.analyzer.symbol_table.print_table()
+            result.symbol_table.print_table()
         
         
-        if options['show_tac'] and options['generate_tac'] and result['tac_count'] > 0:
-            semantic_visitor.print_tac()
-        elif options['show_tac'] and result['tac_count'] == 0:
+        if options['show_tac'] and options['generate_tac'] and result.tac_count > 0:
+            with open("codigo_tac.txt", 'w', encoding='utf-8') as f:
+                f.write(result.tac_listing())
+        elif options['show_tac'] and result.tac_count == 0:
             print("\nNo se generó código TAC")
         
         
         print_compilation_summary(result, options)
         
-        return result['success']
+        if result.success and (options['emit'] or options['run']):
+            if not run_backends(result, file_path, options):
+                return False
+        
+        return result.success
             
     except KeyboardInterrupt:
         return False
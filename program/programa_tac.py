@@ -0,0 +1,361 @@
+import re
+from typing import Dict, List, Optional, Set
+from dataclasses import dataclass, field
+
+TEMP_PATTERN = re.compile(r"^t\d+$")
+IDENT_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+INT_PATTERN = re.compile(r"^-?\d+$")
+CLASS_START_PATTERN = re.compile(r"^CLASS_(\w+)_START_\d+$")
+CLASS_END_PATTERN = re.compile(r"^CLASS_(\w+)_END_\d+$")
+FUNC_START_PATTERN = re.compile(r"^FUNC_\w+_START_\d+$")
+
+BINARY_OPERATORS = {"+", "-", "*", "/", "%", "==", "!=", "<", "<=", ">", ">=", "&&", "||"}
+UNARY_OPERATORS = {"-", "!"}
+
+
+class TACBackendError(Exception):
+    pass
+
+
+def is_temp(name: Optional[str]) -> bool:
+    return bool(name) and TEMP_PATTERN.match(name) is not None
+
+
+def is_int_literal(operand: Optional[str]) -> bool:
+    return bool(operand) and INT_PATTERN.match(operand) is not None
+
+
+def is_string_literal(operand: Optional[str]) -> bool:
+    return bool(operand) and len(operand) >= 2 and operand[0] == '"' and operand[-1] == '"'
+
+
+def is_literal(operand: Optional[str]) -> bool:
+    return (is_int_literal(operand) or is_string_literal(operand)
+            or operand in ("true", "false", "null"))
+
+
+def is_name(operand: Optional[str]) -> bool:
+    return bool(operand) and not is_literal(operand) and IDENT_PATTERN.match(operand) is not None
+
+
+def int_literal_value(operand: str, bits: int) -> int:
+    # Los enteros de cada backend nativo tienen bits bits con signo (ver INT_BITS en cada uno) y
+    # las operaciones que se salen del rango dan la vuelta en complemento a dos, sin error; el
+    # backend Python no tiene límite. Un literal que no cabe se rechaza en lugar de truncarse.
+    value = int(operand)
+    limit = 1 << (bits - 1)
+    if not -limit <= value < limit:
+        raise TACBackendError(f"Literal entero fuera del rango de {bits} bits: '{operand}'")
+    return value
+
+
+def string_literal_value(operand: str) -> str:
+    # Los literales de Compiscript no admiten comillas internas; solo se traducen los escapes comunes.
+    body = operand[1:-1]
+    return (body.replace("\\n", "\n").replace("\\t", "\t")
+                .replace("\\\"", "\"").replace("\\\\", "\\"))
+
+
+def field_slot(operand: str) -> int:
+    if not operand or operand[0] != "#" or not operand[1:].isdigit():
+        raise TACBackendError(f"Slot de atributo inválido: '{operand}'")
+    return int(operand[1:])
+
+
+def vtable_slot(operand: str) -> tuple:
+    class_name, _, slot = (operand or "").partition("#")
+    if not class_name or not slot.isdigit():
+        raise TACBackendError(f"Slot de método virtual inválido: '{operand}'")
+    return class_name, int(slot)
+
+
+@dataclass
+class BasicBlock:
+    index: int
+    label: Optional[str]
+    start: int
+    instructions: list = field(default_factory=list)
+    successors: List[int] = field(default_factory=list)
+    predecessors: List[int] = field(default_factory=list)
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.instructions) - 1
+
+
+@dataclass
+class TACFunction:
+    name: str
+    tac_name: str
+    class_name: Optional[str]
+    params: List[str]
+    body: list = field(default_factory=list)
+
+    @property
+    def is_method(self) -> bool:
+        return self.class_name is not None
+
+    @property
+    def is_constructor(self) -> bool:
+        return self.class_name is not None and self.tac_name == "constructor"
+
+    def names(self) -> Set[str]:
+        found = set(self.params)
+        for instruction in self.body:
+            found.update(instruction_names(instruction))
+        return found
+
+    def assigned_names(self) -> Set[str]:
+        found = set(self.params)
+        for instruction in self.body:
+            target = instruction_target(instruction)
+            if target:
+                found.add(target)
+        return found
+
+
+class TACProgram:
+
+    def __init__(self, tac_code: list, symbol_table=None):
+        self.functions: Dict[str, TACFunction] = {}
+        self.main: list = []
+        self.classes: Dict[str, List[str]] = {}
+        self.class_parents: Dict[str, Optional[str]] = {}
+        self.class_layouts: Dict[str, object] = {}
+        self.class_vtables: Dict[str, List[str]] = {}
+        self.frame_symbols: Dict[str, object] = {}
+        self._split(tac_code)
+        if symbol_table is not None:
+            self._load_class_info(symbol_table)
+            self.frame_symbols = symbol_table.get_frame_symbols()
+        self.global_names = self._collect_global_names()
+
+    def _split(self, tac_code: list):
+        class_stack: List[str] = []
+        function_stack: List[TACFunction] = []
+        pending_label = None
+
+        for instruction in tac_code:
+            op = instruction.op
+
+            if op == "label":
+                start = CLASS_START_PATTERN.match(instruction.result or "")
+                end = CLASS_END_PATTERN.match(instruction.result or "")
+                if start and not function_stack:
+                    class_stack.append(start.group(1))
+                    self.classes.setdefault(start.group(1), [])
+                    continue
+                if end and not function_stack and class_stack:
+                    class_stack.pop()
+                    continue
+                if FUNC_START_PATTERN.match(instruction.result or ""):
+                    pending_label = instruction
+                    continue
+
+            if op == "BeginFunc":
+                pending_label = None
+                class_name = class_stack[-1] if class_stack and not function_stack else None
+                tac_name = instruction.result
+                name = f"{class_name}.{tac_name}" if class_name else tac_name
+                params = ["this"] if class_name else []
+                function = TACFunction(name, tac_name, class_name, params)
+                function_stack.append(function)
+                self.functions[name] = function
+                if class_name:
+                    self.classes[class_name].append(name)
+                continue
+
+            if pending_label is not None:
+                self._append(function_stack, pending_label)
+                pending_label = None
+
+            if op == "EndFunc" and function_stack:
+                function_stack.pop()
+                continue
+
+            if op == "LoadParam" and function_stack:
+                function_stack[-1].params.append(instruction.result)
+                continue
+
+            if op == "ActivationRecord":
+                continue
+
+            self._append(function_stack, instruction)
+
+        if pending_label is not None:
+            self._append(function_stack, pending_label)
+
+    def _append(self, function_stack: List[TACFunction], instruction):
+        if function_stack:
+            function_stack[-1].body.append(instruction)
+        else:
+            self.main.append(instruction)
+
+    def _load_class_info(self, symbol_table):
+        for symbol in symbol_table.get_class_symbols().values():
+            self.class_parents[symbol.name] = symbol.parent_class
+            self.classes.setdefault(symbol.name, [])
+        self.class_layouts = dict(symbol_table.class_layouts)
+        self.class_vtables = {name: list(vtable.entries) for name, vtable in symbol_table.class_vtables.items()}
+
+    def _collect_global_names(self) -> Set[str]:
+        names = set()
+        for instruction in self.main:
+            target = instruction_target(instruction)
+            if target and not is_temp(target):
+                names.add(target)
+        return names
+
+    def function_globals(self, function: TACFunction) -> Set[str]:
+        local_params = set(function.params)
+        return {n for n in function.names() if n in self.global_names and n not in local_params}
+
+    def class_chain(self, class_name: str) -> List[str]:
+        chain = []
+        visited = set()
+        current = class_name
+        while current and current not in visited:
+            visited.add(current)
+            chain.append(current)
+            current = self.class_parents.get(current)
+        return chain
+
+    def class_fields(self, class_name: str) -> List[str]:
+        layout = self.class_layouts.get(class_name)
+        return layout.fields() if layout is not None else []
+
+    def class_size(self, class_name: str) -> int:
+        layout = self.class_layouts.get(class_name)
+        return layout.size if layout is not None else 0
+
+    def vtable_functions(self, class_name: str) -> List[TACFunction]:
+        functions = []
+        for entry in self.class_vtables.get(class_name, []):
+            function = self.resolve_call(entry)
+            if function is None:
+                raise TACBackendError(f"Método virtual sin implementación: '{entry}'")
+            functions.append(function)
+        return functions
+
+    def resolve_method(self, class_name: str, method_name: str) -> Optional[TACFunction]:
+        for current in self.class_chain(class_name):
+            function = self.functions.get(f"{current}.{method_name}")
+            if function is not None:
+                return function
+        return None
+
+    def resolve_call(self, target: str) -> Optional[TACFunction]:
+        if target in self.functions:
+            return self.functions[target]
+        if "." in target:
+            class_name, method_name = target.split(".", 1)
+            return self.resolve_method(class_name, method_name)
+        return None
+
+
+def instruction_target(instruction) -> Optional[str]:
+    op = instruction.op
+    if op in ("label", "goto", "if_false", "if_true", "PushParam", "PopParams",
+              "SetReturn", "call", "[]=", "setfield", "return", "BeginFunc", "EndFunc",
+              "ActivationRecord"):
+        return None
+    return instruction.result or None
+
+
+def instruction_operands(instruction) -> List[str]:
+    op = instruction.op
+    if op in ("label", "goto", "PopParams", "BeginFunc", "EndFunc", "ActivationRecord", "LoadParam"):
+        return []
+    if op == "call":
+        return [instruction.arg2]
+    if op in ("LCall", "VCall", "new"):
+        return []
+    if op == "SetReturn" and instruction.arg1 == "void":
+        return []
+    if op == "[]=":
+        return [instruction.result, instruction.arg1, instruction.arg2]
+    if op == "getfield":
+        return [instruction.arg1]
+    if op == "setfield":
+        return [instruction.result, instruction.arg2]
+    return [arg for arg in (instruction.arg1, instruction.arg2) if arg is not None]
+
+
+def instruction_names(instruction) -> Set[str]:
+    names = {operand for operand in instruction_operands(instruction) if is_name(operand)}
+    target = instruction_target(instruction)
+    if target:
+        names.add(target)
+    return names
+
+
+def jump_targets(instructions: list) -> Set[str]:
+    return {i.result for i in instructions if i.op in ("goto", "if_false", "if_true")}
+
+
+def build_cfg(instructions: list) -> List[BasicBlock]:
+    targets = jump_targets(instructions)
+    blocks: List[BasicBlock] = []
+    current = None
+    for position, instruction in enumerate(instructions):
+        starts_block = instruction.op == "label" and instruction.result in targets
+        if current is None or starts_block:
+            label = instruction.result if starts_block else None
+            current = BasicBlock(len(blocks), label, position)
+            blocks.append(current)
+        current.instructions.append(instruction)
+        if instruction.op in ("goto", "if_false", "if_true"):
+            current = None
+
+    by_label = {block.label: block.index for block in blocks if block.label}
+    for block in blocks:
+        last = block.instructions[-1]
+        if last.op in ("goto", "if_false", "if_true"):
+            if last.result not in by_label:
+                raise TACBackendError(f"Salto a una etiqueta inexistente: '{last.result}'")
+            block.successors.append(by_label[last.result])
+        if last.op != "goto" and block.index + 1 < len(blocks):
+            if block.index + 1 not in block.successors:
+                block.successors.append(block.index + 1)
+        for successor in block.successors:
+            blocks[successor].predecessors.append(block.index)
+    return blocks
+
+
+def class_hierarchy(symbol_table) -> Dict[str, List[str]]:
+    children: Dict[str, List[str]] = {}
+    for symbol in symbol_table.get_class_symbols().values():
+        children.setdefault(symbol.name, [])
+        if symbol.parent_class:
+            children.setdefault(symbol.parent_class, []).append(symbol.name)
+    return children
+
+
+def devirtualize(instructions: list, symbol_table) -> int:
+    # Análisis de jerarquía de clases: con el programa completo, si todas las subclases del tipo
+    # estático comparten la implementación del slot, el VCall se convierte en un LCall directo.
+    children = class_hierarchy(symbol_table)
+    vtables = symbol_table.class_vtables
+    targets: Dict[str, Optional[str]] = {}
+    count = 0
+    for instruction in instructions:
+        if instruction.op != "VCall":
+            continue
+        if instruction.arg2 not in targets:
+            class_name, slot = vtable_slot(instruction.arg2)
+            implementations = set()
+            pending = [class_name]
+            while pending:
+                current = pending.pop()
+                vtable = vtables.get(current)
+                if vtable is None or slot >= len(vtable.entries):
+                    implementations.add(None)
+                    break
+                implementations.add(vtable.entries[slot])
+                pending.extend(children.get(current, []))
+            targets[instruction.arg2] = implementations.pop() if len(implementations) == 1 else None
+        target = targets[instruction.arg2]
+        if target is not None:
+            instruction.op, instruction.arg1, instruction.arg2 = "LCall", target, None
+            count += 1
+    return count
@@ -0,0 +1,342 @@
+import os
+import sys
+import json
+import time
+import queue
+import threading
+import socketserver
+import multiprocessing
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from compilador import Compiler, result_to_json
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 7777
+DEFAULT_TIMEOUT = 10.0
+QUEUE_LIMIT = 256
+BATCH_LIMIT = 16
+BACKPRESSURE_SECONDS = 5.0
+POLL_SECONDS = 0.5
+WARMUP_SOURCE = "let warmup: integer = 1;\n"
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_BUSY = -32001
+REQUEST_TIMEOUT = -32002
+WORKER_FAILED = -32003
+
+
+def worker_main(connection):
+    # Proceso de compilación: el lexer, el parser y el DFA de ANTLR quedan calientes desde el
+    # arranque. Cada lote llega completo y sus resultados se devuelven uno por uno, en orden.
+    compiler = Compiler()
+    compiler.compile(WARMUP_SOURCE)
+    while True:
+        try:
+            batch = connection.recv()
+        except EOFError:
+            return
+        if batch is None:
+            return
+        for index, source, include_tac, include_symbols in batch:
+            start = time.perf_counter()
+            payload = result_to_json(compiler.compile(source), include_tac, include_symbols)
+            payload["timings"] = {"compile_ms": (time.perf_counter() - start) * 1000}
+            connection.send((index, payload))
+
+
+def response(request_id, result=None, error: Optional[tuple] = None) -> dict:
+    if error is not None:
+        code, message = error
+        return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+    return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+
+@dataclass
+class Job:
+    request_id: object
+    notification: bool
+    source: str
+    include_tac: bool
+    include_symbols: bool
+    received: float
+    deadline: float
+    reply: Callable[[Optional[dict]], None]
+    dispatched: float = 0.0
+
+    def respond(self, result=None, error: Optional[tuple] = None):
+        self.reply(None if self.notification else response(self.request_id, result, error))
+
+    def expire(self):
+        self.respond(error=(REQUEST_TIMEOUT, "Tiempo de compilación agotado"))
+
+
+class BatchReply:
+    # Un arreglo JSON-RPC se contesta con un solo arreglo cuando terminan todas sus solicitudes.
+    def __init__(self, size: int, reply: Callable[[Optional[dict]], None]):
+        self.remaining = size
+        self.responses: List[dict] = []
+        self.lock = threading.Lock()
+        self.reply = reply
+
+    def add(self, item: Optional[dict]):
+        with self.lock:
+            if item is not None:
+                self.responses.append(item)
+            self.remaining -= 1
+            if self.remaining:
+                return
+        self.reply(self.responses or None)
+
+
+class WorkerSlot(threading.Thread):
+    # Hilo despachador dueño de un proceso: toma lotes de la cola y vigila el plazo del trabajo
+    # en curso. Si vence, el proceso se detiene y se reemplaza por uno nuevo.
+    def __init__(self, server: "CompileServer"):
+        super().__init__(daemon=True)
+        self.server = server
+        self.process: Optional[multiprocessing.Process] = None
+        self.connection = None
+        self.start_process()
+
+    def start_process(self):
+        # Sin fork: los procesos se reinician desde este hilo mientras los del socketserver y los
+        # demás despachadores siguen corriendo, y una copia del proceso heredaría sus locks.
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        parent, child = context.Pipe()
+        self.process = context.Process(target=worker_main, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        self.connection = parent
+
+    def stop_process(self):
+        try:
+            self.connection.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(POLL_SECONDS)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.connection.close()
+
+    def restart(self):
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+        self.start_process()
+        self.server.restarts += 1
+
+    def run(self):
+        while True:
+            jobs = self.server.next_batch()
+            if jobs is None:
+                break
+            if jobs:
+                self.run_batch(jobs)
+        self.stop_process()
+
+    def run_batch(self, jobs: List[Job]):
+        pending = self.send_batch(jobs)
+        while pending:
+            job = pending[0]
+            remaining = job.deadline - time.monotonic()
+            try:
+                ready = self.connection.poll(max(remaining, 0))
+                if ready:
+                    index, payload = self.connection.recv()
+            except (EOFError, OSError):
+                self.restart()
+                pending.pop(0).respond(error=(WORKER_FAILED, "El proceso de compilación terminó inesperadamente"))
+                pending = self.send_batch(pending)
+                continue
+            if not ready:
+                self.restart()
+                pending.pop(0).expire()
+                pending = self.send_batch(pending)
+                continue
+            job = pending.pop(0)
+            payload["timings"]["queue_ms"] = (job.dispatched - job.received) * 1000
+            payload["timings"]["total_ms"] = (time.monotonic() - job.received) * 1000
+            job.respond(payload)
+
+    def send_batch(self, jobs: List[Job]) -> List[Job]:
+        now = time.monotonic()
+        live = []
+        for job in jobs:
+            if job.deadline <= now:
+                job.expire()
+            else:
+                job.dispatched = now
+                live.append(job)
+        if live:
+            self.connection.send([(index, job.source, job.include_tac, job.include_symbols)
+                                  for index, job in enumerate(live)])
+        return live
+
+
+class CompileServer:
+    def __init__(self, workers: int, timeout: float = DEFAULT_TIMEOUT, queue_limit: int = QUEUE_LIMIT):
+        self.timeout = timeout
+        self.jobs: "queue.Queue[Job]" = queue.Queue(queue_limit)
+        self.stopping = threading.Event()
+        self.restarts = 0
+        self.slots = [WorkerSlot(self) for _ in range(workers)]
+        self.listener: Optional[socketserver.BaseServer] = None
+
+    def next_batch(self) -> Optional[List[Job]]:
+        # Se agrupan los trabajos ya encolados para enviarlos al proceso en un solo mensaje.
+        while not self.stopping.is_set():
+            try:
+                jobs = [self.jobs.get(timeout=POLL_SECONDS)]
+            except queue.Empty:
+                continue
+            while len(jobs) < BATCH_LIMIT:
+                try:
+                    jobs.append(self.jobs.get_nowait())
+                except queue.Empty:
+                    break
+            return jobs
+        return None
+
+    def submit(self, job: Job):
+        # Cola acotada: cuando se llena, el hilo lector de la conexión espera y deja de leer el
+        # socket; si la espera se prolonga, la solicitud se rechaza.
+        try:
+            self.jobs.put(job, timeout=BACKPRESSURE_SECONDS)
+        except queue.Full:
+            job.respond(error=(SERVER_BUSY, "Servidor ocupado: cola de compilación llena"))
+
+    def dispatch(self, message, reply: Callable[[Optional[dict]], None]):
+        if not isinstance(message, dict) or message.get("jsonrpc") != "2.0" \
+                or not isinstance(message.get("method"), str):
+            request_id = message.get("id") if isinstance(message, dict) else None
+            reply(response(request_id, error=(INVALID_REQUEST, "Solicitud JSON-RPC inválida")))
+            return
+        notification = "id" not in message
+        request_id = message.get("id")
+        method = message["method"]
+        params = message.get("params") or {}
+
+        def answer(result=None, error=None):
+            reply(None if notification else response(request_id, result, error))
+
+        if method == "status":
+            answer(self.status())
+        elif method == "shutdown":
+            answer()
+            threading.Thread(target=self.listener.shutdown, daemon=True).start()
+        elif method != "compile":
+            answer(error=(METHOD_NOT_FOUND, f"Método no soportado: {method}"))
+        elif not isinstance(params, dict) or not isinstance(params.get("source"), str):
+            answer(error=(INVALID_PARAMS, "Falta el parámetro 'source'"))
+        else:
+            timeout = params.get("timeout", self.timeout)
+            if not isinstance(timeout, (int, float)) or timeout <= 0:
+                answer(error=(INVALID_PARAMS, f"Plazo inválido: {timeout}"))
+                return
+            received = time.monotonic()
+            self.submit(Job(request_id, notification, params["source"], bool(params.get("tac", True)),
+                            bool(params.get("symbols", False)), received, received + timeout, reply))
+
+    def status(self) -> dict:
+        return {"workers": len(self.slots), "queued": self.jobs.qsize(),
+                "queue_limit": self.jobs.maxsize, "restarts": self.restarts}
+
+    def serve(self, address) -> bool:
+        for slot in self.slots:
+            slot.start()
+        if isinstance(address, str):
+            if os.path.exists(address):
+                os.unlink(address)
+            self.listener = ThreadingUnixServer(address, ConnectionHandler)
+            where = address
+        else:
+            self.listener = ThreadingTCPServer(address, ConnectionHandler)
+            where = f"{address[0]}:{self.listener.server_address[1]}"
+        self.listener.compile_server = self
+        print(f"Servidor de compilación escuchando en {where} con {len(self.slots)} proceso(s)", flush=True)
+        try:
+            self.listener.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.listener.server_close()
+            self.stopping.set()
+            for slot in self.slots:
+                slot.join()
+            if isinstance(address, str) and os.path.exists(address):
+                os.unlink(address)
+        return True
+
+
+class ConnectionHandler(socketserver.StreamRequestHandler):
+    # Un mensaje JSON-RPC (o un arreglo de ellos) por línea. Las respuestas se escriben en cuanto
+    # están listas, así que en una misma conexión pueden llegar en otro orden que las solicitudes.
+    def setup(self):
+        super().setup()
+        self.write_lock = threading.Lock()
+        self.outstanding = 0
+        self.idle = threading.Condition()
+
+    def handle(self):
+        dispatch = self.server.compile_server.dispatch
+        for line in self.rfile:
+            line = line.strip()
+            if not line:
+                continue
+            with self.idle:
+                self.outstanding += 1
+            try:
+                message = json.loads(line)
+            except ValueError:
+                self.reply(response(None, error=(PARSE_ERROR, "JSON inválido")))
+                continue
+            if isinstance(message, list):
+                if not message:
+                    self.reply(response(None, error=(INVALID_REQUEST, "Arreglo de solicitudes vacío")))
+                    continue
+                batch = BatchReply(len(message), self.reply)
+                for item in message:
+                    dispatch(item, batch.add)
+            else:
+                dispatch(message, self.reply)
+        with self.idle:
+            self.idle.wait_for(lambda: self.outstanding == 0)
+
+    def reply(self, payload):
+        if payload is not None:
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n"
+            with self.write_lock:
+                try:
+                    self.wfile.write(data)
+                    self.wfile.flush()
+                except (OSError, ValueError):
+                    pass
+        with self.idle:
+            self.outstanding -= 1
+            self.idle.notify_all()
+
+
+class ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class ThreadingUnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+
+def serve(options: dict) -> bool:
+    workers = options['jobs'] or os.cpu_count() or 1
+    address = options['socket'] or (DEFAULT_HOST, options['port'] or DEFAULT_PORT)
+    return CompileServer(workers, options['timeout'] or DEFAULT_TIMEOUT).serve(address)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if serve({'jobs': None, 'socket': None, 'port': None, 'timeout': None}) else 1)
@@ -0,0 +1,285 @@
+import re
+import sys
+import json
+import threading
+from typing import Dict, List, Optional
+
+from analisis_incremental import IncrementalAnalyzer
+from compilador import Compiler
+from tabla_simbolos import SymbolType
+
+DEBOUNCE_SECONDS = 0.3
+WORD_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\S")
+
+SEVERITY_ERROR = 1
+SEVERITY_WARNING = 2
+
+SYMBOL_KINDS = {
+    SymbolType.CLASS: 5,
+    SymbolType.METHOD: 6,
+    SymbolType.ATTRIBUTE: 8,
+    SymbolType.FUNCTION: 12,
+    SymbolType.VARIABLE: 13,
+    SymbolType.CONSTANT: 14,
+    SymbolType.PARAMETER: 13,
+}
+
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+
+
+class Document:
+    def __init__(self, uri: str, text: str, version: Optional[int] = None):
+        self.uri = uri
+        self.text = text
+        self.version = version
+        self.lines = text.split("\n")
+        self.analyzed_text: Optional[str] = None
+        self.position_index = None
+        self.incremental = IncrementalAnalyzer()
+        self.timer: Optional[threading.Timer] = None
+
+    def update(self, text: str, version: Optional[int]):
+        self.text = text
+        self.version = version
+        self.lines = text.split("\n")
+
+    def word_range(self, line: int, column: int) -> dict:
+        # line y column en la convención de ANTLR (línea desde 1); el rango devuelto es de LSP.
+        start = max(column, 0)
+        length = 1
+        if 1 <= line <= len(self.lines):
+            match = WORD_PATTERN.match(self.lines[line - 1], start)
+            if match:
+                length = len(match.group(0))
+        return lsp_range(line, start, start + length)
+
+
+def lsp_range(line: int, start: int, end: int) -> dict:
+    return {"start": {"line": max(line - 1, 0), "character": start},
+            "end": {"line": max(line - 1, 0), "character": end}}
+
+
+class LanguageServer:
+    # Servidor LSP sobre stdio. El lexer, el parser y los módulos del analizador se
+    # mantienen cargados entre ediciones; cada cambio se analiza tras un breve reposo.
+    def __init__(self, input_stream=None, output_stream=None, debounce: float = DEBOUNCE_SECONDS):
+        self.input = input_stream or sys.stdin.buffer
+        self.output = output_stream or sys.stdout.buffer
+        self.debounce = debounce
+        self.documents: Dict[str, Document] = {}
+        self.write_lock = threading.Lock()
+        self.analysis_lock = threading.Lock()
+        self.compiler = Compiler()
+        self.shutdown_requested = False
+        self.handlers = {
+            "initialize": self.initialize,
+            "shutdown": self.shutdown,
+            "textDocument/hover": self.hover,
+            "textDocument/definition": self.definition,
+            "textDocument/documentSymbol": self.document_symbol,
+        }
+        self.notifications = {
+            "initialized": lambda params: None,
+            "textDocument/didOpen": self.did_open,
+            "textDocument/didChange": self.did_change,
+            "textDocument/didClose": self.did_close,
+            "textDocument/didSave": lambda params: None,
+        }
+
+    def serve(self) -> bool:
+        while True:
+            message = self.read_message()
+            if message is None:
+                return self.shutdown_requested
+            if message.get("method") == "exit":
+                return self.shutdown_requested
+            self.dispatch(message)
+
+    def read_message(self) -> Optional[dict]:
+        length = None
+        while True:
+            header = self.input.readline()
+            if not header:
+                return None
+            header = header.decode("ascii").strip()
+            if not header:
+                break
+            name, _, value = header.partition(":")
+            if name.lower() == "content-length":
+                length = int(value.strip())
+        if length is None:
+            return None
+        return json.loads(self.input.read(length).decode("utf-8"))
+
+    def send(self, payload: dict):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        with self.write_lock:
+            self.output.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+            self.output.flush()
+
+    def dispatch(self, message: dict):
+        method = message.get("method")
+        params = message.get("params") or {}
+        if "id" not in message:
+            handler = self.notifications.get(method)
+            if handler is not None:
+                handler(params)
+            return
+        handler = self.handlers.get(method)
+        if handler is None:
+            self.send({"jsonrpc": "2.0", "id": message["id"],
+                       "error": {"code": METHOD_NOT_FOUND, "message": f"Método no soportado: {method}"}})
+            return
+        try:
+            result = handler(params)
+        except Exception as e:
+            self.send({"jsonrpc": "2.0", "id": message["id"],
+                       "error": {"code": INTERNAL_ERROR, "message": str(e)}})
+            return
+        self.send({"jsonrpc": "2.0", "id": message["id"], "result": result})
+
+    def initialize(self, params: dict) -> dict:
+        return {
+            "capabilities": {
+                "textDocumentSync": {"openClose": True, "change": 1},
+                "hoverProvider": True,
+                "definitionProvider": True,
+                "documentSymbolProvider": True,
+            },
+            "serverInfo": {"name": "compiscript-lsp"},
+        }
+
+    def shutdown(self, params: dict):
+        self.shutdown_requested = True
+        for document in self.documents.values():
+            if document.timer is not None:
+                document.timer.cancel()
+        return None
+
+    def did_open(self, params: dict):
+        item = params["textDocument"]
+        document = Document(item["uri"], item.get("text", ""), item.get("version"))
+        self.documents[document.uri] = document
+        self.analyze(document)
+
+    def did_change(self, params: dict):
+        document = self.documents.get(params["textDocument"]["uri"])
+        changes = params.get("contentChanges") or []
+        if document is None or not changes:
+            return
+        # Sincronización completa: el último cambio trae el texto entero.
+        document.update(changes[-1]["text"], params["textDocument"].get("version"))
+        self.schedule(document)
+
+    def did_close(self, params: dict):
+        document = self.documents.pop(params["textDocument"]["uri"], None)
+        if document is not None:
+            if document.timer is not None:
+                document.timer.cancel()
+            self.publish(document.uri, [])
+
+    def schedule(self, document: Document):
+        if document.timer is not None:
+            document.timer.cancel()
+        document.timer = threading.Timer(self.debounce, self.analyze, args=(document,))
+        document.timer.daemon = True
+        document.timer.start()
+
+    def flush(self, document: Document):
+        if document.timer is not None:
+            document.timer.cancel()
+            document.timer = None
+        if document.analyzed_text != document.text:
+            self.analyze(document)
+
+    def analyze(self, document: Document):
+        with self.analysis_lock:
+            text = document.text
+            if text == document.analyzed_text:
+                return
+            version = document.version
+            try:
+                tree, syntax_errors = self.compiler.parse(text)
+                diagnostics = [self.diagnostic(document, SEVERITY_ERROR, item.line, item.column, item.message)
+                               for item in syntax_errors]
+                if not diagnostics:
+                    # Con errores sintácticos se conserva el índice del último análisis válido.
+                    # Solo se vuelven a analizar las declaraciones editadas y las que dependen de ellas.
+                    visitor = document.incremental.analyze(tree)
+                    document.position_index = visitor.position_index
+                    for item in visitor.analyzer.symbol_table.diagnostics:
+                        severity = SEVERITY_ERROR if item.severity == "error" else SEVERITY_WARNING
+                        diagnostics.append(self.diagnostic(document, severity, item.line or 1, item.column, item.message))
+            except Exception as e:
+                # Corre en el hilo del temporizador: el error se informa como diagnóstico y el texto
+                # queda sin analizar, para que la próxima consulta o edición lo vuelva a intentar.
+                diagnostics = [self.diagnostic(document, SEVERITY_ERROR, 1, 0, f"Error interno del análisis: {e}")]
+            else:
+                document.analyzed_text = text
+        self.publish(document.uri, diagnostics, version)
+
+    def diagnostic(self, document: Document, severity: int, line: int, column: int, message: str) -> dict:
+        return {"range": document.word_range(line, column), "severity": severity,
+                "source": "compiscript", "message": message}
+
+    def publish(self, uri: str, diagnostics: List[dict], version: Optional[int] = None):
+        params = {"uri": uri, "diagnostics": diagnostics}
+        if version is not None:
+            params["version"] = version
+        self.send({"jsonrpc": "2.0", "method": "textDocument/publishDiagnostics", "params": params})
+
+    def indexed_document(self, params: dict) -> Optional[Document]:
+        document = self.documents.get(params["textDocument"]["uri"])
+        if document is None:
+            return None
+        self.flush(document)
+        return document if document.position_index is not None else None
+
+    def hover(self, params: dict) -> Optional[dict]:
+        document = self.indexed_document(params)
+        if document is None:
+            return None
+        line, column = params["position"]["line"] + 1, params["position"]["character"]
+        occurrence = document.position_index.occurrence_at(line, column)
+        if occurrence is None:
+            return None
+        text = document.position_index.hover_at(line, column)
+        return {"contents": {"kind": "markdown", "value": f"```compiscript\n{text}\n```"},
+                "range": lsp_range(line, occurrence[1], occurrence[2])}
+
+    def definition(self, params: dict) -> Optional[dict]:
+        document = self.indexed_document(params)
+        if document is None:
+            return None
+        line, column = params["position"]["line"] + 1, params["position"]["character"]
+        position = document.position_index.definition_at(line, column)
+        symbol = document.position_index.symbol_at(line, column)
+        if position is None or symbol is None:
+            return None
+        return {"uri": document.uri, "range": lsp_range(position[0], position[1], position[1] + len(symbol.name))}
+
+    def document_symbol(self, params: dict) -> List[dict]:
+        document = self.indexed_document(params)
+        if document is None:
+            return []
+        result = []
+        for (line, column), symbol in document.position_index.document_symbols():
+            kind = SYMBOL_KINDS.get(symbol.symbol_type, 13)
+            if symbol.is_constructor or symbol.name == "constructor":
+                kind = 9
+            result.append({
+                "name": symbol.name,
+                "kind": kind,
+                "location": {"uri": document.uri, "range": lsp_range(line, column, column + len(symbol.name))},
+                "containerName": symbol.scope_name,
+            })
+        return result
+
+
+def serve() -> bool:
+    return LanguageServer().serve()
+
+
+if __name__ == "__main__":
+    sys.exit(0 if serve() else 1)
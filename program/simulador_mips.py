@@ -0,0 +1,537 @@
+import re
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional, TextIO
+
+TEXT_BASE = 0x00400000
+DATA_BASE = 0x10010000
+HEAP_BASE = 0x10040000
+STACK_TOP = 0x7FFFFFF0
+EXIT_ADDRESS = 0
+DEFAULT_MAX_STEPS = 50_000_000
+
+# Modelo de costos de un pipeline clásico de 5 etapas sin ranuras de retardo.
+BRANCH_PENALTY = 1
+LOAD_USE_PENALTY = 1
+EXTRA_CYCLES = {"mul": 3, "div": 34}
+RUNTIME_CYCLES = {"cps_print": 40, "cps_add": 30, "cps_equals": 20, "cps_compare": 20,
+                  "cps_new_array": 25, "cps_new_object": 25}
+RUNTIME_FUNCTION = "<runtime>"
+
+REGISTER_NAMES = ["zero", "at", "v0", "v1", "a0", "a1", "a2", "a3",
+                  "t0", "t1", "t2", "t3", "t4", "t5", "t6", "t7",
+                  "s0", "s1", "s2", "s3", "s4", "s5", "s6", "s7",
+                  "t8", "t9", "k0", "k1", "gp", "sp", "fp", "ra"]
+REGISTERS = {f"${name}": index for index, name in enumerate(REGISTER_NAMES)}
+REGISTERS.update({f"${index}": index for index in range(32)})
+
+MEMORY_OPERAND = re.compile(r"^(-?\d+)\((\$\w+)\)$")
+KIND_STRING, KIND_ARRAY, KIND_OBJECT = 1, 2, 3
+TRUE_VALUE, FALSE_VALUE = 6, 2
+
+
+class MipsSimulationError(Exception):
+    pass
+
+
+def wrap32(value: int) -> int:
+    return ((value + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+
+
+@dataclass
+class FunctionStats:
+    calls: int = 0
+    instructions: int = 0
+    loads: int = 0
+    stores: int = 0
+    cycles: int = 0
+
+
+def split_operands(text: str) -> List[str]:
+    return [part.strip() for part in text.split(",")] if text.strip() else []
+
+
+def strip_comment(line: str) -> str:
+    in_string = False
+    escaped = False
+    for index, ch in enumerate(line):
+        if escaped:
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif ch == '"':
+            in_string = not in_string
+        elif ch == "#" and not in_string:
+            return line[:index]
+    return line
+
+
+def parse_string(literal: str) -> bytes:
+    body = literal.strip()
+    if len(body) < 2 or body[0] != '"' or body[-1] != '"':
+        raise MipsSimulationError(f"Cadena inválida: {literal}")
+    out = bytearray()
+    index = 1
+    while index < len(body) - 1:
+        ch = body[index]
+        if ch != "\\":
+            out += ch.encode("utf-8")
+            index += 1
+            continue
+        nxt = body[index + 1]
+        if nxt in "01234567":
+            digits = body[index + 1:index + 4]
+            out.append(int(digits, 8))
+            index += 4
+        else:
+            out.append({"n": 10, "t": 9, "0": 0}.get(nxt, ord(nxt)))
+            index += 2
+    return bytes(out)
+
+
+class MipsSimulator:
+
+    def __init__(self, source: str, output: Optional[TextIO] = None, max_steps: int = DEFAULT_MAX_STEPS):
+        self.output = output if output is not None else sys.stdout
+        self.max_steps = max_steps
+        self.memory: Dict[int, int] = {}
+        self.labels: Dict[str, int] = {}
+        self.functions: Dict[int, str] = {}
+        self.text: List[tuple] = []
+        self.heap = HEAP_BASE
+        self.registers = [0] * 32
+        self.stats: Dict[str, FunctionStats] = {}
+        self.steps = 0
+        self._assemble(source)
+
+    # Ensamblado
+
+    def _assemble(self, source: str):
+        section = "text"
+        data_address = DATA_BASE
+        pending_data = []
+        text_lines = []
+        for raw in source.splitlines():
+            line = strip_comment(raw).strip()
+            while line:
+                match = re.match(r"^([A-Za-z_.$][\w.$]*):\s*(.*)$", line)
+                if not match:
+                    break
+                label, line = match.group(1), match.group(2).strip()
+                if section == "text":
+                    self.labels[label] = TEXT_BASE + 4 * len(text_lines)
+                else:
+                    self.labels[label] = data_address
+            if not line:
+                continue
+            if line.startswith("."):
+                directive, _, rest = line.partition(" ")
+                if directive in (".text", ".data"):
+                    section = directive[1:]
+                elif directive == ".globl":
+                    pass
+                elif directive == ".align":
+                    alignment = 1 << int(rest)
+                    data_address = (data_address + alignment - 1) & ~(alignment - 1)
+                elif directive == ".word":
+                    for item in split_operands(rest):
+                        pending_data.append((data_address, item))
+                        data_address += 4
+                elif directive == ".asciiz":
+                    data = parse_string(rest) + b"\0"
+                    self._write_bytes(data_address, data)
+                    data_address += len(data)
+                elif directive == ".space":
+                    data_address += int(rest)
+                else:
+                    raise MipsSimulationError(f"Directiva no soportada: {directive}")
+                continue
+            if section != "text":
+                raise MipsSimulationError(f"Instrucción fuera de la sección de texto: {line}")
+            text_lines.append(line)
+
+        for address, item in pending_data:
+            self.memory[address] = self._value(item)
+        self.text = [self._decode(line) for line in text_lines]
+
+        # Las llamadas indirectas (jalr) se atribuyen a la etiqueta de función en la dirección destino.
+        text_end = TEXT_BASE + 4 * len(self.text)
+        called = {t for op, _, _, t, _ in self.text if op == "jal"}
+        called.update(item for _, item in pending_data if item in self.labels)
+        for name in called:
+            address = self.labels.get(name)
+            if address is not None and TEXT_BASE <= address < text_end:
+                self.functions.setdefault(address, name)
+
+    def _value(self, item: str) -> int:
+        if re.match(r"^-?\d+$", item):
+            return wrap32(int(item))
+        if item not in self.labels:
+            raise MipsSimulationError(f"Etiqueta no definida: {item}")
+        return self.labels[item]
+
+    def _register(self, name: str) -> int:
+        if name not in REGISTERS:
+            raise MipsSimulationError(f"Registro desconocido: {name}")
+        return REGISTERS[name]
+
+    def _address_operand(self, operand: str) -> tuple:
+        match = MEMORY_OPERAND.match(operand)
+        if match:
+            return int(match.group(1)), self._register(match.group(2)), 1
+        return self._value(operand), 0, 2
+
+    def _decode(self, line: str) -> tuple:
+        op, _, rest = line.partition(" ")
+        operands = split_operands(rest)
+        reg = self._register
+        if op in ("addu", "subu", "and", "or", "xor", "slt", "sltu", "mul"):
+            return (op, reg(operands[0]), reg(operands[1]), reg(operands[2]), 1)
+        if op in ("addiu", "andi", "ori", "xori", "slti", "sltiu", "sll", "sra"):
+            return (op, reg(operands[0]), reg(operands[1]), int(operands[2]), 1)
+        if op == "li":
+            value = wrap32(int(operands[1]))
+            return ("li", reg(operands[0]), value, 0, 1 if -32768 <= value < 65536 else 2)
+        if op == "la":
+            return ("li", reg(operands[0]), self._value(operands[1]), 0, 2)
+        if op == "move":
+            return ("move", reg(operands[0]), reg(operands[1]), 0, 1)
+        if op in ("lw", "sw"):
+            offset, base, size = self._address_operand(operands[1])
+            return (op, reg(operands[0]), base, offset, size)
+        if op == "div":
+            return ("div", reg(operands[0]), reg(operands[1]), 0, 1)
+        if op in ("mflo", "mfhi"):
+            return (op, reg(operands[0]), 0, 0, 1)
+        if op in ("beq", "bne"):
+            return (op, reg(operands[0]), reg(operands[1]), self._value(operands[2]), 1)
+        if op == "j":
+            return ("j", 0, 0, self._value(operands[0]), 1)
+        if op == "jal":
+            return ("jal", 0, 0, operands[0], 1)
+        if op == "jr":
+            return ("jr", reg(operands[0]), 0, 0, 1)
+        if op == "jalr":
+            return ("jalr", reg(operands[0]), 0, 0, 1)
+        raise MipsSimulationError(f"Instrucción no soportada por el simulador: {line}")
+
+    # Memoria
+
+    def _load(self, address: int) -> int:
+        if address & 3 or address < DATA_BASE:
+            raise MipsSimulationError(f"Acceso inválido a memoria en 0x{address & 0xFFFFFFFF:08x}")
+        return self.memory.get(address, 0)
+
+    def _store(self, address: int, value: int):
+        if address & 3 or address < DATA_BASE:
+            raise MipsSimulationError(f"Acceso inválido a memoria en 0x{address & 0xFFFFFFFF:08x}")
+        self.memory[address] = value
+
+    def _write_bytes(self, address: int, data: bytes):
+        for index, byte in enumerate(data):
+            word_address = (address + index) & ~3
+            shift = 8 * ((address + index) & 3)
+            word = self.memory.get(word_address, 0) & 0xFFFFFFFF
+            word = (word & ~(0xFF << shift)) | (byte << shift)
+            self.memory[word_address] = wrap32(word)
+
+    def _read_bytes(self, address: int, length: int) -> bytes:
+        out = bytearray()
+        for index in range(length):
+            word = self.memory.get((address + index) & ~3, 0) & 0xFFFFFFFF
+            out.append((word >> (8 * ((address + index) & 3))) & 0xFF)
+        return bytes(out)
+
+    def _read_c_string(self, address: int) -> str:
+        out = bytearray()
+        while True:
+            byte = self._read_bytes(address + len(out), 1)[0]
+            if byte == 0:
+                return out.decode("utf-8", errors="replace")
+            out.append(byte)
+
+    def _allocate(self, words: int) -> int:
+        address = self.heap
+        self.heap += 4 * max(words, 1)
+        self.heap = (self.heap + 7) & ~7
+        return address
+
+    # Runtime
+
+    def _kind(self, value: int) -> int:
+        if value == 0 or value & 3:
+            return 0
+        return self.memory.get(value, 0)
+
+    def _string(self, text: str) -> int:
+        data = text.encode("utf-8")
+        address = self._allocate(2 + (len(data) + 4) // 4)
+        self.memory[address] = KIND_STRING
+        self.memory[address + 4] = len(data)
+        self._write_bytes(address + 8, data + b"\0")
+        return address
+
+    def _to_text(self, value: int) -> str:
+        if value & 1:
+            return str(value >> 1)
+        if value == 0:
+            return "null"
+        if value in (TRUE_VALUE, FALSE_VALUE):
+            return "true" if value == TRUE_VALUE else "false"
+        kind = self._kind(value)
+        if kind == KIND_STRING:
+            return self._read_bytes(value + 8, self.memory[value + 4]).decode("utf-8", errors="replace")
+        if kind == KIND_ARRAY:
+            items = [self._to_text(self.memory.get(value + 8 + 4 * i, 0)) for i in range(self.memory[value + 4])]
+            return "[" + ", ".join(items) + "]"
+        if kind == KIND_OBJECT:
+            return f"<{self._read_c_string(self.memory[self.memory[value + 4]])}>"
+        return "?"
+
+    def _runtime(self, name: str, a0: int, a1: int) -> int:
+        if name == "cps_print":
+            self.output.write(self._to_text(a0) + "\n")
+            return 0
+        if name == "cps_add":
+            if a0 & 1 and a1 & 1:
+                return wrap32(a0 + a1 - 1)
+            if KIND_STRING in (self._kind(a0), self._kind(a1)):
+                return self._string(self._to_text(a0) + self._to_text(a1))
+            raise MipsSimulationError("operandos inválidos para '+'")
+        if name == "cps_equals":
+            if a0 == a1:
+                return TRUE_VALUE
+            if self._kind(a0) == KIND_STRING and self._kind(a1) == KIND_STRING:
+                return TRUE_VALUE if self._to_text(a0) == self._to_text(a1) else FALSE_VALUE
+            return FALSE_VALUE
+        if name == "cps_compare":
+            if self._kind(a0) == KIND_STRING and self._kind(a1) == KIND_STRING:
+                x, y = self._to_text(a0).encode("utf-8"), self._to_text(a1).encode("utf-8")
+            else:
+                x, y = a0, a1
+            return (x > y) - (x < y)
+        if name == "cps_new_array":
+            length = a0 >> 1 if a0 & 1 else -1
+            if length < 0:
+                raise MipsSimulationError("tamaño de arreglo inválido")
+            address = self._allocate(2 + length)
+            self.memory[address] = KIND_ARRAY
+            self.memory[address + 4] = length
+            return address
+        if name == "cps_new_object":
+            fields = self.memory.get(a0 + 4, 0)
+            address = self._allocate(2 + fields)
+            self.memory[address] = KIND_OBJECT
+            self.memory[address + 4] = a0
+            return address
+        if name == "cps_fail_null":
+            raise MipsSimulationError("acceso a propiedad sobre un valor que no es objeto")
+        if name == "cps_fail_index":
+            raise MipsSimulationError("índice fuera de rango")
+        if name == "cps_fail_div":
+            raise MipsSimulationError("división entre cero")
+        raise MipsSimulationError(f"Rutina desconocida: {name}")
+
+    # Ejecución
+
+    def _function_stats(self, name: str) -> FunctionStats:
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = FunctionStats()
+        return stats
+
+    def run(self, entry: str = "cps_main") -> Dict[str, FunctionStats]:
+        if entry not in self.labels:
+            raise MipsSimulationError(f"No existe el punto de entrada '{entry}'")
+        regs = self.registers
+        regs[REGISTERS["$sp"]] = STACK_TOP
+        regs[REGISTERS["$fp"]] = STACK_TOP
+        regs[REGISTERS["$ra"]] = EXIT_ADDRESS
+        text = self.text
+        labels = self.labels
+        pc = (labels[entry] - TEXT_BASE) >> 2
+        call_stack = [entry]
+        current = self._function_stats(entry)
+        current.calls += 1
+        runtime = self._function_stats(RUNTIME_FUNCTION)
+        hi = lo = 0
+        last_load = -1
+        steps = 0
+        max_steps = self.max_steps
+
+        while True:
+            if steps >= max_steps:
+                raise MipsSimulationError(f"Se excedió el límite de {max_steps} instrucciones")
+            steps += 1
+            op, d, s, t, size = text[pc]
+            current.instructions += size
+            cycles = size
+            next_pc = pc + 1
+            load_target = -1
+
+            if op == "addiu":
+                if s == last_load:
+                    cycles += LOAD_USE_PENALTY
+                regs[d] = wrap32(regs[s] + t)
+            elif op == "lw":
+                if s == last_load:
+                    cycles += LOAD_USE_PENALTY
+                regs[d] = self._load(regs[s] + t)
+                current.loads += 1
+                load_target = d
+            elif op == "sw":
+                if d == last_load or s == last_load:
+                    cycles += LOAD_USE_PENALTY
+                self._store(regs[s] + t, regs[d])
+                current.stores += 1
+            elif op == "move":
+                if s == last_load:
+                    cycles += LOAD_USE_PENALTY
+                regs[d] = regs[s]
+            elif op == "li":
+                regs[d] = s
+            elif op in ("beq", "bne"):
+                if d == last_load or s == last_load:
+                    cycles += LOAD_USE_PENALTY
+                if (regs[d] == regs[s]) == (op == "beq"):
+                    next_pc = (t - TEXT_BASE) >> 2
+                    cycles += BRANCH_PENALTY
+            elif op == "j":
+                next_pc = (t - TEXT_BASE) >> 2
+                cycles += BRANCH_PENALTY
+            elif op == "jal":
+                cycles += BRANCH_PENALTY
+                if t in RUNTIME_CYCLES or t.startswith("cps_fail"):
+                    regs[2] = self._runtime(t, regs[4], regs[5])
+                    runtime.calls += 1
+                    runtime.cycles += RUNTIME_CYCLES.get(t, 0)
+                    regs[31] = TEXT_BASE + 4 * next_pc
+                elif t in labels:
+                    regs[31] = TEXT_BASE + 4 * next_pc
+                    next_pc = (labels[t] - TEXT_BASE) >> 2
+                    current.cycles += cycles
+                    call_stack.append(t)
+                    current = self._function_stats(t)
+                    current.calls += 1
+                    cycles = 0
+                else:
+                    raise MipsSimulationError(f"Llamada a etiqueta no definida: {t}")
+            elif op == "jalr":
+                if d == last_load:
+                    cycles += LOAD_USE_PENALTY
+                cycles += BRANCH_PENALTY
+                target = regs[d]
+                if target not in self.functions:
+                    raise MipsSimulationError(f"Llamada indirecta a una dirección inválida: {target:#x}")
+                regs[31] = TEXT_BASE + 4 * next_pc
+                next_pc = (target - TEXT_BASE) >> 2
+                current.cycles += cycles
+                call_stack.append(self.functions[target])
+                current = self._function_stats(self.functions[target])
+                current.calls += 1
+                cycles = 0
+            elif op == "jr":
+                if d == last_load:
+                    cycles += LOAD_USE_PENALTY
+                cycles += BRANCH_PENALTY
+                current.cycles += cycles
+                target = regs[d]
+                call_stack.pop()
+                if target == EXIT_ADDRESS:
+                    break
+                next_pc = (target - TEXT_BASE) >> 2
+                current = self._function_stats(call_stack[-1])
+                cycles = 0
+            else:
+                if s == last_load or (op in ("addu", "subu", "and", "or", "xor", "slt", "sltu", "mul")
+                                      and t == last_load) or (op == "div" and d == last_load):
+                    cycles += LOAD_USE_PENALTY
+                a = regs[s]
+                if op == "addu":
+                    regs[d] = wrap32(a + regs[t])
+                elif op == "subu":
+                    regs[d] = wrap32(a - regs[t])
+                elif op == "and":
+                    regs[d] = a & regs[t]
+                elif op == "or":
+                    regs[d] = a | regs[t]
+                elif op == "xor":
+                    regs[d] = a ^ regs[t]
+                elif op == "slt":
+                    regs[d] = 1 if a < regs[t] else 0
+                elif op == "sltu":
+                    regs[d] = 1 if (a & 0xFFFFFFFF) < (regs[t] & 0xFFFFFFFF) else 0
+                elif op == "mul":
+                    regs[d] = wrap32(a * regs[t])
+                    cycles += EXTRA_CYCLES["mul"]
+                elif op == "andi":
+                    regs[d] = a & (t & 0xFFFF)
+                elif op == "ori":
+                    regs[d] = a | (t & 0xFFFF)
+                elif op == "xori":
+                    regs[d] = a ^ (t & 0xFFFF)
+                elif op == "slti":
+                    regs[d] = 1 if a < t else 0
+                elif op == "sltiu":
+                    regs[d] = 1 if (a & 0xFFFFFFFF) < (t & 0xFFFFFFFF) else 0
+                elif op == "sll":
+                    regs[d] = wrap32(a << t)
+                elif op == "sra":
+                    regs[d] = a >> t
+                elif op == "div":
+                    dividend, divisor = regs[d], regs[s]
+                    if divisor == 0:
+                        raise MipsSimulationError("división entre cero")
+                    quotient = abs(dividend) // abs(divisor)
+                    if (dividend < 0) != (divisor < 0):
+                        quotient = -quotient
+                    lo, hi = wrap32(quotient), wrap32(dividend - quotient * divisor)
+                    cycles += EXTRA_CYCLES["div"]
+                elif op == "mflo":
+                    regs[d] = lo
+                elif op == "mfhi":
+                    regs[d] = hi
+            regs[0] = 0
+            current.cycles += cycles
+            last_load = load_target
+            pc = next_pc
+
+        self.steps = steps
+        return self.stats
+
+    def report(self) -> str:
+        header = f"{'Función':<28}{'Llamadas':>10}{'Instrucciones':>15}{'Cargas':>10}{'Almacen.':>10}{'Ciclos':>12}"
+        lines = [header, "-" * len(header)]
+        total = FunctionStats()
+        for name, stats in sorted(self.stats.items(), key=lambda item: -item[1].cycles):
+            lines.append(f"{name:<28}{stats.calls:>10}{stats.instructions:>15}{stats.loads:>10}"
+                         f"{stats.stores:>10}{stats.cycles:>12}")
+            total.instructions += stats.instructions
+            total.loads += stats.loads
+            total.stores += stats.stores
+            total.cycles += stats.cycles
+        lines.append("-" * len(header))
+        lines.append(f"{'Total':<28}{'':>10}{total.instructions:>15}{total.loads:>10}"
+                     f"{total.stores:>10}{total.cycles:>12}")
+        return "\n".join(lines)
+
+
+def simulate(source: str, output: Optional[TextIO] = None, max_steps: int = DEFAULT_MAX_STEPS) -> MipsSimulator:
+    simulator = MipsSimulator(source, output, max_steps)
+    simulator.run()
+    return simulator
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Uso: python simulador_mips.py <archivo.s>")
+        sys.exit(1)
+    with open(sys.argv[1], encoding="utf-8") as f:
+        simulator = MipsSimulator(f.read())
+    try:
+        simulator.run()
+    except MipsSimulationError as e:
+        print(f"Error en tiempo de ejecución: {e}")
+        sys.exit(1)
+    print()
+    print(simulator.report())
@@ -1,5 +1,70 @@
+from enum import Enum
 from tabla_simbolos import DataType, SymbolType
-from typing import Optional, List
+from typing import Dict, Optional, List
+
+PRIMITIVE_TYPE_NAMES = {"integer", "string", "boolean", "array", "void", "null", "error", "method"}
+DATA_TYPES_BY_NAME = {dt.value: dt for dt in DataType}
+
+class TypeKind(Enum):
+    PRIMITIVE = "primitive"
+    ARRAY = "array"
+    CLASS = "class"
+
+class Type:
+    __slots__ = ("id", "name", "kind", "element", "data_type", "ancestors")
+
+    def __init__(self, type_id: int, name: str, kind: TypeKind, element: Optional['Type'] = None):
+        self.id = type_id
+        self.name = name
+        self.kind = kind
+        self.element = element
+        self.data_type = DATA_TYPES_BY_NAME.get(name)
+        self.ancestors = frozenset((type_id,))
+
+    @property
+    def is_array(self) -> bool:
+        return self.kind == TypeKind.ARRAY
+
+    @property
+    def is_class(self) -> bool:
+        return self.kind == TypeKind.CLASS
+
+    def is_subtype_of(self, other: 'Type') -> bool:
+        return other.id in self.ancestors
+
+    def __repr__(self) -> str:
+        return f"Type({self.name})"
+
+class TypeRegistry:
+    # Cada nombre de tipo se interna una sola vez: la igualdad entre tipos es identidad.
+    def __init__(self):
+        self.types: Dict[str, Type] = {}
+        self.by_id: List[Type] = []
+
+    def intern(self, name: str) -> Type:
+        type_obj = self.types.get(name)
+        if type_obj is None:
+            if name.endswith("[]"):
+                element = self.intern(name[:-2])
+                type_obj = Type(len(self.by_id), name, TypeKind.ARRAY, element)
+            elif name in PRIMITIVE_TYPE_NAMES:
+                type_obj = Type(len(self.by_id), name, TypeKind.PRIMITIVE)
+            else:
+                type_obj = Type(len(self.by_id), name, TypeKind.CLASS)
+            self.types[name] = type_obj
+            self.by_id.append(type_obj)
+        return type_obj
+
+    def array_of(self, element: Type) -> Type:
+        return self.intern(f"{element.name}[]")
+
+    def register_class(self, name: str, parent: Optional[str] = None) -> Type:
+        class_type = self.intern(name)
+        ancestors = {class_type.id}
+        if parent:
+            ancestors |= self.intern(parent).ancestors
+        class_type.ancestors = frozenset(ancestors)
+        return class_type
 
 class TypeChecker:
     def __init__(self):
@@ -7,12 +72,34 @@ class TypeChecker:
         self.comparison_operators = {'==', '!=', '<', '<=', '>', '>='}
         self.logical_operators = {'&&', '||'}
         self.unary_operators = {'-', '!'}
+        self.registry = TypeRegistry()
+        self._binary_cache: Dict[tuple, str] = {}
+        self._compatibility_cache: Dict[tuple, bool] = {}
+        self.error_type = self.registry.intern("error")
+        self.method_type = self.registry.intern("method")
+    
+    def intern(self, type_name: str) -> Type:
+        return self.registry.intern(type_name)
+    
+    def register_class(self, class_name: str, parent_class: Optional[str] = None) -> Type:
+        # Las relaciones de subtipo cambian: se invalidan las tablas memorizadas.
+        self._binary_cache.clear()
+        self._compatibility_cache.clear()
+        return self.registry.register_class(class_name, parent_class)
     
     def check_binary_operation(self, left_type: str, operator: str, right_type: str) -> str:
 
         if left_type is None or right_type is None:
             return "error"
         
+        key = (self.registry.intern(left_type).id, operator, self.registry.intern(right_type).id)
+        result = self._binary_cache.get(key)
+        if result is None:
+            result = self._binary_cache[key] = self._check_binary_operation(left_type, operator, right_type)
+        return result
+    
+    def _check_binary_operation(self, left_type: str, operator: str, right_type: str) -> str:
+        
         if left_type == "error" or right_type == "error":
             return "error"
         
@@ -165,26 +252,27 @@ class TypeChecker:
     def is_compatible(self, expected_type: str, actual_type: str) -> bool:
         if expected_type is None or actual_type is None:
             return False
-        if actual_type == "error":
+        
+        expected = self.registry.intern(expected_type)
+        actual = self.registry.intern(actual_type)
+        key = (expected.id, actual.id)
+        result = self._compatibility_cache.get(key)
+        if result is None:
+            result = self._compatibility_cache[key] = self._is_compatible(expected, actual)
+        return result
+    
+    def _is_compatible(self, expected: Type, actual: Type) -> bool:
+        if actual is self.error_type:
             return False
 
-        if expected_type == actual_type:
+        if expected is actual:
             return True
         
-        if expected_type == "method" or actual_type == "method":
+        if expected is self.method_type or actual is self.method_type:
             return False  
         
-        if self.is_class_name(expected_type) or self.is_class_name(actual_type):
-            return self.handle_class_compatibility(expected_type, actual_type)
-
-        if expected_type.endswith("[]") or actual_type.endswith("[]"):
-            return expected_type == actual_type
-
-        if expected_type == "string":
-            return actual_type == "string"
-
-        if expected_type == "boolean":
-            return actual_type == "boolean"
+        if expected.is_class or actual.is_class:
+            return self.handle_class_compatibility(expected.name, actual.name)
 
         return False
     
@@ -193,19 +281,14 @@ class TypeChecker:
         if not type_name:
             return False
         
-        primitive_types = {
-            "integer", "string", "boolean", "array", "void", 
-            "null", "error", "method"
-        }
-        
-        return type_name not in primitive_types
+        return self.registry.intern(type_name).kind != TypeKind.PRIMITIVE
 
     def handle_class_compatibility(self, expected_type: str, actual_type: str) -> bool:
 
         if not (self.is_class_name(expected_type) and self.is_class_name(actual_type)):
             return False
         
-        return expected_type == actual_type
+        return self.registry.intern(actual_type).is_subtype_of(self.registry.intern(expected_type))
     
     def validate_method_call_in_context(self, object_type: str, method_name: str, arguments_ctx, line: int, column: int) -> str:
         
@@ -216,7 +299,7 @@ class TypeChecker:
                 f"'{object_type}' no es una clase, no puede tener métodos")
             return "error"
         
-        class_symbol = self.analyzer.symbol_table.lookup(object_type)
+        class_symbol = self.analyzer.symbol_table.peek(object_type)
         if not class_symbol or class_symbol.symbol_type != SymbolType.CLASS:
             self.analyzer.add_error(line, column,
                 f"Clase '{object_type}' no encontrada")
@@ -277,7 +360,7 @@ class TypeChecker:
         if not self.is_class_name(class_type):
             return "error"
         
-        class_symbol = symbol_table.lookup(class_type)
+        class_symbol = symbol_table.peek(class_type)
         if not class_symbol or class_symbol.symbol_type.value != "class":
             return "error"
         
@@ -1,6 +1,8 @@
 from enum import Enum
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
+from types import MappingProxyType
+from bisect import bisect_right
 
 class SymbolType(Enum):
     VARIABLE = "variable"
@@ -41,51 +43,123 @@ def sizeof(dt: DataType) -> int:
 def align(n: int, a: int = 4) -> int:
     return (n + (a - 1)) & ~(a - 1)
 
-@dataclass
+EMPTY_MEMBERS = MappingProxyType({})
+
 class Symbol:
-    name: str
-    symbol_type: SymbolType
-    data_type: DataType
-    scope_level: int
-    line_number: int
-    column_number: int  
-    scope_name: str = "global"  
-    is_initialized: bool = False
-    is_used: bool = False
-    array_element_type: Optional[DataType] = None
-    array_size: Optional[int] = None
-    parameters: List['Symbol'] = None
-    return_type: Optional[DataType] = None
-    methods: Dict[str, 'Symbol'] = None      
-    attributes: Dict[str, 'Symbol'] = None     
-    parent_class: Optional[str] = None        
-    class_type: Optional[str] = None 
-    value: Any = None  
-    is_constructor: bool = False              
-    access_modifier: str = "public"  
-    offset: int = 0          
+    # Campos comunes a todos los símbolos; los contenedores propios de cada tipo viven en las subclases.
+    __slots__ = ("name", "symbol_type", "data_type", "scope_level", "line_number", "column_number",
+                 "scope_name", "is_initialized", "is_used", "array_element_type", "class_type",
+                 "value", "offset", "size_bytes", "address", "unique_name")
+
+    parameters = ()
+    methods = EMPTY_MEMBERS
+    attributes = EMPTY_MEMBERS
+    return_type = None
+    parent_class = None
+    is_constructor = False
+    array_size = None
+
+    def __init__(self, name: str, symbol_type: SymbolType, data_type: DataType, scope_level: int,
+                 line_number: int, column_number: int, scope_name: str = "global",
+                 is_initialized: bool = False, is_used: bool = False,
+                 array_element_type: Optional[DataType] = None, class_type: Optional[str] = None,
+                 value: Any = None, offset: int = 0, size_bytes: int = 0,
+                 address: Optional[int] = None, unique_name: Optional[str] = None):
+        self.name = name
+        self.symbol_type = symbol_type
+        self.data_type = data_type
+        self.scope_level = scope_level
+        self.line_number = line_number
+        self.column_number = column_number
+        self.scope_name = scope_name
+        self.is_initialized = is_initialized
+        self.is_used = is_used
+        self.array_element_type = array_element_type
+        self.class_type = class_type
+        self.value = value
+        self.offset = offset
+        self.size_bytes = size_bytes
+        self.address = address
+        self.unique_name = unique_name
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name!r}, {self.symbol_type.value}, {self.data_type.value})"
+
+class VariableSymbol(Symbol):
+    __slots__ = ()
+
+class AttributeSymbol(Symbol):
+    __slots__ = ()
+
+class FunctionSymbol(Symbol):
+    __slots__ = ("parameters", "return_type", "is_constructor")
+
+    def __init__(self, *args, parameters: Optional[List[Symbol]] = None,
+                 return_type: Optional[DataType] = None, is_constructor: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.parameters = parameters or ()
+        self.return_type = return_type
+        self.is_constructor = is_constructor
+
+class ClassSymbol(Symbol):
+    __slots__ = ("parent_class", "_methods", "_attributes")
+
+    def __init__(self, *args, parent_class: Optional[str] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.parent_class = parent_class
+        self._methods: Optional[Dict[str, Symbol]] = None
+        self._attributes: Optional[Dict[str, Symbol]] = None
+
+    @property
+    def methods(self) -> Dict[str, Symbol]:
+        if self._methods is None:
+            self._methods = {}
+        return self._methods
+
+    @property
+    def attributes(self) -> Dict[str, Symbol]:
+        if self._attributes is None:
+            self._attributes = {}
+        return self._attributes
+
+@dataclass
+class ClassLayout:
+    class_name: str
+    slots: Dict[str, int]
+    offsets: Dict[str, int]
     size_bytes: int = 0
-    address: Optional[int] = None
-    offset: int = 0                 
-    size_bytes: int = 0             
-    address: Optional[int] = None 
-    unique_name: str = None
-    
-    def __post_init__(self):
-        if self.parameters is None:
-            self.parameters = []
-        if self.methods is None:
-            self.methods = {}
-        if self.attributes is None:
-            self.attributes = {}
+
+    @property
+    def size(self) -> int:
+        return len(self.slots)
+
+    def fields(self) -> List[str]:
+        return sorted(self.slots, key=self.slots.get)
+
+@dataclass
+class Diagnostic:
+    severity: str
+    line: Optional[int]
+    column: int
+    message: str
+
+@dataclass
+class VTable:
+    class_name: str
+    slots: Dict[str, int]
+    entries: List[str]
 
 class Scope:
+    # Nodo del árbol de ámbitos: se conserva al salir (closed) en lugar de copiar sus símbolos.
     def __init__(self, scope_name: str, scope_level: int, context_type: ContextType, 
-                 parent_scope: Optional['Scope'] = None):
+                 parent_scope: Optional['Scope'] = None, span: Optional[tuple] = None):
         self.scope_name = scope_name
         self.scope_level = scope_level
         self.context_type = context_type
         self.parent_scope = parent_scope
+        self.children: List['Scope'] = []
+        self.span = span
+        self.closed = False
         self.symbols: Dict[str, Symbol] = {}
         self.current_function: Optional[str] = None  
         self.current_class: Optional[str] = None  
@@ -106,12 +180,32 @@ class Scope:
     def get_all_symbols(self) -> Dict[str, Symbol]:
         return self.symbols.copy()
 
+    def contains(self, line: int, col: int) -> bool:
+        if self.span is None:
+            return True
+        start_line, start_col, end_line, end_col = self.span
+        return (start_line, start_col) <= (line, col) <= (end_line, end_col)
+
+    def child_at(self, line: int, col: int) -> Optional['Scope']:
+        # Los hijos se agregan en orden de aparición en el código, así que basta una búsqueda binaria.
+        position = bisect_right(self.children, (line, col),
+                                key=lambda child: child.span[:2] if child.span else (0, 0))
+        if position and self.children[position - 1].contains(line, col):
+            return self.children[position - 1]
+        return None
+
+    def describe(self) -> str:
+        if self.span is None:
+            return f"{self.scope_name} (nivel {self.scope_level})"
+        return f"{self.scope_name} (nivel {self.scope_level}, líneas {self.span[0]}-{self.span[2]})"
+
 class CompiscriptSymbolTable:
 
     def _print_class_summary(self, class_symbol: Symbol):
         print(f"    Resumen de clase: {class_symbol.name}")
         if class_symbol.parent_class:
             print(f"    Hereda de: {class_symbol.parent_class}")
+        print(f"    Tamaño de instancia: {class_symbol.size_bytes}B")
 
         if class_symbol.attributes:
             print("    Atributos:")
@@ -122,7 +216,7 @@ class CompiscriptSymbolTable:
                     t = attr_sym.class_type or attr_sym.value or "class"
                 else:
                     t = attr_sym.data_type.value
-                print(f"      - {attr_name}: {t} (línea {attr_sym.line_number})")
+                print(f"      - {attr_name}: {t} (línea {attr_sym.line_number}, offset={attr_sym.offset})")
         else:
             print("    Atributos: (ninguno)")
 
@@ -142,19 +236,24 @@ class CompiscriptSymbolTable:
         self.scope_stack: List[Scope] = []
         self.global_scope = Scope("global", 0, ContextType.GLOBAL)
         self.scope_stack.append(self.global_scope)
-        self.all_symbols: List[Symbol] = []
-        self.all_scopes_history: List[Dict] = []
+        self.symbol_index: Dict[str, List[tuple]] = {}
+        self.class_layouts: Dict[str, ClassLayout] = {}
+        self.class_vtables: Dict[str, VTable] = {}
+        self.class_members: Dict[str, Dict[str, tuple]] = {}
         self.current_function = None
         self.current_class = None
         self.errors: List[str] = []
         self.warnings: List[str] = []
+        self.diagnostics: List[Diagnostic] = []
     
-    def enter_scope(self, scope_name: str, context_type: ContextType = ContextType.GLOBAL):
+    def enter_scope(self, scope_name: str, context_type: ContextType = ContextType.GLOBAL,
+                    span: Optional[tuple] = None):
         self.current_scope_level += 1
         parent_scope = self.scope_stack[-1] if self.scope_stack else None
-        new_scope = Scope(scope_name, self.current_scope_level, context_type, parent_scope)
+        new_scope = Scope(scope_name, self.current_scope_level, context_type, parent_scope, span)
         
         if parent_scope:
+            parent_scope.children.append(new_scope)
             new_scope.current_function = parent_scope.current_function
             new_scope.current_class = parent_scope.current_class
         if context_type == ContextType.FUNCTION:
@@ -172,14 +271,7 @@ class CompiscriptSymbolTable:
             new_scope.param_next_offset = 16  
             new_scope.local_next_offset = 0
 
-            func_sym = self.lookup(new_scope.current_function)
-            if func_sym and func_sym.parameters:
-                for p in func_sym.parameters:
-                    p.size_bytes = sizeof(p.data_type)
-                    new_scope.param_next_offset = align(new_scope.param_next_offset, 4)
-                    p.offset = new_scope.param_next_offset     
-                    p.address = None                             
-                    new_scope.param_next_offset += p.size_bytes
+            self.assign_parameter_offsets(new_scope, self.peek(new_scope.current_function))
         else:
             parent = parent_scope
             if parent:
@@ -189,12 +281,27 @@ class CompiscriptSymbolTable:
 
             
         self.scope_stack.append(new_scope)
+
+    def assign_parameter_offsets(self, scope: Scope, func_sym: Optional[Symbol]):
+        if func_sym and func_sym.parameters:
+            for p in func_sym.parameters:
+                p.size_bytes = sizeof(p.data_type)
+                scope.param_next_offset = align(scope.param_next_offset, 4)
+                p.offset = scope.param_next_offset     
+                p.address = None                             
+                scope.param_next_offset += p.size_bytes
+
+    def adopt_scope(self, scope: Scope):
+        # Cuelga del ámbito actual un subárbol ya analizado (reutilizado o calculado en otro proceso).
+        parent_scope = self.scope_stack[-1]
+        scope.parent_scope = parent_scope
+        parent_scope.children.append(scope)
         
     def declare_method(self, class_name: str, method_name: str, return_type: DataType, 
                       parameters: List[tuple], line: int, col: int, 
                       is_constructor: bool = False) -> bool:
 
-        class_symbol = self.lookup(class_name)
+        class_symbol = self.peek(class_name)
         if not class_symbol or class_symbol.symbol_type != SymbolType.CLASS:
             self.add_error(f"Clase '{class_name}' no encontrada para declarar método", line, col)
             return False
@@ -205,7 +312,7 @@ class CompiscriptSymbolTable:
         
         param_symbols = []
         for param_name, param_type in parameters:
-            param_symbol = Symbol(
+            param_symbol = VariableSymbol(
                 name=param_name,
                 symbol_type=SymbolType.PARAMETER,
                 data_type=param_type,
@@ -216,7 +323,7 @@ class CompiscriptSymbolTable:
             )
             param_symbols.append(param_symbol)
         
-        method_symbol = Symbol(
+        method_symbol = FunctionSymbol(
             name=method_name,
             symbol_type=SymbolType.METHOD,
             data_type=return_type,
@@ -236,7 +343,7 @@ class CompiscriptSymbolTable:
     def declare_attribute(self, class_name: str, attr_name: str, attr_type: DataType, 
                          line: int, col: int, is_constant: bool = False) -> bool:
         
-        class_symbol = self.lookup(class_name)
+        class_symbol = self.peek(class_name)
         if not class_symbol or class_symbol.symbol_type != SymbolType.CLASS:
             self.add_error(f"Clase '{class_name}' no encontrada para declarar atributo", line, col)
             return False
@@ -245,7 +352,7 @@ class CompiscriptSymbolTable:
             self.add_error(f"Atributo '{attr_name}' ya está declarado en clase '{class_name}'", line, col)
             return False
         
-        attr_symbol = Symbol(
+        attr_symbol = AttributeSymbol(
             name=attr_name,
             symbol_type=SymbolType.CONSTANT if is_constant else SymbolType.ATTRIBUTE,
             data_type=attr_type,
@@ -261,7 +368,7 @@ class CompiscriptSymbolTable:
     
     def declare_class_instance(self, var_name: str, class_name: str, line: int, col: int) -> bool:
        
-        class_symbol = self.lookup(class_name)
+        class_symbol = self.peek(class_name)
         if not class_symbol or class_symbol.symbol_type != SymbolType.CLASS:
             self.add_error(f"Clase '{class_name}' no está declarada", line, col)
             return False
@@ -270,7 +377,7 @@ class CompiscriptSymbolTable:
             self.add_error(f"Variable '{var_name}' ya está declarada en este ámbito", line, col)
             return False
         
-        instance_symbol = Symbol(
+        instance_symbol = VariableSymbol(
             name=var_name,
             symbol_type=SymbolType.VARIABLE,
             data_type=DataType.CLASS_TYPE,
@@ -284,35 +391,18 @@ class CompiscriptSymbolTable:
         return self.insert(instance_symbol)
     
     def lookup_class_member(self, class_name: str, member_name: str, member_type: str = "any") -> Optional[Symbol]:
-        def search_member_in_hierarchy(current_class_name: str, visited: set = None):
-            if visited is None:
-                visited = set()
-            
-            if current_class_name in visited:
-                return None
-            
-            visited.add(current_class_name)
-            
-            class_symbol = self.lookup(current_class_name)
-            if not class_symbol or class_symbol.symbol_type != SymbolType.CLASS:
-                return None
-            
-            if member_type in ["method", "any"] and member_name in class_symbol.methods:
-                return class_symbol.methods[member_name]
-            
-            if member_type in ["attribute", "any"] and member_name in class_symbol.attributes:
-                return class_symbol.attributes[member_name]
-            
-            if class_symbol.parent_class:
-                return search_member_in_hierarchy(class_symbol.parent_class, visited)
-            
+        member = self.find_class_member(class_name, member_name)
+        if member is None:
             return None
-        
-        return search_member_in_hierarchy(class_name)
+        symbol = member[1]
+        is_method = symbol.symbol_type in (SymbolType.FUNCTION, SymbolType.METHOD)
+        if (member_type == "method" and not is_method) or (member_type == "attribute" and is_method):
+            return None
+        return symbol
     
     def validate_class_access(self, object_var: str, member_name: str) -> tuple[bool, str, Optional[Symbol]]:
         
-        var_symbol = self.lookup(object_var)
+        var_symbol = self.peek(object_var)
         if not var_symbol:
             return False, "error", None
         
@@ -334,7 +424,7 @@ class CompiscriptSymbolTable:
             return False, "error", None
         
     def print_class_details(self, class_name: str):
-        class_symbol = self.lookup(class_name)
+        class_symbol = self.peek(class_name)
         if not class_symbol or class_symbol.symbol_type != SymbolType.CLASS:
             print(f"Clase '{class_name}' no encontrada")
             return
@@ -368,45 +458,58 @@ class CompiscriptSymbolTable:
     def exit_scope(self):
         if len(self.scope_stack) > 1:  
             exiting_scope = self.scope_stack.pop()
+            exiting_scope.closed = True
             self.current_scope_level -= 1
             
-            scope_info = {
-                'name': exiting_scope.scope_name,
-                'level': exiting_scope.scope_level,
-                'context': exiting_scope.context_type,
-                'symbols': exiting_scope.get_all_symbols().copy()
-            }
-            self.all_scopes_history.append(scope_info)
-            
             for symbol in exiting_scope.symbols.values():
-                self.all_symbols.append(symbol)
+                entries = self.symbol_index.get(symbol.name)
+                if entries:
+                    entries.pop()
+                    if not entries:
+                        del self.symbol_index[symbol.name]
             
-            for symbol in exiting_scope.symbols.values():
-                if (symbol.symbol_type == SymbolType.VARIABLE and 
-                    not symbol.is_used and symbol.name != "this"):
-                    self.add_warning(f"Variable '{symbol.name}' declarada pero no usada "
-                                   f"(línea {symbol.line_number})")
+            # Los atributos se usan desde fuera de la clase (obj.attr); se revisan al final del programa.
+            if exiting_scope.context_type != ContextType.CLASS:
+                self.report_unused(exiting_scope.symbols.values())
             
             if self.scope_stack:
                 current_scope = self.scope_stack[-1]
                 self.current_function = current_scope.current_function
                 self.current_class = current_scope.current_class
     
+    def report_unused(self, symbols):
+        for symbol in symbols:
+            if (symbol.symbol_type == SymbolType.VARIABLE and 
+                not symbol.is_used and symbol.name != "this"):
+                self.add_warning(f"Variable '{symbol.name}' declarada pero no usada "
+                               f"(línea {symbol.line_number})", symbol.line_number, symbol.column_number)
+
+    def report_unused_attributes(self):
+        for class_symbol in self.get_class_symbols().values():
+            self.report_unused(class_symbol.attributes.values())
+    
     def insert(self, symbol: Symbol) -> bool:
         if not self.scope_stack:
             return False
             
         current_scope = self.scope_stack[-1]
         symbol.scope_level = self.current_scope_level
-        return current_scope.insert(symbol)
-        
+        if not current_scope.insert(symbol):
+            return False
+        self.symbol_index.setdefault(symbol.name, []).append((symbol.scope_level, symbol))
+        return True
+
+    def peek(self, name: str) -> Optional[Symbol]:
+        # Consulta interna: no marca el símbolo como usado.
+        entries = self.symbol_index.get(name)
+        return entries[-1][1] if entries else None
+
     def lookup(self, name: str) -> Optional[Symbol]:
-        for scope in reversed(self.scope_stack):
-            symbol = scope.lookup_local(name)
-            if symbol:
-                symbol.is_used = True
-                return symbol
-        return None
+        # Referencia real desde el programa fuente: marca el símbolo como usado.
+        symbol = self.peek(name)
+        if symbol:
+            symbol.is_used = True
+        return symbol
         
     def lookup_current_scope(self, name: str) -> Optional[Symbol]:
         if self.scope_stack:
@@ -426,8 +529,10 @@ class CompiscriptSymbolTable:
             return False
             
         symbol_type = SymbolType.CONSTANT if is_constant else SymbolType.VARIABLE
+        in_class_body = self.scope_stack[-1].context_type == ContextType.CLASS and name != "this"
+        symbol_class = AttributeSymbol if in_class_body else VariableSymbol
         
-        symbol = Symbol(
+        symbol = symbol_class(
             name=name,
             symbol_type=symbol_type,
             data_type=data_type,
@@ -457,16 +562,23 @@ class CompiscriptSymbolTable:
             self.add_error(f"Función '{name}' ya está declarada", line, col)
             return False
         
+        symbol = self.build_function_symbol(name, return_type, parameters, line, col, array_element_type)
+        if symbol is None:
+            return False
+        return self.insert(symbol)
+
+    def build_function_symbol(self, name: str, return_type: DataType, parameters: List[tuple],
+                              line: int, col: int, array_element_type: Optional[DataType] = None) -> Optional[Symbol]:
         param_symbols = []
         param_names = set()
         
         for param_name, param_type in parameters:
             if param_name in param_names:
                 self.add_error(f"Parámetro '{param_name}' duplicado en función '{name}'", line, col)
-                return False
+                return None
             param_names.add(param_name)
             
-            param_symbol = Symbol(
+            param_symbol = VariableSymbol(
                 name=param_name,
                 symbol_type=SymbolType.PARAMETER,
                 data_type=param_type,
@@ -477,7 +589,7 @@ class CompiscriptSymbolTable:
             )
             param_symbols.append(param_symbol)
         
-        symbol = Symbol(
+        symbol = FunctionSymbol(
             name=name,
             symbol_type=SymbolType.FUNCTION,
             data_type=return_type,
@@ -488,8 +600,7 @@ class CompiscriptSymbolTable:
             return_type=return_type,
             array_element_type=array_element_type  
         )
-        
-        return self.insert(symbol)
+        return symbol
         
     def declare_class(self, name: str, parent_class: Optional[str], line: int, col: int) -> bool:
         
@@ -497,11 +608,11 @@ class CompiscriptSymbolTable:
             self.add_error(f"Clase '{name}' ya está declarada", line, col)
             return False
         
-        if parent_class and not self.lookup(parent_class):
+        if parent_class and not self.peek(parent_class):
             self.add_error(f"Clase padre '{parent_class}' no está declarada", line, col)
             return False
         
-        symbol = Symbol(
+        symbol = ClassSymbol(
             name=name,
             symbol_type=SymbolType.CLASS,
             data_type=DataType.CLASS_TYPE,
@@ -514,12 +625,120 @@ class CompiscriptSymbolTable:
         return self.insert(symbol)
     
     
+    def iter_scopes(self):
+        pending = [self.global_scope]
+        while pending:
+            scope = pending.pop()
+            yield scope
+            pending.extend(reversed(scope.children))
+
+    def scope_at(self, line: int, col: int = 0) -> Scope:
+        scope = self.global_scope
+        child = scope.child_at(line, col)
+        while child is not None:
+            scope = child
+            child = scope.child_at(line, col)
+        return scope
+
+    def visible_at(self, line: int, col: int = 0) -> Dict[str, Symbol]:
+        # Símbolos visibles en una posición: del ámbito más interno hacia la raíz,
+        # respetando el ocultamiento y omitiendo declaraciones posteriores a la línea.
+        visible = {}
+        scope = self.scope_at(line, col)
+        while scope is not None:
+            for name, symbol in scope.symbols.items():
+                if name not in visible and symbol.line_number <= line:
+                    visible[name] = symbol
+            scope = scope.parent_scope
+        return visible
+
+    def get_class_symbols(self) -> Dict[str, Symbol]:
+        classes = {}
+        for scope in self.iter_scopes():
+            for symbol in scope.symbols.values():
+                if symbol.symbol_type == SymbolType.CLASS:
+                    classes.setdefault(symbol.name, symbol)
+        return classes
+
+    def compute_class_layout(self, class_symbol: Symbol) -> ClassLayout:
+        # Los atributos heredados conservan su slot; los propios se agregan al final en orden de declaración.
+        parent = self.class_layouts.get(class_symbol.parent_class) if class_symbol.parent_class else None
+        slots = dict(parent.slots) if parent else {}
+        offsets = dict(parent.offsets) if parent else {}
+        next_offset = parent.size_bytes if parent else 0
+        for attr_name, attr_symbol in class_symbol.attributes.items():
+            if attr_name not in slots:
+                attr_size = sizeof(attr_symbol.data_type)
+                next_offset = align(next_offset, attr_size) if attr_size > 1 else next_offset
+                slots[attr_name] = len(slots)
+                offsets[attr_name] = next_offset
+                next_offset += attr_size
+            attr_symbol.offset = offsets[attr_name]
+            attr_symbol.size_bytes = sizeof(attr_symbol.data_type)
+        layout = ClassLayout(class_symbol.name, slots, offsets, align(next_offset, 8))
+        class_symbol.size_bytes = layout.size_bytes
+        self.class_layouts[class_symbol.name] = layout
+        return layout
+
+    def get_class_layout(self, class_name: str) -> Optional[ClassLayout]:
+        return self.class_layouts.get(class_name)
+
+    def build_member_index(self, class_symbol: Symbol) -> Dict[str, tuple]:
+        # Índice aplanado nombre -> (clase que lo define, Symbol); lo propio oculta lo heredado.
+        parent = self.class_members.get(class_symbol.parent_class) if class_symbol.parent_class else None
+        members = dict(parent) if parent else {}
+        for member_name, member_symbol in class_symbol.attributes.items():
+            members[member_name] = (class_symbol.name, member_symbol)
+        for member_name, member_symbol in class_symbol.methods.items():
+            members[member_name] = (class_symbol.name, member_symbol)
+        self.class_members[class_symbol.name] = members
+        return members
+
+    def add_class_member(self, class_name: str, member_name: str, member_symbol: Symbol):
+        self.class_members.setdefault(class_name, {})[member_name] = (class_name, member_symbol)
+
+    def get_class_members(self, class_name: str) -> Optional[Dict[str, tuple]]:
+        return self.class_members.get(class_name)
+
+    def find_class_member(self, class_name: str, member_name: str) -> Optional[tuple]:
+        members = self.class_members.get(class_name)
+        return members.get(member_name) if members is not None else None
+
+    def compute_class_vtable(self, class_symbol: Symbol) -> VTable:
+        # Un método redefinido reutiliza el slot del padre; los constructores no se despachan dinámicamente.
+        parent = self.class_vtables.get(class_symbol.parent_class) if class_symbol.parent_class else None
+        slots = dict(parent.slots) if parent else {}
+        entries = list(parent.entries) if parent else []
+        for method_name, method_symbol in class_symbol.methods.items():
+            if method_symbol.is_constructor or method_name == "constructor":
+                continue
+            if method_name not in slots:
+                slots[method_name] = len(entries)
+                entries.append(None)
+            entries[slots[method_name]] = f"{class_symbol.name}.{method_name}"
+        vtable = VTable(class_symbol.name, slots, entries)
+        self.class_vtables[class_symbol.name] = vtable
+        return vtable
+
+    def get_class_vtable(self, class_name: str) -> Optional[VTable]:
+        return self.class_vtables.get(class_name)
+
+    def get_frame_symbols(self) -> Dict[str, Symbol]:
+        symbols = {}
+        for scope in self.iter_scopes():
+            for symbol in scope.symbols.values():
+                if symbol.unique_name:
+                    symbols.setdefault(symbol.unique_name, symbol)
+        return symbols
+
     def add_error(self, message: str, line: int, col: int = 0):
         error_msg = f"Error semántico en línea {line}, columna {col}: {message}"
         self.errors.append(error_msg)
+        self.diagnostics.append(Diagnostic("error", line, col, message))
     
-    def add_warning(self, message: str):
+    def add_warning(self, message: str, line: Optional[int] = None, col: int = 0):
         self.warnings.append(f"Warning: {message}")
+        self.diagnostics.append(Diagnostic("warning", line, col, message))
     
     def has_errors(self) -> bool:
         return len(self.errors) > 0
@@ -530,39 +749,37 @@ class CompiscriptSymbolTable:
     def get_warnings(self) -> List[str]:
         return self.warnings.copy()
     
+    def source_order(self, scope) -> list:
+        # Las funciones y clases se insertan en la primera pasada; se listan en orden de código.
+        return sorted(scope.symbols.values(), key=lambda symbol: (symbol.line_number, symbol.column_number))
+
     def print_table(self):
         print("Tabla de símbolos")
         print(f"\n Ámbito 0: global (Nivel 0, Contexto: {ContextType.GLOBAL.value}) ")
         if self.global_scope.symbols:
-            for name, symbol in self.global_scope.symbols.items():
+            for symbol in self.source_order(self.global_scope):
                 self._print_symbol(symbol)
                 if symbol.symbol_type == SymbolType.CLASS:
                     self._print_class_summary(symbol)
         else:
             print("  (vacío)")
 
-        for scope_info in self.all_scopes_history:
-            print(f"\n--- Ámbito: {scope_info['name']} (Nivel {scope_info['level']}, "
-                  f"Contexto: {scope_info['context'].value}) ---")
-            
-            if scope_info['symbols']:
-                for name, symbol in scope_info['symbols'].items():
+        total_symbols = len(self.global_scope.symbols)
+        for scope in self.iter_scopes():
+            if scope is self.global_scope:
+                continue
+            total_symbols += len(scope.symbols)
+            status = "Ámbito" if scope.closed else "Ámbito ACTIVO"
+            lines = f", Líneas {scope.span[0]}-{scope.span[2]}" if scope.span else ""
+            print(f"\n--- {status}: {scope.scope_name} (Nivel {scope.scope_level}, "
+                  f"Contexto: {scope.context_type.value}{lines}) ---")
+            if scope.symbols:
+                for symbol in self.source_order(scope):
                     self._print_symbol(symbol)
             else:
                 print("  (vacío)")
         
-        if len(self.scope_stack) > 1:
-            for scope in self.scope_stack[1:]:
-                print(f"\n--- Ámbito ACTIVO: {scope.scope_name} (Nivel {scope.scope_level}, "
-                      f"Contexto: {scope.context_type.value}) ---")
-                if scope.symbols:
-                    for name, symbol in scope.symbols.items():
-                        self._print_symbol(symbol)
-                else:
-                    print("  (vacío)")
-        
         print(f"\n Resumen ")
-        total_symbols = len(self.all_symbols) + len(self.global_scope.symbols)
         classes = [s for s in self.global_scope.symbols.values() if s.symbol_type == SymbolType.CLASS]
         
         print(f"Total de símbolos declarados: {total_symbols}")
@@ -614,3 +831,4 @@ class CompiscriptSymbolTable:
     def clear_errors(self):
         self.errors.clear()
         self.warnings.clear()
+        self.diagnostics.clear()
@@ -0,0 +1,178 @@
+import io
+import os
+import sys
+import tempfile
+import unittest
+import subprocess
+import contextlib
+from pathlib import Path
+
+PROGRAM_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROGRAM_DIR))
+
+from compilador import Compiler
+from programa_tac import TACProgram, TACBackendError
+from backend_python import PythonBackend
+from backend_c import CBackend, find_compiler, INT_BITS as C_INT_BITS
+from backend_x86 import X86Backend, INT_BITS as X86_INT_BITS
+from backend_mips import MipsBackend, INT_BITS as MIPS_INT_BITS
+from simulador_mips import MipsSimulator
+
+# Llamada en la primera instrucción de la función con parámetros usados después de ella.
+CALL_BEFORE_PARAMS = """
+function z(): integer { let a: integer = 1; let b: integer = 2; let c: integer = 3; let d: integer = 4; return a+b+c+d; }
+function g(p: integer, q: integer): integer { return z() + p + q; }
+print(g(100, 1000));
+"""
+
+PRINT_BEFORE_PARAMS = """
+function g1(p0: integer, p1: integer): integer { print(p1); return p0 + p1; }
+print(g1(5, 7));
+"""
+
+CATCH_VARIABLE = """
+function f(): integer {
+  try { let xs: integer[] = [1]; print(xs[5]); } catch (e) { print(e); }
+  return 0;
+}
+print(f());
+"""
+
+NESTED_READS_OUTER_PARAM = """
+function outer(a: integer): integer {
+  function inner(): integer { return a + 1; }
+  return inner();
+}
+print(outer(2));
+"""
+
+INHERITANCE = """
+class A { let x: integer; function get(): integer { return this.x; } }
+class B : A { function get(): integer { return this.x + 1; } }
+let b: A = new B();
+b.x = 41;
+print(b.get());
+"""
+
+
+def boundary_program(bits: int) -> str:
+    # El máximo del rango, y las operaciones que se salen de él por arriba y por abajo.
+    return f"""
+let m: integer = {(1 << (bits - 1)) - 1};
+print(m);
+print(m + 1);
+print(m * 2);
+let n: integer = -m - 1;
+print(n - 1);
+print(n / -1);
+"""
+
+
+def wrapped_output(bits: int) -> str:
+    largest, smallest = (1 << (bits - 1)) - 1, -(1 << (bits - 1))
+    return "".join(f"{value}\n" for value in (largest, smallest, -2, largest, smallest))
+
+
+def compile_program(source: str) -> TACProgram:
+    result = Compiler().compile(source)
+    if not result.success:
+        raise AssertionError(result.errors)
+    return TACProgram(result.tac, result.symbol_table)
+
+
+def run_python(program: TACProgram) -> str:
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        PythonBackend(program, cache_dir=None).run()
+    return output.getvalue()
+
+
+def run_mips(program: TACProgram) -> str:
+    output = io.StringIO()
+    MipsSimulator(MipsBackend(program).generate(), output=output).run()
+    return output.getvalue()
+
+
+def run_native(backend, extension: str, flags=None) -> str:
+    with tempfile.TemporaryDirectory() as workdir:
+        exe_path = backend.build(os.path.join(workdir, "programa" + extension), os.path.join(workdir, "programa"),
+                                 flags=flags)
+        result = subprocess.run([exe_path], capture_output=True, text=True, timeout=30)
+    if result.returncode != 0:
+        raise AssertionError(f"El ejecutable terminó con código {result.returncode}:\n{result.stdout}")
+    return result.stdout
+
+
+class CBackendTest(unittest.TestCase):
+    # Los nombres sin valor en la función deben rechazarse antes de llegar al compilador de C.
+    def test_catch_variable_is_rejected(self):
+        with self.assertRaisesRegex(TACBackendError, "'e'"):
+            CBackend(compile_program(CATCH_VARIABLE)).generate()
+
+    def test_outer_parameter_in_nested_function_is_rejected(self):
+        with self.assertRaisesRegex(TACBackendError, "'a'"):
+            CBackend(compile_program(NESTED_READS_OUTER_PARAM)).generate()
+
+    @unittest.skipIf(find_compiler() is None, "no hay compilador de C")
+    def test_inheritance_matches_python(self):
+        program = compile_program(INHERITANCE)
+        self.assertEqual(run_native(CBackend(program), ".c"), run_python(program))
+
+
+@unittest.skipIf(find_compiler() is None, "no hay compilador de C")
+class X86BackendTest(unittest.TestCase):
+    def assert_matches_python(self, source: str):
+        program = compile_program(source)
+        self.assertEqual(run_native(X86Backend(program), ".s"), run_python(program))
+
+    def test_call_before_parameter_use(self):
+        self.assert_matches_python(CALL_BEFORE_PARAMS)
+
+    def test_print_before_parameter_use(self):
+        self.assert_matches_python(PRINT_BEFORE_PARAMS)
+
+
+class IntegerRangeTest(unittest.TestCase):
+    # Cada backend tiene su propio rango de enteros y al salirse da la vuelta; Python no tiene límite.
+    def test_python_is_unbounded(self):
+        largest = (1 << 63) - 1
+        expected = "".join(f"{value}\n" for value in (largest, largest + 1, 2 * largest,
+                                                        -largest - 2, largest + 1))
+        self.assertEqual(run_python(compile_program(boundary_program(64))), expected)
+
+    @unittest.skipIf(find_compiler() is None, "no hay compilador de C")
+    def test_c_wraps(self):
+        # Sin optimizar, para que gcc no pliegue las operaciones y las resuelva el runtime.
+        program = compile_program(boundary_program(C_INT_BITS))
+        output = run_native(CBackend(program), ".c", flags=["-O0", "-w", "-fwrapv"])
+        self.assertEqual(output, wrapped_output(C_INT_BITS))
+
+    @unittest.skipIf(find_compiler() is None, "no hay compilador de C")
+    def test_x86_wraps(self):
+        program = compile_program(boundary_program(X86_INT_BITS))
+        self.assertEqual(run_native(X86Backend(program), ".s"), wrapped_output(X86_INT_BITS))
+
+    def test_mips_wraps(self):
+        program = compile_program(boundary_program(MIPS_INT_BITS))
+        self.assertEqual(run_mips(program), wrapped_output(MIPS_INT_BITS))
+
+    def test_literal_out_of_range_is_rejected(self):
+        for backend, bits in ((CBackend, C_INT_BITS), (X86Backend, X86_INT_BITS), (MipsBackend, MIPS_INT_BITS)):
+            program = compile_program(f"print({1 << (bits - 1)});")
+            with self.assertRaisesRegex(TACBackendError, "fuera del rango"):
+                backend(program).generate()
+
+
+class CrossBackendTest(unittest.TestCase):
+    # El mismo programa debe imprimir lo mismo en todos los backends.
+    def test_call_before_parameter_use(self):
+        program = compile_program(CALL_BEFORE_PARAMS)
+        expected = run_python(program)
+        self.assertEqual(expected, "1110\n")
+        self.assertEqual(run_mips(program), expected)
+        if find_compiler() is not None:
+            self.assertEqual(run_native(X86Backend(program), ".s"), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import sys
+import threading
+import unittest
+from unittest import mock
+from concurrent.futures import Future
+from pathlib import Path
+
+PROGRAM_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROGRAM_DIR))
+
+from compilador import Compiler, CompileOptions
+from analizador_semantico import CompilationCancelled
+from analisis_paralelo import (parse_program, weigh_bodies, parallel_jobs, shard_bodies, check_shards,
+                              ParallelVisitor)
+
+# Atributos usados solo desde fuera de la clase, con accesos encadenados.
+ATTRIBUTES_USED_OUTSIDE = """
+class N {
+  let v: integer;
+  let nx: N;
+}
+let a: N = new N();
+let b: N = new N();
+a.nx = b;
+print(a.nx.v);
+"""
+
+ATTRIBUTES_USED_IN_FUNCTIONS = """
+class N {
+  let v: integer;
+  let nx: N;
+  let w: integer;
+}
+let a: N = new N();
+function f(): integer { return a.nx.v; }
+function g(): void { a.nx = new N(); }
+g();
+print(f());
+"""
+
+PARENT_DECLARED_LATER = """
+class C : B { function get(): integer { return this.x + 100; } }
+class B : A { function get(): integer { return this.x + 1; } }
+class A { let x: integer; function get(): integer { return this.x; } }
+let c: A = new C();
+c.x = 5;
+print(c.get());
+"""
+
+INHERITANCE_CYCLE = """
+class P : Q { }
+class Q : P { }
+"""
+
+
+def compile_source(source: str):
+    return Compiler().compile(source, CompileOptions())
+
+
+def check_in_shards(source: str, jobs: int = 2):
+    # Reparte los cuerpos aunque el programa sea demasiado chico para que compense.
+    tree = parse_program(source)
+    return check_shards(source, tree, shard_bodies(weigh_bodies(tree.statement()), jobs))
+
+
+def unused_warnings(source: str) -> list:
+    return [warning for warning in compile_source(source).warnings if "no usada" in warning]
+
+
+class UnusedAttributeTest(unittest.TestCase):
+    def test_attributes_used_through_object(self):
+        self.assertEqual(unused_warnings(ATTRIBUTES_USED_OUTSIDE), [])
+
+    def test_unused_attribute_still_warns(self):
+        warnings = unused_warnings(ATTRIBUTES_USED_IN_FUNCTIONS)
+        self.assertEqual(len(warnings), 1)
+        self.assertIn("'w'", warnings[0])
+
+    def test_parallel_analysis_marks_attributes(self):
+        warnings = check_in_shards(ATTRIBUTES_USED_IN_FUNCTIONS).analyzer.symbol_table.get_warnings()
+        self.assertEqual(warnings, compile_source(ATTRIBUTES_USED_IN_FUNCTIONS).warnings)
+
+
+class ClassOrderTest(unittest.TestCase):
+    def test_parent_declared_later(self):
+        result = compile_source(PARENT_DECLARED_LATER)
+        self.assertEqual(result.errors, [])
+        classes = result.symbol_table.get_class_symbols()
+        self.assertEqual(classes["C"].parent_class, "B")
+        self.assertEqual(classes["B"].parent_class, "A")
+        table = check_in_shards(PARENT_DECLARED_LATER).analyzer.symbol_table
+        self.assertEqual(table.get_errors(), [])
+
+    def test_inheritance_cycle_is_rejected(self):
+        errors = compile_source(INHERITANCE_CYCLE).errors
+        self.assertEqual(len(errors), 2)
+        self.assertTrue(all("Clase padre" in error for error in errors))
+
+
+class ParallelThresholdTest(unittest.TestCase):
+    def test_small_program_stays_serial(self):
+        tree = parse_program(ATTRIBUTES_USED_IN_FUNCTIONS)
+        self.assertEqual(parallel_jobs(weigh_bodies(tree.statement()), 8), 1)
+
+    def test_jobs_follow_cost_model(self):
+        weighted = [(ordinal, 10_000) for ordinal in range(100)]
+        with mock.patch("analisis_paralelo.os.cpu_count", return_value=8):
+            self.assertEqual(parallel_jobs(weighted, 8), 8)
+            # Con dos procesos el análisis sintáctico repetido cuesta más de lo que se reparte.
+            self.assertEqual(parallel_jobs(weighted, 2), 1)
+        with mock.patch("analisis_paralelo.os.cpu_count", return_value=1):
+            self.assertEqual(parallel_jobs(weighted, 8), 1)
+
+
+class ParallelCancellationTest(unittest.TestCase):
+    def test_cancel_while_waiting_for_shard(self):
+        # El proceso nunca contesta: la cancelación debe atenderse igual y descartar lo pendiente.
+        tree = parse_program(ATTRIBUTES_USED_IN_FUNCTIONS)
+        futures = {ordinal: Future() for ordinal, _ in weigh_bodies(tree.statement())}
+        visitor = ParallelVisitor(futures)
+        visitor.cancelled = threading.Event()
+        timer = threading.Timer(0.2, visitor.cancelled.set)
+        timer.start()
+        try:
+            with self.assertRaises(CompilationCancelled):
+                visitor.visit(tree)
+        finally:
+            timer.cancel()
+        self.assertTrue(all(future.cancelled() for future in futures.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()